@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+SysCore Sentry - per-process resource accounting
+Accumulates CPU time, IO bytes and RSS high-water marks per (pid, create_time)
+across process samples into fixed-width time buckets, so questions like
+"which process used the most CPU in the last 10 minutes" can be answered by
+process, by process name or by cgroup.
+"""
+
+import os
+import time
+import heapq
+from collections import deque
+
+
+GROUPS = ("process", "name", "cgroup")
+RANKINGS = ("cpu_seconds", "io_bytes", "rss_peak")
+
+
+def read_cgroup(pid, root="/proc"):
+    """Return a process's cgroup path, preferring the unified (v2) hierarchy"""
+    try:
+        with open(os.path.join(root, str(pid), "cgroup"), encoding="utf-8", errors="replace") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    fallback = None
+    for line in lines:
+        hierarchy, _, rest = line.partition(":")
+        controllers, _, path = rest.partition(":")
+        if hierarchy == "0" and not controllers:
+            return path
+        if fallback is None and ("cpu" in controllers.split(",") or controllers == "name=systemd"):
+            fallback = path
+    return fallback
+
+
+class ProcessAccounting:
+    """Windowed per-process usage built from successive process samples
+
+    Live processes keep one small state record holding their last counters,
+    and are dropped as soon as they exit. Each time bucket holds one record
+    per process seen in it, with the CPU and IO used in the bucket and the
+    largest RSS observed, so every ranking covers exactly the buckets in its
+    window. Memory is bounded by max_processes live records plus, per
+    bucket, the processes sampled in that bucket.
+    """
+
+    def __init__(self, retention=3600, bucket_seconds=60, max_processes=10000, root="/proc"):
+        self.retention = retention
+        self.bucket_seconds = bucket_seconds
+        self.max_processes = max_processes
+        self.root = root
+        self.started = time.time()
+        # (bucket start, {key: [cpu_seconds, read_bytes, write_bytes, rss_peak, name, cgroup]})
+        self.buckets = deque()
+        # key -> [name, cgroup, cpu_seconds, read_bytes, write_bytes]
+        self._live = {}
+        self.dropped = 0
+
+    def _bucket(self, ts):
+        """Return the record dict for the bucket holding ts, expiring old buckets"""
+        start = ts // self.bucket_seconds * self.bucket_seconds
+        if not self.buckets or self.buckets[-1][0] < start:
+            self.buckets.append((start, {}))
+        cutoff = ts - self.retention - self.bucket_seconds
+        while self.buckets and self.buckets[0][0] < cutoff:
+            self.buckets.popleft()
+        return self.buckets[-1][1]
+
+    def update(self, ts, usages, exited_keys=()):
+        """Account one process sample
+
+        usages holds (key, name, cpu_seconds, read_bytes, write_bytes, rss)
+        tuples with cumulative counters; any counter may be None when the
+        process can't be inspected. exited_keys are forgotten.
+        """
+        bucket = self._bucket(ts)
+        live = self._live
+        for key, name, cpu, read, write, rss in usages:
+            state = live.get(key)
+            if state is None:
+                if len(live) >= self.max_processes:
+                    self.dropped += 1
+                    continue
+                # Processes started since accounting began are charged everything they used;
+                # older ones only from this first sighting on
+                charge_all = key[1] is not None and key[1] >= self.started
+                state = live[key] = [
+                    name, read_cgroup(key[0], self.root),
+                    0.0 if charge_all else cpu,
+                    0 if charge_all else read,
+                    0 if charge_all else write,
+                ]
+            d_cpu = cpu - state[2] if cpu is not None and state[2] is not None else 0.0
+            d_read = read - state[3] if read is not None and state[3] is not None else 0
+            d_write = write - state[4] if write is not None and state[4] is not None else 0
+            state[2], state[3], state[4] = cpu, read, write
+
+            if d_cpu > 0 or d_read > 0 or d_write > 0 or rss:
+                record = bucket.get(key)
+                if record is None:
+                    record = bucket[key] = [0.0, 0, 0, 0, state[0], state[1]]
+                record[0] += max(d_cpu, 0.0)
+                record[1] += max(d_read, 0)
+                record[2] += max(d_write, 0)
+                if rss is not None and rss > record[3]:
+                    record[3] = rss
+
+        for key in exited_keys:
+            live.pop(key, None)
+
+    def _totals(self, window, groups=GROUPS, now=None):
+        """Fold the buckets inside the last window seconds into per-group totals, once for all groups"""
+        now = now if now is not None else time.time()
+        cutoff = now - window
+        totals = {group: {} for group in groups}
+        for start, bucket in reversed(self.buckets):
+            if start + self.bucket_seconds <= cutoff:
+                break
+            for key, (cpu, read, write, rss, name, cgroup) in bucket.items():
+                for group in groups:
+                    self._add(totals[group], key, name, cgroup, group, cpu, read + write, rss)
+        return totals
+
+    @staticmethod
+    def _rank(totals, n, by, group):
+        """Top n rows of one group's totals by one ranking"""
+        ranked = heapq.nlargest(n, totals.items(), key=lambda item: item[1][RANKINGS.index(by)])
+        report = []
+        for group_key, (cpu, io, rss, processes) in ranked:
+            row = {"cpu_seconds": round(cpu, 3), "io_bytes": io, "rss_peak": rss}
+            if group == "process":
+                pid, create_time, name = group_key
+                row = {"pid": pid, "create_time": create_time, "name": name, **row}
+            else:
+                row = {group: group_key, "processes": len(processes), **row}
+            report.append(row)
+        return report
+
+    def top(self, window, n=10, by="cpu_seconds", group="process", now=None):
+        """Top n processes, names or cgroups by usage over the last window seconds"""
+        if by not in RANKINGS:
+            raise ValueError(f"Unknown ranking '{by}' (choose from: {', '.join(RANKINGS)})")
+        if group not in GROUPS:
+            raise ValueError(f"Unknown grouping '{group}' (choose from: {', '.join(GROUPS)})")
+        return self._rank(self._totals(window, (group,), now)[group], n, by, group)
+
+    @staticmethod
+    def _add(totals, key, name, cgroup, group, cpu, io, rss):
+        """Fold one record into the per-group totals [cpu, io, rss peak, process keys]"""
+        if group == "process":
+            group_key = (key[0], key[1], name)
+        else:
+            group_key = name if group == "name" else cgroup
+        total = totals.get(group_key)
+        if total is None:
+            total = totals[group_key] = [0.0, 0, 0, set()]
+        total[0] += cpu
+        total[1] += io
+        # A group's peak is its largest process peak, not a sum over time
+        if rss > total[2]:
+            total[2] = rss
+        total[3].add(key)
+
+    def report(self, windows, n=10, rankings=RANKINGS):
+        """Top-n tables for each window and ranking, grouped by process, name and cgroup"""
+        now = time.time()
+        report_windows = {}
+        for label, seconds in windows.items():
+            totals = self._totals(seconds, GROUPS, now)
+            report_windows[label] = {
+                by: {f"by_{group}": self._rank(totals[group], n, by, group) for group in GROUPS}
+                for by in rankings
+            }
+        return {
+            "tracked_processes": len(self._live),
+            "dropped_processes": self.dropped,
+            "windows": report_windows,
+        }
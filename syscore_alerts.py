@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+SysCore Sentry - threshold and anomaly alerts
+Evaluates declarative rules from a JSON or YAML file against each sample.
+Supports sustained-duration thresholds, hysteresis, cooldown, listening port
+allowlists and an EWMA z-score anomaly detector.
+
+Example rules file (YAML):
+
+    rules:
+      - name: high_memory
+        metric: memory_percent
+        op: ">"
+        threshold: 90
+        for: 60s
+        clear: 85
+        cooldown: 5m
+      - name: disk_almost_full
+        metric: disk_usage_percent{*}
+        op: ">"
+        threshold: 85
+      - name: unexpected_listener
+        type: port_allowlist
+        allow: [22, tcp/443, udp/53]
+    anomaly:
+      - metric: cpu_percent
+        alpha: 0.1
+        z: 4
+        warmup: 30
+"""
+
+import json
+import math
+import operator
+from fnmatch import fnmatchcase
+
+from syscore_sink import parse_duration
+
+
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+# For the clear threshold the comparison flips: "> 90, clear 85" clears at <= 85
+CLEAR_OPERATORS = {
+    ">": operator.le,
+    ">=": operator.lt,
+    "<": operator.ge,
+    "<=": operator.gt,
+    "==": operator.ne,
+    "!=": operator.eq,
+}
+
+
+def load_rules(path):
+    """Load a rules document from a .json, .yml or .yaml file"""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yml", ".yaml")):
+            try:
+                import yaml
+            except ImportError:
+                raise RuntimeError("YAML rule files require PyYAML. Install it with: pip install pyyaml")
+            return yaml.safe_load(f) or {}
+        return json.load(f)
+
+
+def _seconds(value):
+    """Accept plain numbers or duration strings such as "60s" or "5m" """
+    if value is None:
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    return parse_duration(value)
+
+
+class ThresholdRule:
+    """A metric threshold that must hold for a duration before it fires"""
+
+    def __init__(self, spec):
+        self.name = spec["name"]
+        self.metric = spec["metric"]
+        self.op = spec.get("op", ">")
+        if self.op not in OPERATORS:
+            raise ValueError(f"Rule '{self.name}': unknown operator '{self.op}'")
+        self.threshold = float(spec["threshold"])
+        self.clear = float(spec.get("clear", self.threshold))
+        self.duration = _seconds(spec.get("for"))
+        self.cooldown = _seconds(spec.get("cooldown"))
+        self.severity = spec.get("severity", "warning")
+        self.is_pattern = any(char in self.metric for char in "*?[")
+        self._fires = OPERATORS[self.op]
+        self._clears = CLEAR_OPERATORS[self.op]
+
+    def matches(self, metric):
+        return fnmatchcase(metric, self.metric)
+
+
+class _SeriesState:
+    """Evaluation state for one rule applied to one metric series"""
+
+    __slots__ = ("pending_since", "firing", "last_fired")
+
+    def __init__(self):
+        self.pending_since = None
+        self.firing = False
+        self.last_fired = None
+
+
+class EwmaDetector:
+    """Exponentially weighted mean/variance z-score detector; O(1) memory per metric"""
+
+    __slots__ = ("alpha", "z_threshold", "warmup", "mean", "variance", "count", "anomalous")
+
+    def __init__(self, alpha=0.1, z_threshold=4.0, warmup=30):
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.warmup = warmup
+        self.mean = None
+        self.variance = 0.0
+        self.count = 0
+        self.anomalous = False
+
+    def update(self, value):
+        """Feed a value and return its z-score against the history before it, or None during warmup"""
+        self.count += 1
+        if self.mean is None:
+            self.mean = value
+            return None
+        deviation = value - self.mean
+        z = None
+        if self.count > self.warmup and self.variance > 0:
+            z = deviation / math.sqrt(self.variance)
+        # Update after scoring so an outlier doesn't mask itself
+        increment = self.alpha * deviation
+        self.mean += increment
+        self.variance = (1 - self.alpha) * (self.variance + deviation * increment)
+        return z
+
+
+class AlertEngine:
+    """Evaluates threshold, allowlist and anomaly rules incrementally on each sample
+
+    Rules naming an exact metric are looked up directly; pattern rules are
+    matched once per new metric name and cached, so per-sample cost is
+    proportional to the metrics present rather than rules x metrics.
+    """
+
+    def __init__(self, document):
+        self.threshold_rules = []
+        self.allowlists = []
+        for spec in document.get("rules", []):
+            if spec.get("type", "threshold") == "port_allowlist":
+                self.allowlists.append(PortAllowlist(spec))
+            else:
+                self.threshold_rules.append(ThresholdRule(spec))
+        self.anomaly_specs = document.get("anomaly", [])
+
+        self._exact = {}
+        self._patterns = [rule for rule in self.threshold_rules if rule.is_pattern]
+        for rule in self.threshold_rules:
+            if not rule.is_pattern:
+                self._exact.setdefault(rule.metric, []).append(rule)
+        self._resolved = {}
+        self._states = {}
+        self._detectors = {}
+        self._anomaly_patterns = [
+            (spec["metric"], float(spec.get("alpha", 0.1)), float(spec.get("z", 4.0)), int(spec.get("warmup", 30)))
+            for spec in self.anomaly_specs
+        ]
+
+    def _rules_for(self, metric):
+        """Threshold rules that apply to a metric, resolved once per metric name"""
+        rules = self._resolved.get(metric)
+        if rules is None:
+            rules = list(self._exact.get(metric, ()))
+            rules.extend(rule for rule in self._patterns if rule.matches(metric))
+            self._resolved[metric] = rules
+        return rules
+
+    def _detector_for(self, metric):
+        """EWMA detector for a metric, created on first sight if any anomaly spec matches"""
+        if metric in self._detectors:
+            return self._detectors[metric]
+        detector = None
+        for pattern, alpha, z_threshold, warmup in self._anomaly_patterns:
+            if fnmatchcase(metric, pattern):
+                detector = EwmaDetector(alpha, z_threshold, warmup)
+                break
+        self._detectors[metric] = detector
+        return detector
+
+    def evaluate(self, ts, metrics, listening_ports=None):
+        """Evaluate one sample and return the alerts that changed state"""
+        events = []
+        for metric, value in metrics.items():
+            for rule in self._rules_for(metric):
+                event = self._evaluate_threshold(rule, metric, value, ts)
+                if event:
+                    events.append(event)
+            detector = self._detector_for(metric)
+            if detector is not None:
+                event = self._evaluate_anomaly(detector, metric, value, ts)
+                if event:
+                    events.append(event)
+        if listening_ports is not None:
+            for allowlist in self.allowlists:
+                events.extend(allowlist.evaluate(listening_ports, ts))
+        return events
+
+    def _evaluate_threshold(self, rule, metric, value, ts):
+        """Advance one rule/series state machine"""
+        key = (rule.name, metric)
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _SeriesState()
+
+        if state.firing:
+            if rule._clears(value, rule.clear):
+                state.firing = False
+                state.pending_since = None
+                return self._event(rule, metric, value, ts, "resolved")
+            return None
+
+        if not rule._fires(value, rule.threshold):
+            state.pending_since = None
+            return None
+        if state.pending_since is None:
+            state.pending_since = ts
+        if ts - state.pending_since < rule.duration:
+            return None
+        if state.last_fired is not None and ts - state.last_fired < rule.cooldown:
+            return None
+        state.firing = True
+        state.last_fired = ts
+        return self._event(rule, metric, value, ts, "firing")
+
+    @staticmethod
+    def _event(rule, metric, value, ts, state):
+        return {
+            "ts": ts,
+            "rule": rule.name,
+            "metric": metric,
+            "state": state,
+            "value": value,
+            "threshold": rule.threshold if state == "firing" else rule.clear,
+            "op": rule.op,
+            "severity": rule.severity,
+        }
+
+    @staticmethod
+    def _evaluate_anomaly(detector, metric, value, ts):
+        """Report transitions into and out of the anomalous state"""
+        z = detector.update(value)
+        anomalous = z is not None and abs(z) >= detector.z_threshold
+        if anomalous == detector.anomalous:
+            return None
+        detector.anomalous = anomalous
+        return {
+            "ts": ts,
+            "rule": "anomaly",
+            "metric": metric,
+            "state": "firing" if anomalous else "resolved",
+            "value": value,
+            "z_score": round(z, 2) if z is not None else None,
+            "severity": "info",
+        }
+
+
+class PortAllowlist:
+    """Fires for every listening socket whose port is not on the allowlist"""
+
+    def __init__(self, spec):
+        self.name = spec["name"]
+        self.severity = spec.get("severity", "critical")
+        self.allowed = set()
+        for entry in spec.get("allow", []):
+            proto, _, port = str(entry).rpartition("/")
+            self.allowed.add((proto.upper() or None, int(port)))
+        self._firing = set()
+
+    def _is_allowed(self, proto, port):
+        return (None, port) in self.allowed or (proto, port) in self.allowed
+
+    def evaluate(self, listening_ports, ts):
+        """Return firing events for new unexpected listeners and resolved ones for those gone"""
+        current = set()
+        for sock in listening_ports:
+            if not self._is_allowed(sock["proto"], sock["port"]):
+                current.add((sock["proto"], sock["address"], sock["port"], sock.get("process")))
+        events = []
+        for proto, address, port, process in sorted(current - self._firing, key=str):
+            events.append(self._event(ts, "firing", proto, address, port, process))
+        for proto, address, port, process in sorted(self._firing - current, key=str):
+            events.append(self._event(ts, "resolved", proto, address, port, process))
+        self._firing = current
+        return events
+
+    def _event(self, ts, state, proto, address, port, process):
+        return {
+            "ts": ts,
+            "rule": self.name,
+            "metric": "listening_port",
+            "state": state,
+            "value": f"{proto.lower()}/{address}:{port}",
+            "process": process,
+            "severity": self.severity,
+        }
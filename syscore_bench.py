@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+SysCore Sentry - collector benchmarks
+Runs each SystemMonitor collector repeatedly and reports latency percentiles,
+memory high-water marks and tracemalloc allocation figures as JSON, so scan
+cost can be compared between versions.
+"""
+
+import os
+import sys
+import json
+import time
+import math
+import random
+import platform
+import tracemalloc
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def current_rss():
+    """Resident set size of this process in bytes"""
+    import psutil
+    return psutil.Process().memory_info().rss
+
+
+def peak_rss():
+    """High-water RSS of this process in bytes"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak if platform.system() == "Darwin" else peak * 1024
+
+
+def benchmark_callable(func, iterations, warmup=1):
+    """Time func() over iterations runs and measure its allocations separately"""
+    for _ in range(warmup):
+        func()
+
+    durations = []
+    rss_high = current_rss()
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started)
+        rss_high = max(rss_high, current_rss())
+
+    # tracemalloc slows everything down, so allocations get their own pass
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        func()
+        _, alloc_peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    retained = after.compare_to(before, "filename")
+
+    durations.sort()
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(durations, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(durations, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(durations, 0.99) * 1000, 3),
+        "max_ms": round(durations[-1] * 1000, 3),
+        "rss_high_bytes": rss_high,
+        "alloc_peak_bytes": alloc_peak,
+        "alloc_retained_blocks": sum(stat.count_diff for stat in retained),
+        "alloc_retained_bytes": sum(stat.size_diff for stat in retained),
+    }
+
+
+class FakeProcess:
+    """Minimal stand-in for psutil.Process used by the synthetic process table"""
+
+    STATUSES = ["running", "sleeping", "sleeping", "sleeping", "idle"]
+
+    def __init__(self, pid):
+        self.pid = pid
+        self._rng = random.Random(pid)
+        self._static = {
+            "pid": pid,
+            "name": f"proc-{pid % 97}",
+            "username": "root" if pid % 5 == 0 else "app",
+            "create_time": 1700000000.0 + pid,
+            "cmdline": [f"/usr/bin/proc-{pid % 97}", "--worker", str(pid)],
+        }
+
+    def as_dict(self, attrs):
+        values = dict(self._static)
+        values["status"] = self._rng.choice(self.STATUSES)
+        values["cpu_percent"] = round(self._rng.random() * 10, 1)
+        values["memory_percent"] = self._rng.random()
+        return {attr: values[attr] for attr in attrs}
+
+    def cpu_percent(self, interval=None):
+        return 0.0
+
+    def create_time(self):
+        return self._static["create_time"]
+
+
+def synthetic_process_table(count):
+    """Return a ProcessTable backed by count fake processes"""
+    from syscore_entry import ProcessTable
+    pids = list(range(1, count + 1))
+    return ProcessTable(prime_window=0, pids=lambda: pids, process_factory=FakeProcess)
+
+
+def legacy_cases():
+    """Equivalent collectors from method_3.py, for comparison"""
+    import method_3
+    return {
+        "legacy_memory": method_3.get_memory_details,
+        "legacy_disk": method_3.get_filesystem_details,
+        "legacy_network": method_3.get_network_details,
+        "legacy_process": method_3.get_process_details,
+        "legacy_user": method_3.get_user_details,
+    }
+
+
+def procfs_cases():
+    """psutil calls used by the collectors next to their /proc fast path equivalents"""
+    import psutil
+    from syscore_entry import CpuSampler
+    from syscore_procfs import ProcfsReader
+    reader = ProcfsReader()
+    return {
+        "psutil_cpu_times": CpuSampler.psutil_busy_total,
+        "procfs_cpu_times": reader.cpu_busy_total,
+        "psutil_memory": lambda: (psutil.virtual_memory(), psutil.swap_memory()),
+        "procfs_memory": reader.memory,
+        "psutil_diskstats": lambda: psutil.disk_io_counters(perdisk=True),
+        "procfs_diskstats": reader.disk_counters,
+        "psutil_net_dev": lambda: psutil.net_io_counters(pernic=True),
+        "procfs_net_dev": reader.net_counters,
+    }
+
+
+def run_benchmarks(names, iterations=20, synthetic_processes=None, include_legacy=False, procfs=False):
+    """Benchmark the named collectors and return a JSON-serializable report
+
+    With procfs=True the collectors use the /proc fast path, and the raw
+    psutil and /proc readers are benchmarked side by side as well.
+    """
+    from syscore_entry import SystemMonitor
+
+    monitor = SystemMonitor(quiet=True, procfs=procfs)
+    if synthetic_processes:
+        monitor.process_table = synthetic_process_table(synthetic_processes)
+
+    results = {}
+    for name in names:
+        collector = getattr(monitor, SystemMonitor.COLLECTORS[name])
+        results[name] = benchmark_callable(collector, iterations)
+        print(f"[*] {name:<12} p50={results[name]['p50_ms']:.2f}ms p99={results[name]['p99_ms']:.2f}ms",
+              file=sys.stderr)
+
+    extra_cases = {}
+    if monitor.procfs is not None:
+        extra_cases.update(procfs_cases())
+    if include_legacy:
+        extra_cases.update(legacy_cases())
+    for name, func in extra_cases.items():
+        results[name] = benchmark_callable(func, iterations)
+        print(f"[*] {name:<12} p50={results[name]['p50_ms']:.2f}ms p99={results[name]['p99_ms']:.2f}ms",
+              file=sys.stderr)
+
+    return {
+        "timestamp": time.time(),
+        "host": platform.node(),
+        "platform": f"{platform.system()} {platform.release()}",
+        "python_version": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "synthetic_processes": synthetic_processes,
+        "procfs": monitor.procfs is not None,
+        "peak_rss_bytes": peak_rss(),
+        "results": results,
+    }
+
+
+def compare_reports(baseline, current, tolerance=0.2, min_delta_ms=1.0):
+    """Return collectors whose p50 latency regressed by more than tolerance
+
+    Differences under min_delta_ms are ignored; sub-millisecond collectors
+    are too noisy for a ratio alone to mean anything.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous["p50_ms"]:
+            continue
+        ratio = result["p50_ms"] / previous["p50_ms"]
+        if ratio > 1 + tolerance and result["p50_ms"] - previous["p50_ms"] >= min_delta_ms:
+            regressions.append({
+                "collector": name,
+                "baseline_p50_ms": previous["p50_ms"],
+                "p50_ms": result["p50_ms"],
+                "ratio": round(ratio, 2),
+            })
+    return regressions
+
+
+def save_report(report, path):
+    """Write a benchmark report as JSON"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
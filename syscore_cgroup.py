@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+SysCore Sentry - cgroup v2 breakdown
+Reads cpu.stat, memory.current, memory.stat and io.stat for every cgroup in
+the unified hierarchy and turns them into per-cgroup usage and rates, so
+containers and services can be compared instead of only host-wide totals.
+"""
+
+import os
+import time
+
+
+# Where the unified hierarchy is mounted: pure v2 hosts, then hybrid v1/v2 hosts
+CGROUP2_ROOTS = ("/sys/fs/cgroup", "/sys/fs/cgroup/unified")
+
+CPU_FIELDS = {
+    b"usage_usec": "cpu_usage_usec",
+    b"user_usec": "cpu_user_usec",
+    b"system_usec": "cpu_system_usec",
+    b"nr_throttled": "cpu_nr_throttled",
+    b"throttled_usec": "cpu_throttled_usec",
+}
+
+MEMORY_FIELDS = {
+    b"anon": "memory_anon",
+    b"file": "memory_file",
+    b"shmem": "memory_shmem",
+    b"kernel_stack": "memory_kernel_stack",
+    b"slab": "memory_slab",
+    b"sock": "memory_sock",
+}
+
+# memory.stat entries that are event counters rather than sizes
+MEMORY_EVENT_FIELDS = {
+    b"pgfault": "memory_pgfault",
+    b"pgmajfault": "memory_pgmajfault",
+}
+
+# Files read from every cgroup that has them
+CGROUP_FILES = ("cpu.stat", "memory.current", "memory.stat", "io.stat", "cgroup.procs")
+
+IO_FIELDS = {
+    b"rbytes": "io_read_bytes",
+    b"wbytes": "io_write_bytes",
+    b"rios": "io_read_ops",
+    b"wios": "io_write_ops",
+}
+
+
+def find_cgroup2_root():
+    """Return the mount point of the cgroup v2 hierarchy, or None"""
+    for root in CGROUP2_ROOTS:
+        if os.path.exists(os.path.join(root, "cgroup.controllers")):
+            return root
+    return None
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def parse_keyed(data, fields, into):
+    """Copy the wanted "key value" lines of cpu.stat or memory.stat into a dict"""
+    for line in data.splitlines():
+        key, _, value = line.partition(b" ")
+        name = fields.get(key)
+        if name is not None:
+            into[name] = int(value)
+
+
+def parse_io_stat(data, into):
+    """Sum io.stat's "MAJ:MIN rbytes=.. wbytes=.." lines over all devices"""
+    for name in IO_FIELDS.values():
+        into[name] = 0
+    for line in data.splitlines():
+        for item in line.split()[1:]:
+            key, _, value = item.partition(b"=")
+            name = IO_FIELDS.get(key)
+            if name is not None:
+                into[name] += int(value)
+
+
+class CgroupReader:
+    """Per-cgroup counters from the unified hierarchy
+
+    The list of cgroup directories, and which of the wanted files each one
+    has, is cached. cgroupfs doesn't update a directory's mtime when
+    children are created, so instead the root's nr_descendants is checked
+    on every read, and a cgroup whose cpu.stat has vanished forces a
+    rescan as well. A full rescan also happens every rescan_interval
+    seconds, which picks up controllers enabled later and creates and
+    removes that cancel out.
+    """
+
+    def __init__(self, root=None, rescan_interval=60.0):
+        self.root = root or find_cgroup2_root()
+        if self.root is None:
+            raise RuntimeError("No cgroup v2 hierarchy found")
+        self.rescan_interval = rescan_interval
+        self._paths = None
+        self._descendants = None
+        self._scanned_at = 0.0
+        self.scans = 0
+        # pid -> cgroup path, refreshed from cgroup.procs on every read
+        self.pid_map = {}
+
+    def _descendant_count(self):
+        try:
+            data = _read(os.path.join(self.root, "cgroup.stat"))
+        except OSError:
+            return None
+        for line in data.splitlines():
+            if line.startswith(b"nr_descendants "):
+                return int(line.split()[1])
+        return None
+
+    def _scan(self):
+        """Walk the hierarchy and cache every cgroup directory"""
+        paths = []
+        pending = [("/", self.root)]
+        while pending:
+            path, directory = pending.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            files = set()
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append((path.rstrip("/") + "/" + entry.name, entry.path))
+                elif entry.name in CGROUP_FILES:
+                    files.add(entry.name)
+            paths.append((path, directory, files))
+        paths.sort()
+        self._paths = paths
+        self._scanned_at = time.monotonic()
+        self.scans += 1
+
+    def paths(self):
+        """(path relative to the root, directory, files present) per cgroup, rescanning only when the tree changed"""
+        descendants = self._descendant_count()
+        if (self._paths is None or descendants != self._descendants
+                or time.monotonic() - self._scanned_at >= self.rescan_interval):
+            self._descendants = descendants
+            self._scan()
+        return self._paths
+
+    def read(self):
+        """Return {cgroup path: {counter or gauge: value}}
+
+        Controller files that a cgroup doesn't have (io.stat with the io
+        controller disabled, memory files on the root) are simply left out.
+        """
+        cgroups = {}
+        pid_map = {}
+        removed = False
+        for path, directory, files in self.paths():
+            values = {}
+            try:
+                parse_keyed(_read(directory + "/cpu.stat"), CPU_FIELDS, values)
+                if "memory.current" in files:
+                    values["memory_current"] = int(_read(directory + "/memory.current"))
+                if "memory.stat" in files:
+                    data = _read(directory + "/memory.stat")
+                    parse_keyed(data, MEMORY_FIELDS, values)
+                    parse_keyed(data, MEMORY_EVENT_FIELDS, values)
+                if "io.stat" in files:
+                    parse_io_stat(_read(directory + "/io.stat"), values)
+                pids = _read(directory + "/cgroup.procs").split() if "cgroup.procs" in files else []
+            except FileNotFoundError:
+                # Every cgroup has cpu.stat, so a missing file means the cgroup itself is gone
+                removed = True
+                continue
+            except (OSError, ValueError):
+                continue
+            for pid in pids:
+                pid_map[int(pid)] = path
+            values["pids"] = len(pids)
+            cgroups[path] = values
+        if removed:
+            self._paths = None
+        self.pid_map = pid_map
+        return cgroups
+
+
+# Counters turned into rates between samples, and the name of each rate
+COUNTER_RATES = {
+    "cpu_usage_usec": "cpu_percent",
+    "cpu_user_usec": "cpu_user_percent",
+    "cpu_system_usec": "cpu_system_percent",
+    "cpu_throttled_usec": "cpu_throttled_percent",
+    "memory_pgmajfault": "major_faults_per_sec",
+    "io_read_bytes": "io_read_bytes_per_sec",
+    "io_write_bytes": "io_write_bytes_per_sec",
+    "io_read_ops": "io_read_iops",
+    "io_write_ops": "io_write_iops",
+}
+
+
+class CgroupSampler:
+    """Per-cgroup usage with rates over the interval since the previous sample
+
+    CPU time becomes a percentage of one core. A cgroup that has just
+    appeared, or whose counters went backwards because it was recreated
+    under the same path, reports gauges only until the next sample.
+    """
+
+    def __init__(self, reader, window=1.0):
+        self.reader = reader
+        self.window = window
+        self._previous = None
+        self._previous_time = None
+
+    def sample(self):
+        """Return ({cgroup: {field: value}}, elapsed seconds)"""
+        if self._previous is None:
+            self._previous = self.reader.read()
+            self._previous_time = time.monotonic()
+            time.sleep(self.window)
+
+        current = self.reader.read()
+        now = time.monotonic()
+        elapsed = now - self._previous_time
+
+        report = {}
+        for path, values in current.items():
+            entry = {field: value for field, value in values.items()
+                     if field not in COUNTER_RATES and field not in ("cpu_nr_throttled", "memory_pgfault")}
+            before = self._previous.get(path)
+            if before is not None and any(values[field] < before[field] for field in COUNTER_RATES
+                                          if field in values and field in before):
+                before = None
+            if before is not None and elapsed > 0:
+                for field, rate_name in COUNTER_RATES.items():
+                    if field not in values or field not in before:
+                        continue
+                    rate = (values[field] - before[field]) / elapsed
+                    if field.startswith("cpu_"):
+                        # Microseconds of CPU per second of wall time, as a percentage of one core
+                        rate /= 10000.0
+                    entry[rate_name] = round(rate, 2)
+            report[path] = entry
+
+        self._previous = current
+        self._previous_time = now
+        return report, elapsed
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+SysCore Sentry - live dashboard
+A top-like curses view over SystemMonitor. Sampling runs on its own thread
+at the watch intervals; the screen is rebuilt at most max_fps times a second
+and only the parts of each line that changed are written to the terminal.
+"""
+
+import time
+import threading
+
+try:
+    import curses
+except ImportError:  # Windows without windows-curses
+    curses = None
+
+
+PROCESS_COLUMNS = [
+    # (title, field, width, right aligned)
+    ("PID", "pid", 7, True),
+    ("USER", "username", 10, False),
+    ("STATUS", "status", 9, False),
+    ("CPU%", "cpu_percent", 6, True),
+    ("MEM%", "memory_percent", 6, True),
+    ("NAME", "name", 0, False),
+]
+
+CONNECTION_COLUMNS = [
+    ("PROTO", "proto", 5, False),
+    ("LOCAL", "local_address", 28, False),
+    ("REMOTE", "remote_address", 28, False),
+    ("STATUS", "status", 12, False),
+    ("PID", "pid", 7, True),
+]
+
+DASHBOARD_INTERVALS = {
+    "cpu": 1,
+    "memory": 1,
+    "network": 5,
+    "process": 3,
+    "disk": 5,
+    "basic": 3600,
+}
+
+HELP_LINE = " q quit  tab switch pane  s next sort column  r reverse  up/down/pgup/pgdn scroll"
+
+
+def changed_span(old, new):
+    """Return (start, end) of the region where two strings differ, or None if equal"""
+    if old == new:
+        return None
+    limit = min(len(old), len(new))
+    start = 0
+    while start < limit and old[start] == new[start]:
+        start += 1
+    old_end, new_end = len(old), len(new)
+    while old_end > start and new_end > start and old[old_end - 1] == new[new_end - 1]:
+        old_end -= 1
+        new_end -= 1
+    # Cover the longer of the two so shorter lines erase what they replace
+    return start, max(old_end, new_end)
+
+
+def format_cell(value, width, right):
+    """Render one table cell at a fixed width"""
+    if value is None:
+        text = "-"
+    elif isinstance(value, float):
+        text = f"{value:.1f}"
+    else:
+        text = str(value)
+    if not width:
+        return text
+    text = text[:width]
+    return text.rjust(width) if right else text.ljust(width)
+
+
+def format_rate(value):
+    """Compact bytes-per-second figure"""
+    for unit in ("B", "K", "M", "G"):
+        if value < 1024 or unit == "G":
+            return f"{value:.0f}{unit}/s" if unit == "B" else f"{value:.1f}{unit}/s"
+        value /= 1024
+
+
+def bar(percent, width):
+    """Text gauge such as [|||||     ]"""
+    filled = int(round(width * min(max(percent, 0.0), 100.0) / 100.0))
+    return "[" + "|" * filled + " " * (width - filled) + "]"
+
+
+class Dashboard:
+    """Full-screen live view with sortable process and connection panes"""
+
+    PANES = ("processes", "connections")
+
+    def __init__(self, monitor, intervals=None, max_fps=2.0):
+        if curses is None:
+            raise RuntimeError("The dashboard needs curses (on Windows: pip install windows-curses)")
+        self.monitor = monitor
+        self.intervals = intervals or DASHBOARD_INTERVALS
+        self.min_frame = 1.0 / max_fps
+        self.pane = 0
+        self.sort_index = {"processes": 3, "connections": 0}
+        self.reverse = {"processes": True, "connections": False}
+        self.scroll = 0
+        self._generation = 0
+        self._rendered_generation = -1
+        self._rows_cache = {}
+        self._shadow = []
+        self._stop = threading.Event()
+        self._error = None
+        self.frames = 0
+
+    # Sampling
+
+    def _sample_loop(self):
+        try:
+            self.monitor.watch(self._on_sample, intervals=self.intervals, stop_event=self._stop)
+        except Exception as e:
+            self._error = str(e)
+
+    def _on_sample(self, sample):
+        # Collectors replace whole sections of system_info, so the render
+        # thread can read it directly; the generation just says "new data"
+        self._generation += 1
+
+    # Rows
+
+    def _columns(self):
+        return PROCESS_COLUMNS if self.PANES[self.pane] == "processes" else CONNECTION_COLUMNS
+
+    def _rows(self, needed):
+        """Rows for the active pane, re-sorted only when the data or sort order changed"""
+        pane = self.PANES[self.pane]
+        column = self._columns()[self.sort_index[pane]]
+        reverse = self.reverse[pane]
+        cache_key = (pane, column[1], reverse, needed, self._generation)
+        cached = self._rows_cache.get(pane)
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
+
+        if pane == "processes":
+            # Only the visible slice is selected out of the whole table
+            rows = self.monitor.process_table.top(needed, key=column[1], reverse=reverse)
+        else:
+            connections = self.monitor.system_info.get("network_info", {}).get("connections", [])
+            field = column[1]
+            if field == "pid":
+                rows = sorted(connections, key=lambda c: c.get(field) or 0, reverse=reverse)
+            else:
+                rows = sorted(connections, key=lambda c: str(c.get(field) or ""), reverse=reverse)
+        self._rows_cache[pane] = (cache_key, rows)
+        return rows
+
+    # Layout
+
+    def _summary_lines(self, width):
+        info = self.monitor.system_info
+        lines = []
+        basic = info.get("basic_info", {})
+        lines.append((f" SysCore Sentry - {basic.get('hostname', '')}  {basic.get('platform', '')} "
+                      f"{basic.get('platform_release', '')}  {time.strftime('%H:%M:%S')}", "title"))
+
+        cpu = info.get("cpu_info")
+        if cpu:
+            lines.append((f" CPU  {bar(cpu['cpu_percent_overall'], 30)} {cpu['cpu_percent_overall']:5.1f}%", None))
+            cores = cpu["cpu_percent_per_core"]
+            per_line = max(1, (width - 2) // 12)
+            for start in range(0, len(cores), per_line):
+                lines.append(("  " + "".join(f"{start + i:>3}:{percent:5.1f}% "
+                                             for i, percent in enumerate(cores[start:start + per_line])), None))
+        memory = info.get("memory_info")
+        if memory:
+            lines.append((f" MEM  {bar(memory['memory_percent'], 30)} {memory['memory_percent']:5.1f}%"
+                          f"   SWAP {bar(memory['swap_percent'], 15)} {memory['swap_percent']:5.1f}%", None))
+
+        disk_rates = info.get("disk_io_rates", {}).get("devices", {})
+        if disk_rates:
+            read = sum(device["read_bytes_per_sec"] for device in disk_rates.values())
+            write = sum(device["write_bytes_per_sec"] for device in disk_rates.values())
+            lines.append((f" DISK read {format_rate(read):>10}  write {format_rate(write):>10}", None))
+        network = info.get("network_info")
+        if network:
+            nic_rates = network["rates"]["interfaces"].values()
+            recv = sum(nic["bytes_recv_per_sec"] for nic in nic_rates)
+            sent = sum(nic["bytes_sent_per_sec"] for nic in nic_rates)
+            lines.append((f" NET  recv {format_rate(recv):>10}  sent {format_rate(sent):>10}"
+                          f"  connections {len(network['connections'])}", None))
+        if self._error:
+            lines.append((f" Sampling stopped: {self._error}", "error"))
+        return lines
+
+    def _table_lines(self, height):
+        pane = self.PANES[self.pane]
+        columns = self._columns()
+        sort_column = self.sort_index[pane]
+        arrow = "v" if self.reverse[pane] else "^"
+        header = " ".join(
+            format_cell(title + (arrow if index == sort_column else ""), width, right)
+            for index, (title, _, width, right) in enumerate(columns)
+        )
+        tabs = "  ".join(f"[{name}]" if index == self.pane else f" {name} " for index, name in enumerate(self.PANES))
+        lines = [(" " + tabs, None), (header, "header")]
+
+        rows = self._rows(self.scroll + height)
+        self.scroll = max(0, min(self.scroll, len(rows) - height))
+        for row in rows[self.scroll:self.scroll + height]:
+            lines.append((" ".join(format_cell(row.get(field), width, right)
+                                   for _, field, width, right in columns), None))
+        return lines
+
+    def build_lines(self, height, width):
+        """Lay out the whole screen as (text, style) lines"""
+        lines = self._summary_lines(width)
+        lines.append(("", None))
+        table_height = max(0, height - len(lines) - 3)
+        lines.extend(self._table_lines(table_height))
+        lines.extend([("", None)] * (height - len(lines) - 1))
+        lines.append((HELP_LINE, "header"))
+        return [(text[:width - 1], style) for text, style in lines[:height]]
+
+    # Drawing
+
+    def _styles(self):
+        styles = {None: curses.A_NORMAL, "header": curses.A_REVERSE, "title": curses.A_BOLD, "error": curses.A_BOLD}
+        if curses.has_colors():
+            curses.start_color()
+            curses.use_default_colors()
+            curses.init_pair(1, curses.COLOR_CYAN, -1)
+            curses.init_pair(2, curses.COLOR_RED, -1)
+            styles["title"] = curses.color_pair(1) | curses.A_BOLD
+            styles["error"] = curses.color_pair(2) | curses.A_BOLD
+        return styles
+
+    def render(self, screen, styles):
+        """Write only what changed since the previous frame"""
+        height, width = screen.getmaxyx()
+        lines = self.build_lines(height, width)
+        if len(self._shadow) != len(lines):
+            screen.erase()
+            self._shadow = [("", None)] * len(lines)
+        for row, (text, style) in enumerate(lines):
+            old_text, old_style = self._shadow[row]
+            if style != old_style:
+                span = (0, max(len(text), len(old_text)))
+            else:
+                span = changed_span(old_text, text)
+            if span is None:
+                continue
+            start, end = span
+            segment = text[start:end].ljust(end - start)
+            try:
+                screen.addstr(row, start, segment, styles[style])
+            except curses.error:
+                pass  # writing the bottom-right cell fails harmlessly
+            self._shadow[row] = (text, style)
+        screen.noutrefresh()
+        curses.doupdate()
+        self.frames += 1
+
+    def _handle_key(self, key):
+        """Apply a keypress; returns False to quit"""
+        pane = self.PANES[self.pane]
+        if key in (ord("q"), ord("Q"), 27):
+            return False
+        if key == ord("\t"):
+            self.pane = (self.pane + 1) % len(self.PANES)
+            self.scroll = 0
+        elif key == ord("s"):
+            self.sort_index[pane] = (self.sort_index[pane] + 1) % len(self._columns())
+        elif key == ord("r"):
+            self.reverse[pane] = not self.reverse[pane]
+        elif key == curses.KEY_DOWN:
+            self.scroll += 1
+        elif key == curses.KEY_UP:
+            self.scroll = max(0, self.scroll - 1)
+        elif key == curses.KEY_NPAGE:
+            self.scroll += 20
+        elif key == curses.KEY_PPAGE:
+            self.scroll = max(0, self.scroll - 20)
+        elif key == curses.KEY_RESIZE:
+            self._shadow = []
+        return True
+
+    def _main(self, screen):
+        curses.curs_set(0)
+        screen.timeout(int(self.min_frame * 1000))
+        styles = self._styles()
+        sampler = threading.Thread(target=self._sample_loop, name="syscore-dashboard-sampler", daemon=True)
+        sampler.start()
+
+        last_frame = 0.0
+        while True:
+            key = screen.getch()
+            if key != -1 and not self._handle_key(key):
+                break
+            # Input redraws at once; new samples redraw at most max_fps times a second
+            now = time.monotonic()
+            new_data = self._generation != self._rendered_generation
+            if key != -1 or (new_data and now - last_frame >= self.min_frame):
+                self._rendered_generation = self._generation
+                self.render(screen, styles)
+                last_frame = now
+        self._stop.set()
+
+    def run(self):
+        curses.wrapper(self._main)
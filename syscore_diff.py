@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+SysCore Sentry - report diff
+Compares two SystemMonitor reports entity by entity: packages by name,
+listening ports by protocol/address/port, processes by name and command
+line, partitions by mount point and logged-in users by name. Only the
+report sections a comparison needs are parsed.
+"""
+
+import gzip
+import json
+import time
+from collections import Counter
+
+from syscore_packages import diff_inventories
+from syscore_sink import parse_size
+
+
+# Report section each comparison reads
+SECTIONS = {
+    "system": "basic_info",
+    "packages": "application_info",
+    "ports": "security_info",
+    "processes": "process_info",
+    "partitions": "disk_info",
+    "users": "user_info",
+}
+
+SYSTEM_FIELDS = ("hostname", "platform", "platform_release", "platform_version", "architecture", "boot_time")
+
+# Reports before schema version 2 held sizes as "12.34 GB" and times as local "2024-01-31 08:15:00"
+LEGACY_SIZE_UNIT = 1024**3
+LEGACY_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# A top-level key in a report written with json.dump(indent=4). Nested lines are
+# indented further and JSON strings can't hold raw newlines, so this only
+# matches between sections.
+TOP_LEVEL_KEY = b'\n    "'
+
+
+def _read_bytes(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        return f.read()
+
+
+def section_offsets(data):
+    """Map each top-level key of a pretty-printed report to the (start, end) of its value"""
+    offsets = {}
+    start = data.find(TOP_LEVEL_KEY)
+    while start != -1:
+        key_start = start + len(TOP_LEVEL_KEY) - 1
+        key_end = data.index(b'":', key_start + 1) + 1
+        end = data.find(TOP_LEVEL_KEY, key_end)
+        # The value runs to the comma before the next key, or to the closing brace
+        value_end = data.rindex(b",", key_end, end) if end != -1 else data.rindex(b"}")
+        offsets[json.loads(data[key_start:key_end])] = (key_end + 1, value_end)
+        start = end
+    return offsets
+
+
+def _load_ndjson(lines, wanted):
+    """Newest value of each wanted section across NDJSON sample records
+
+    Watch samples only carry the sections refreshed on that tick, so the
+    records are read newest first until every wanted section has been seen.
+    """
+    sections = {}
+    notes = {}
+    process_deltas = False
+    for line in reversed(lines):
+        missing = [key for key in wanted if key not in sections]
+        if not missing:
+            break
+        # Only parse records that can hold a missing section
+        if not any(b'"' + key.encode() + b'"' in line for key in missing) and b'"process_delta"' not in line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(record, dict):
+            continue
+        data = record.get("data", record)
+        for key in missing:
+            if key in data:
+                sections[key] = data[key]
+        process_deltas = process_deltas or "process_delta" in data
+    if "process_info" in wanted and "process_info" not in sections and process_deltas:
+        notes["process_info"] = "watch streams carry process changes, not process lists"
+    return sections, notes
+
+
+def load_report(path, wanted):
+    """Return the wanted sections of a report as ({key: parsed value}, {key: why it is unavailable})
+
+    Reports saved by SysCore Sentry are indented, so their sections can be
+    located with byte searches and only the wanted ones sliced out and
+    parsed; on a large report most of the bytes (connection lists, full
+    package lists) are never copied or parsed. Compact JSON is parsed
+    whole, and NDJSON sample files yield the newest value of each section.
+    """
+    data = _read_bytes(path)
+    newline = data.find(b"\n")
+    # A pretty-printed report opens with a line holding only "{"; NDJSON lines are whole records
+    if data[:newline if newline != -1 else len(data)].strip() == b"{":
+        offsets = section_offsets(data)
+        return {key: json.loads(data[offsets[key][0]:offsets[key][1]]) for key in wanted if key in offsets}, {}
+    stripped = data.strip()
+    if b"\n" in stripped:
+        # NDJSON: one compact record per line
+        return _load_ndjson(stripped.splitlines(), wanted)
+    report = json.loads(stripped)
+    if "data" in report and "ts" in report:
+        # A single NDJSON sample
+        return _load_ndjson([stripped], wanted)
+    return {key: report[key] for key in wanted if key in report}, {}
+
+
+def _legacy_package_versions(packages):
+    """{name: version} from a pre-inventory package list, named the way the inventory names them
+
+    Those lists came from `dpkg --get-selections`, which qualifies multi-arch
+    packages of the native architecture too ("libc6:amd64"); the inventory
+    only qualifies other architectures. The most common suffix is taken to
+    be the native one and stripped. Versions were always "N/A".
+    """
+    names = [package["name"] for package in packages if "name" in package]
+    arches = Counter(name.rpartition(":")[2] for name in names if ":" in name)
+    native = arches.most_common(1)[0][0] if arches else None
+    bare = {name for name in names if ":" not in name}
+    versions = {}
+    for package in packages:
+        if "name" not in package:
+            continue
+        name = package["name"]
+        base, _, arch = name.rpartition(":")
+        if arch == native and base not in bare:
+            name = base
+        version = package.get("version")
+        versions[name] = None if version in ("N/A", "") else version
+    return versions
+
+
+def _package_versions(application_info):
+    """{name: version} from either report format, or None when the report has no package list"""
+    if isinstance(application_info, list):
+        # Reports from before the package inventory listed packages directly
+        return _legacy_package_versions(application_info)
+    if isinstance(application_info, dict) and "packages" in application_info:
+        return {package["name"]: package["version"] for package in application_info["packages"]}
+    return None
+
+
+def diff_packages(old, new):
+    old_versions = _package_versions(old)
+    new_versions = _package_versions(new)
+    if old_versions is None or new_versions is None:
+        # Without full lists (--include-packages) only the inventory fingerprints can be compared
+        if isinstance(old, dict) and isinstance(new, dict) and "hash" in old and "hash" in new:
+            return {"changed": old["hash"] != new["hash"], "count_delta": new["count"] - old["count"],
+                    "note": "reports carry no package lists; compared inventory hashes only"}
+        return {"note": "reports carry no package lists"}
+    return diff_inventories(old_versions, new_versions)
+
+
+def _port_key(port):
+    """(proto, address, port) for a listening socket record or a legacy netstat line"""
+    if isinstance(port, dict):
+        return port["proto"], port["address"], port["port"]
+    fields = port.split()
+    # "tcp 0 0 0.0.0.0:22 0.0.0.0:* LISTEN" from the netstat-based collector
+    address, _, number = fields[3].rpartition(":") if len(fields) > 3 else ("", "", "")
+    return fields[0].upper().rstrip("6") if fields else "", address, int(number) if number.isdigit() else number
+
+
+def _keyed_diff(old, new, key, describe):
+    """Added and removed entities between two lists, matched through a hash index on key()
+
+    Entities can repeat (several processes with one command line), so each
+    side is counted rather than deduplicated.
+    """
+    old_counts = Counter()
+    examples = {}
+    for item in old:
+        k = key(item)
+        old_counts[k] += 1
+        examples.setdefault(k, item)
+    new_counts = Counter()
+    for item in new:
+        k = key(item)
+        new_counts[k] += 1
+        examples.setdefault(k, item)
+    added = new_counts - old_counts
+    removed = old_counts - new_counts
+    return {
+        "added": [describe(k, examples[k], count) for k, count in sorted(added.items(), key=_sort_key)],
+        "removed": [describe(k, examples[k], count) for k, count in sorted(removed.items(), key=_sort_key)],
+    }
+
+
+def _sort_key(item):
+    return tuple(str(part) for part in item[0])
+
+
+def diff_ports(old, new):
+    def describe(key, item, count):
+        entry = {"proto": key[0], "address": key[1], "port": key[2]}
+        if isinstance(item, dict):
+            entry["process"] = item.get("process")
+        return entry
+    return _keyed_diff(old.get("listening_ports") or [], new.get("listening_ports") or [], _port_key, describe)
+
+
+def diff_processes(old, new):
+    def describe(key, item, count):
+        return {"name": key[0], "cmdline": key[1], "count": count}
+    return _keyed_diff(old, new, lambda p: (p.get("name"), p.get("cmdline")), describe)
+
+
+def diff_users(old, new):
+    def describe(key, item, count):
+        return {"name": key[0], "sessions": count}
+    return _keyed_diff(old, new, lambda u: (u.get("name"),), describe)
+
+
+def _size(value, legacy):
+    """Bytes from a number or a formatted size such as "12.34 GB"
+
+    With legacy set, the result is rounded to 0.01 GB so a number can be
+    compared with a formatted size without reporting rounding as a change.
+    """
+    size = value if isinstance(value, (int, float)) else parse_size(value)
+    return int(round(size / LEGACY_SIZE_UNIT, 2) * LEGACY_SIZE_UNIT) if legacy else size
+
+
+def _percent(value):
+    """Percentage from a number or a formatted "45.6%" """
+    return value if isinstance(value, (int, float)) else float(value.strip().rstrip("%"))
+
+
+def diff_partitions(old, new, min_change=0):
+    """Added, removed and resized partitions; changes sorted by how much usage moved
+
+    Sizes in older reports were rounded to 0.01 GB, so deltas involving
+    them are only that precise.
+    """
+    legacy = any(isinstance(partition.get("used"), str) for partition in list(old) + list(new))
+    old_index = {partition["mountpoint"]: partition for partition in old}
+    new_index = {partition["mountpoint"]: partition for partition in new}
+    changed = []
+    for mountpoint, partition in new_index.items():
+        before = old_index.get(mountpoint)
+        if before is None:
+            continue
+        try:
+            used_delta = _size(partition["used"], legacy) - _size(before["used"], legacy)
+            total_size_delta = _size(partition["total_size"], legacy) - _size(before["total_size"], legacy)
+            old_percent = _percent(before["usage_percent"])
+            new_percent = _percent(partition["usage_percent"])
+        except (KeyError, TypeError, ValueError):
+            return {"skipped": f"partition sizes for {mountpoint} are not comparable"}
+        if abs(used_delta) > min_change or total_size_delta:
+            changed.append({
+                "mountpoint": mountpoint,
+                "used_delta": used_delta,
+                "old_usage_percent": old_percent,
+                "new_usage_percent": new_percent,
+                "total_size_delta": total_size_delta,
+            })
+    changed.sort(key=lambda change: -abs(change["used_delta"]))
+    return {
+        "added": [new_index[m] for m in sorted(new_index.keys() - old_index.keys())],
+        "removed": [old_index[m] for m in sorted(old_index.keys() - new_index.keys())],
+        "changed": changed,
+    }
+
+
+def _timestamp(value):
+    """Epoch seconds from a number or a legacy local-time string"""
+    if isinstance(value, str):
+        try:
+            return time.mktime(time.strptime(value, LEGACY_TIME_FORMAT))
+        except ValueError:
+            return value
+    return value
+
+
+def diff_system(old, new):
+    changed = []
+    for field in SYSTEM_FIELDS:
+        before, after = old.get(field), new.get(field)
+        if field == "boot_time" and _timestamp(before) == _timestamp(after):
+            continue
+        if before != after:
+            changed.append({"field": field, "old": before, "new": after})
+    return {"changed": changed}
+
+
+COMPARISONS = {
+    "system": diff_system,
+    "packages": diff_packages,
+    "ports": diff_ports,
+    "processes": diff_processes,
+    "partitions": diff_partitions,
+    "users": diff_users,
+}
+
+
+def diff_reports(old_path, new_path, sections=None):
+    """Structured delta between two reports, one entry per compared section"""
+    sections = sections or list(COMPARISONS)
+    wanted = {SECTIONS[name] for name in sections}
+    old, old_notes = load_report(old_path, wanted)
+    new, new_notes = load_report(new_path, wanted)
+    delta = {"old": old_path, "new": new_path}
+    for name in sections:
+        key = SECTIONS[name]
+        if key not in old or key not in new:
+            note = old_notes.get(key) or new_notes.get(key)
+            missing = [side for side, report in (("old", old), ("new", new)) if key not in report]
+            delta[name] = {"skipped": note or f"{key} missing from the {' and '.join(missing)} report{'s' if len(missing) > 1 else ''}"}
+            continue
+        delta[name] = COMPARISONS[name](old[key], new[key])
+    return delta
+
+
+def has_changes(delta):
+    """True when any compared section found a difference"""
+    for name in COMPARISONS:
+        section = delta.get(name, {})
+        if section.get("changed") is True:
+            return True
+        if any(isinstance(value, list) and value for value in section.values()):
+            return True
+    return False
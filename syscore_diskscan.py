@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+SysCore Sentry - disk hot-spot scanner
+Finds the largest directories and files under a mount point, like du, using
+a pool of scandir workers. The walk never leaves the starting filesystem,
+and an SQLite index of per-directory totals lets a repeat scan skip listing
+every directory whose mtime hasn't changed.
+"""
+
+import os
+import json
+import stat
+import time
+import heapq
+import queue
+import sqlite3
+import threading
+
+from syscore_packages import default_cache_dir
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path BLOB PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    scanned_at REAL NOT NULL,
+    own_bytes INTEGER NOT NULL,
+    own_files INTEGER NOT NULL,
+    subdirs TEXT NOT NULL,
+    big_files TEXT NOT NULL,
+    links TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def default_index_path():
+    """Default location of the scan index"""
+    return os.path.join(default_cache_dir(), "diskscan.db")
+
+
+def allocated_bytes(st):
+    """Space a file takes on disk, which is what fills a partition (sparse files take less)"""
+    blocks = getattr(st, "st_blocks", None)
+    return blocks * 512 if blocks is not None else st.st_size
+
+
+class DirRecord:
+    """What one directory holds directly, as stored in the index"""
+
+    __slots__ = ("mtime_ns", "own_bytes", "own_files", "subdirs", "big_files", "links", "listed", "dirty")
+
+    def __init__(self, mtime_ns, own_bytes, own_files, subdirs, big_files, links, listed, dirty):
+        self.mtime_ns = mtime_ns
+        self.own_bytes = own_bytes
+        self.own_files = own_files
+        self.subdirs = subdirs
+        # [name, bytes] for the directory's largest files above the size threshold
+        self.big_files = big_files
+        # [name, inode, bytes] for the hard-linked files this directory's totals include
+        self.links = links
+        # Listed in this scan rather than reused from the index
+        self.listed = listed
+        self.dirty = dirty
+
+
+class DiskScanner:
+    """Parallel du-style scan with a persistent per-directory index
+
+    Directories whose mtime is unchanged since the indexed scan are not
+    listed again: their file totals come from the index and only their
+    subdirectories and largest files are stat'ed, so files created or
+    removed anywhere are still noticed and the known big files' growth is
+    tracked. A file that grows in place without being one of its
+    directory's largest is only picked up when the directory changes or
+    its index entry is older than full_rescan_after seconds. Hard-linked
+    files are counted once, as in du, including across directories that
+    were re-walked and directories reused from the index.
+    """
+
+    def __init__(self, index_path=None, workers=8, top_n=20, big_file_bytes=1024 * 1024,
+                 full_rescan_after=86400.0):
+        self.index_path = index_path if index_path is not None else default_index_path()
+        self.workers = workers
+        self.top_n = top_n
+        self.big_file_bytes = big_file_bytes
+        self.full_rescan_after = full_rescan_after
+        self.db = None
+        self._lock = threading.Lock()
+        if self.index_path:
+            directory = os.path.dirname(self.index_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Collectors run on pool threads; scans are serialized by _lock instead
+            self.db = sqlite3.connect(self.index_path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            columns = [row[1] for row in self.db.execute("PRAGMA table_info(dirs)")]
+            if columns and "links" not in columns:
+                # Index from before hard links were recorded; it is only a cache
+                self.db.execute("DROP TABLE dirs")
+            self.db.executescript(SCHEMA)
+
+    def _load(self, root):
+        """Index rows for root and everything below it, keyed by path"""
+        if self.db is None:
+            return {}
+        prefix = os.fsencode(os.path.join(root, ""))
+        # Every path below root sorts between "root/" and "root0" ("0" follows "/")
+        rows = self.db.execute(
+            "SELECT path, mtime_ns, scanned_at, own_bytes, own_files, subdirs, big_files, links FROM dirs "
+            "WHERE path = ? OR (path >= ? AND path < ?)",
+            (os.fsencode(root), prefix, prefix[:-1] + b"0"))
+        return {os.fsdecode(row[0]): row[1:] for row in rows}
+
+    def _save(self, root, records, cached, now):
+        """Write re-walked directories and drop the ones that are gone"""
+        if self.db is None:
+            return
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(os.fsencode(path), record.mtime_ns, now, record.own_bytes, record.own_files,
+                  json.dumps(record.subdirs), json.dumps(record.big_files), json.dumps(record.links))
+                 for path, record in records.items() if record.dirty])
+            self.db.executemany("DELETE FROM dirs WHERE path = ?",
+                                [(os.fsencode(path),) for path in cached if path not in records])
+
+    def _visit(self, path, dir_stat, dev, row, now, seen_links, lock):
+        """Return (DirRecord, [(subdir, stat)], [skipped mount points]) for one directory"""
+        mtime_ns = dir_stat.st_mtime_ns
+        reuse = row is not None and row[0] == mtime_ns and now - row[1] < self.full_rescan_after
+        if reuse:
+            _, _, own_bytes, own_files, subdirs, big_files, links = row
+            try:
+                subdirs = json.loads(subdirs)
+                big_files = json.loads(big_files)
+                links = json.loads(links)
+            except ValueError:
+                # A damaged index row: list the directory again
+                reuse = False
+        if reuse:
+            children = []
+            skipped = []
+            for name in subdirs:
+                child = os.path.join(path, name)
+                try:
+                    st = os.lstat(child)
+                except OSError:
+                    continue
+                if stat.S_ISDIR(st.st_mode):
+                    if st.st_dev == dev:
+                        children.append((child, st))
+                    else:
+                        skipped.append(child)
+            dirty = False
+            for big_file in big_files:
+                try:
+                    size = allocated_bytes(os.lstat(os.path.join(path, big_file[0])))
+                except OSError:
+                    continue
+                if size != big_file[1]:
+                    own_bytes += size - big_file[1]
+                    big_file[1] = size
+                    dirty = True
+            return DirRecord(mtime_ns, own_bytes, own_files, subdirs, big_files, links, False, dirty), children, skipped
+
+        # The directory's own blocks count too, as in du
+        own_bytes = allocated_bytes(dir_stat)
+        own_files = 0
+        subdirs = []
+        children = []
+        skipped = []
+        big_files = []
+        links = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        st = entry.stat(follow_symlinks=False)
+                        subdirs.append(entry.name)
+                        if st.st_dev == dev:
+                            children.append((entry.path, st))
+                        else:
+                            skipped.append(entry.path)
+                        continue
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                if st.st_nlink > 1:
+                    # Count hard-linked files once, like du
+                    with lock:
+                        if (st.st_dev, st.st_ino) in seen_links:
+                            continue
+                        seen_links.add((st.st_dev, st.st_ino))
+                size = allocated_bytes(st)
+                if st.st_nlink > 1:
+                    links.append([entry.name, st.st_ino, size])
+                own_bytes += size
+                own_files += 1
+                if size >= self.big_file_bytes:
+                    big_files.append([entry.name, size])
+        if len(big_files) > self.top_n:
+            big_files = heapq.nlargest(self.top_n, big_files, key=lambda item: item[1])
+        return DirRecord(mtime_ns, own_bytes, own_files, subdirs, big_files, links, True, True), children, skipped
+
+    def scan(self, root):
+        """Scan the filesystem holding root and report its largest directories and files"""
+        with self._lock:
+            return self._scan(root)
+
+    def _scan(self, root):
+        started = time.monotonic()
+        now = time.time()
+        root = os.path.abspath(root)
+        root_stat = os.stat(root)
+        dev = root_stat.st_dev
+        cached = self._load(root)
+
+        records = {}
+        skipped_mounts = []
+        seen_links = set()
+        errors = [0]
+        lock = threading.Lock()
+        work = queue.Queue()
+        pending = [1]
+        work.put((root, root_stat))
+
+        def worker():
+            while True:
+                item = work.get()
+                if item is None:
+                    return
+                path, dir_stat = item
+                record, children, skipped = None, [], []
+                try:
+                    record, children, skipped = self._visit(path, dir_stat, dev, cached.get(path),
+                                                            now, seen_links, lock)
+                except Exception:
+                    # Counted, never fatal: a worker that died here would leave pending
+                    # above zero and the scan waiting forever
+                    pass
+                finally:
+                    with lock:
+                        if record is None:
+                            errors[0] += 1
+                        else:
+                            records[path] = record
+                        skipped_mounts.extend(skipped)
+                        pending[0] += len(children) - 1
+                        for child in children:
+                            work.put(child)
+                        if pending[0] == 0:
+                            for _ in range(self.workers):
+                                work.put(None)
+
+        threads = [threading.Thread(target=worker, name=f"syscore-diskscan-{i}", daemon=True)
+                   for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self._reconcile_links(records)
+        report = self._report(root, records)
+        self._save(root, records, cached, now)
+        rewalked = sum(1 for record in records.values() if record.listed)
+        report.update({
+            "device": dev,
+            "scanned_at": now,
+            "duration": round(time.monotonic() - started, 3),
+            "rewalked_directories": rewalked,
+            "reused_directories": len(records) - rewalked,
+            "errors": errors[0],
+            "skipped_mounts": sorted(skipped_mounts)[:self.top_n],
+        })
+        return report
+
+    @staticmethod
+    def _reconcile_links(records):
+        """Drop hard links that a reused directory already counts from re-walked directories
+
+        Within one scan seen_links makes sure a hard-linked file is counted once,
+        but directories reused from the index were counted in an earlier scan
+        and never add their files to seen_links.
+        """
+        claimed = set()
+        for record in records.values():
+            if not record.listed:
+                claimed.update(link[1] for link in record.links)
+        if not claimed:
+            return
+        for record in records.values():
+            if not record.listed or not record.links:
+                continue
+            kept = []
+            for name, inode, size in record.links:
+                if inode in claimed:
+                    record.own_bytes -= size
+                    record.own_files -= 1
+                    record.big_files = [big_file for big_file in record.big_files if big_file[0] != name]
+                else:
+                    kept.append([name, inode, size])
+            record.links = kept
+
+    def _report(self, root, records):
+        """Fold per-directory totals into their ancestors and pick the largest"""
+        totals = {path: [record.own_bytes, record.own_files] for path, record in records.items()}
+        # Deepest first, so every directory is complete before it is added to its parent
+        for path in sorted(totals, key=lambda p: p.count(os.sep), reverse=True):
+            if path == root:
+                continue
+            parent = totals.get(os.path.dirname(path))
+            if parent is not None:
+                parent[0] += totals[path][0]
+                parent[1] += totals[path][1]
+
+        largest_dirs = heapq.nlargest(self.top_n, totals.items(), key=lambda item: item[1][0])
+        largest_files = []
+        for path, record in records.items():
+            for name, size in record.big_files:
+                item = (size, os.path.join(path, name))
+                if len(largest_files) < self.top_n:
+                    heapq.heappush(largest_files, item)
+                elif item > largest_files[0]:
+                    heapq.heapreplace(largest_files, item)
+        largest_files.sort(reverse=True)
+
+        total_bytes, total_files = totals.get(root, [0, 0])
+        return {
+            "root": root,
+            "bytes": total_bytes,
+            "files": total_files,
+            "directories": len(records),
+            "largest_directories": [
+                {"path": path, "bytes": size, "files": files, "own_bytes": records[path].own_bytes}
+                for path, (size, files) in largest_dirs
+            ],
+            "largest_files": [{"path": path, "bytes": size} for size, path in largest_files],
+        }
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
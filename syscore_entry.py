@@ -5,35 +5,609 @@ Created by Anubhav Mohandas
 Collects detailed information about system state and stores it in a file.
 """
 
+import time
+_IMPORT_STARTED = time.perf_counter()
+
 import os
 import sys
 import platform
 import datetime
-import subprocess
 import socket
 import json
-import time
+import argparse
+import threading
+import heapq
+import queue
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from syscore_sink import NdjsonSink, parse_size, parse_duration
+from syscore_packages import PackageInventory
+from syscore_sockets import listening_sockets, linux_firewall_status, summarize_connections
 try:
     import psutil
-    from tabulate import tabulate
-    from colorama import Fore, Back, Style, init
 except ImportError:
-    print("Missing required packages. Installing...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "psutil", "tabulate", "colorama"])
-    import psutil
-    from tabulate import tabulate
-    from colorama import Fore, Back, Style, init
+    # Never pip install at runtime: it is slow, needs network access and
+    # hangs on air-gapped hosts
+    sys.exit("SysCore Sentry requires psutil. Install it with: pip install psutil (or run install.sh)")
+
+_IMPORT_FINISHED = time.perf_counter()
+
+class _NoColor:
+    """Stand-in for colorama's Fore/Back/Style until colors are initialized"""
+    def __getattr__(self, name):
+        return ""
+
+# colorama and tabulate are only needed for human-facing output, so they are
+# imported on demand; headless runs never load them
+Fore = Back = Style = _NoColor()
+
+def init_colors():
+    """Import and initialize colorama for colored terminal output"""
+    global Fore, Back, Style
+    try:
+        from colorama import Fore, Back, Style, init
+    except ImportError:
+        # Colors are cosmetic; keep the plain placeholders
+        return
+    init(autoreset=True)
+
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+# Reports store raw numbers; this maps field names to their unit so that
+# display_summary knows how to format them for humans
+REPORT_SCHEMA_VERSION = 2
+FIELD_UNITS = {
+    "collection_time": "timestamp",
+    "boot_time": "timestamp",
+    "create_time": "timestamp",
+    "started": "timestamp",
+    "total_memory": "bytes",
+    "available_memory": "bytes",
+    "used_memory": "bytes",
+    "swap_total": "bytes",
+    "swap_used": "bytes",
+    "total_size": "bytes",
+    "used": "bytes",
+    "free": "bytes",
+    "read_bytes": "bytes",
+    "write_bytes": "bytes",
+    "bytes_sent": "bytes",
+    "bytes_recv": "bytes",
+    "memory_percent": "percent",
+    "swap_percent": "percent",
+    "usage_percent": "percent",
+    "cpu_percent": "percent",
+    "cpu_percent_overall": "percent",
+    "cpu_freq_current": "mhz",
+    "cpu_freq_min": "mhz",
+    "cpu_freq_max": "mhz",
+    "sample_window": "seconds",
+    "read_bytes_per_sec": "bytes_per_sec",
+    "write_bytes_per_sec": "bytes_per_sec",
+    "bytes_sent_per_sec": "bytes_per_sec",
+    "bytes_recv_per_sec": "bytes_per_sec",
+    "busy_percent": "percent",
+}
+
+def metric_key(name, **labels):
+    """Build a flat metric key such as disk_usage_percent{mountpoint="/"}"""
+    if not labels:
+        return name
+    label_text = ",".join(
+        '{}="{}"'.format(label, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for label, value in sorted(labels.items())
+    )
+    return f"{name}{{{label_text}}}"
+
+def format_bytes(value):
+    """Format a byte count with a binary unit suffix"""
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if abs(value) < 1024 or unit == "TB":
+            return f"{value:.2f} {unit}" if unit != "B" else f"{value} B"
+        value /= 1024
+
+def format_timestamp(value):
+    """Format epoch seconds as local time"""
+    return datetime.datetime.fromtimestamp(value).strftime("%Y-%m-%d %H:%M:%S")
+
+def format_value(key, value):
+    """Format a raw report value for display based on its field unit"""
+    if value is None:
+        return "N/A"
+    unit = FIELD_UNITS.get(key)
+    if unit == "bytes":
+        return format_bytes(value)
+    if unit == "bytes_per_sec":
+        return format_bytes(value) + "/s"
+    if unit == "percent":
+        return f"{value:.1f}%"
+    if unit == "timestamp":
+        return format_timestamp(value)
+    if unit == "mhz":
+        return f"{value:.2f} MHz"
+    if unit == "seconds":
+        return f"{value:.2f}s"
+    return value
+
+class CpuSampler:
+    """Derive per-core and overall CPU usage from a single cpu_times delta window
+
+    read_busy_total returns per-core (busy, total) counters; it defaults to
+    psutil.cpu_times and can be swapped for the /proc fast path.
+    """
+
+    def __init__(self, window=1.0, read_busy_total=None):
+        self.window = window
+        self.read_busy_total = read_busy_total or self.psutil_busy_total
+        self._last_times = None
+        self._last_sample = None
+
+    @staticmethod
+    def psutil_busy_total():
+        """Per-core (busy, total) seconds from psutil.cpu_times"""
+        cores = []
+        for times in psutil.cpu_times(percpu=True):
+            total = sum(times)
+            # guest time is already accounted for in user/nice on Linux
+            total -= getattr(times, "guest", 0.0) + getattr(times, "guest_nice", 0.0)
+            idle = times.idle + getattr(times, "iowait", 0.0)
+            cores.append((total - idle, total))
+        return cores
+
+    def prime(self):
+        """Take the baseline cpu_times snapshot"""
+        self._last_times = self.read_busy_total()
+        self._last_sample = time.monotonic()
+
+    def sample(self):
+        """Return (per_core_percent, overall_percent, window_seconds)
+
+        The first call primes the counters and waits one window. Later calls
+        measure over the interval since the previous call without sleeping.
+        """
+        if self._last_times is None:
+            self.prime()
+            time.sleep(self.window)
+
+        times = self.read_busy_total()
+        now = time.monotonic()
+        elapsed = now - self._last_sample
+
+        per_core = []
+        busy_total = 0.0
+        all_total = 0.0
+        for before, after in zip(self._last_times, times):
+            busy, total = self._busy_delta(before, after)
+            busy_total += busy
+            all_total += total
+            per_core.append(round(100.0 * busy / total, 1) if total > 0 else 0.0)
+        overall = round(100.0 * busy_total / all_total, 1) if all_total > 0 else 0.0
+
+        self._last_times = times
+        self._last_sample = now
+        return per_core, overall, elapsed
+
+    @staticmethod
+    def _busy_delta(before, after):
+        """Return (busy, total) time spent between two (busy, total) snapshots of a core"""
+        busy_before, total_before = before
+        busy_after, total_after = after
+        total = total_after - total_before
+        # Counters can go backwards slightly on some kernels
+        busy = min(max(0.0, busy_after - busy_before), max(0.0, total))
+        return busy, max(0.0, total)
+
+
+class CounterRates:
+    """Per-second rates between successive snapshots of cumulative per-device counters
+
+    Works like CpuSampler: the first call primes the counters and waits one
+    window, later calls measure over the real monotonic time since the
+    previous call without sleeping.
+    """
+
+    # Counters are 64-bit in psutil, but some kernels and drivers still wrap at 32 bits
+    WRAP_32 = 2**32
+
+    def __init__(self, read_counters, window=1.0):
+        self.read_counters = read_counters
+        self.window = window
+        self._previous = None
+        self._previous_time = None
+
+    def _snapshot(self):
+        """Read the counters as {device: {field: value}}"""
+        return {
+            device: counters if isinstance(counters, dict) else counters._asdict()
+            for device, counters in (self.read_counters() or {}).items()
+        }
+
+    @classmethod
+    def _delta(cls, before, after):
+        """Counter increase, allowing for 32-bit wraps and resets"""
+        if after >= before:
+            return after - before
+        if before < cls.WRAP_32:
+            wrapped = after + cls.WRAP_32 - before
+            # A genuine wrap leaves a small increase; anything else is a reset
+            if wrapped < cls.WRAP_32 // 2:
+                return wrapped
+        # Counter was reset (driver reload, device re-attached): count from zero
+        return after
+
+    def sample(self):
+        """Return ({device: {field: per-second rate}}, elapsed seconds)"""
+        if self._previous is None:
+            self._previous = self._snapshot()
+            self._previous_time = time.monotonic()
+            time.sleep(self.window)
+
+        current = self._snapshot()
+        now = time.monotonic()
+        elapsed = now - self._previous_time
+
+        rates = {}
+        if elapsed > 0:
+            for device, counters in current.items():
+                before = self._previous.get(device)
+                if before is None:
+                    continue  # new device, no baseline yet
+                rates[device] = {
+                    field: self._delta(before[field], value) / elapsed
+                    for field, value in counters.items()
+                    if field in before
+                }
+
+        self._previous = current
+        self._previous_time = now
+        return rates, elapsed
+
+
+class CollectorPool:
+    """Worker threads for collectors that never hold up interpreter exit
+
+    ThreadPoolExecutor joins its workers at exit, so a collector that hung
+    past its timeout would still keep a one-shot run alive until it
+    returned. These workers are daemon threads and are simply abandoned.
+    """
+
+    def __init__(self, max_workers, thread_name_prefix="collector"):
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def _worker(self):
+        while True:
+            future, fn, args = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def submit(self, fn, *args):
+        future = Future()
+        self._queue.put((future, fn, args))
+        with self._lock:
+            if len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._worker, daemon=True,
+                                          name=f"{self.thread_name_prefix}_{len(self._threads)}")
+                thread.start()
+                self._threads.append(thread)
+        return future
+
+
+class ProcessTable:
+    """Incremental process index keyed by (pid, create_time)
+
+    psutil.Process handles are kept between samples so per-process CPU% is a
+    real delta. Static fields are read once when a process appears; only the
+    dynamic fields are re-read on later samples. Each sample also records the
+    processes that spawned or exited and the dynamic fields that changed.
+    """
+
+    STATIC_ATTRS = ['pid', 'name', 'username', 'create_time', 'cmdline']
+    DYNAMIC_ATTRS = ['status', 'cpu_percent', 'memory_percent']
+    # Read in the same oneshot call when an accounting subsystem is attached
+    ACCOUNTING_ATTRS = ['cpu_times', 'memory_info', 'io_counters']
+
+    # Minimum change before a dynamic counter is reported as changed
+    CHANGE_TOLERANCE = {
+        'cpu_percent': 0.5,
+        'memory_percent': 0.05,
+    }
+
+    def __init__(self, prime_window=1.0, pids=None, process_factory=None):
+        self.prime_window = prime_window
+        # Injectable so benchmarks can run against a synthetic process table
+        self._pids = pids or psutil.pids
+        self._process_factory = process_factory or psutil.Process
+        self._entries = {}
+        self.last_delta = {"spawned": [], "exited": [], "changed": []}
+        # Optional syscore_accounting.ProcessAccounting fed on every sample
+        self.accounting = None
+
+    def _track(self, pid):
+        """Start tracking a pid, reading its static fields and priming its CPU counter"""
+        try:
+            proc = self._process_factory(pid)
+            static = proc.as_dict(attrs=self.STATIC_ATTRS)
+            proc.cpu_percent(interval=None)
+        except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
+            return None
+        static['cmdline'] = ' '.join(static['cmdline']) if static['cmdline'] else ""
+        entry = {"proc": proc, "static": static, "dynamic": {}, "reported": {}}
+        self._entries[pid] = entry
+        return entry
+
+    def _reused(self, pid, entry):
+        """True when pid now belongs to a different process than the tracked one
+
+        Handles cache their create_time, so a fresh one is needed to notice
+        the pid being reused.
+        """
+        try:
+            create_time = self._process_factory(pid).create_time()
+        except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
+            # Exits are picked up by the refresh; without access reuse can't be told
+            return False
+        return create_time != entry["static"]["create_time"]
+
+    @staticmethod
+    def _key(entry):
+        """Identity of a tracked process; pids alone are reused"""
+        return [entry["static"]["pid"], entry["static"]["create_time"]]
+
+    def _changed_fields(self, entry):
+        """Return dynamic fields that moved beyond tolerance since they were last reported"""
+        changed = {}
+        for field, value in entry["dynamic"].items():
+            reported = entry["reported"].get(field)
+            tolerance = self.CHANGE_TOLERANCE.get(field)
+            if tolerance is not None and value is not None and reported is not None:
+                if abs(value - reported) >= tolerance:
+                    changed[field] = value
+            elif value != reported:
+                changed[field] = value
+        entry["reported"].update(changed)
+        return changed
+
+    def _usage(self, entry):
+        """Pop the accounting counters out of an entry's dynamic fields"""
+        dynamic = entry["dynamic"]
+        cpu_times = dynamic.pop('cpu_times')
+        memory_info = dynamic.pop('memory_info')
+        io_counters = dynamic.pop('io_counters')
+        return (
+            tuple(self._key(entry)),
+            entry["static"]["name"],
+            cpu_times.user + cpu_times.system if cpu_times else None,
+            io_counters.read_bytes if io_counters else None,
+            io_counters.write_bytes if io_counters else None,
+            memory_info.rss if memory_info else None,
+        )
+
+    def sample(self, top_n=50):
+        """Refresh the index and return the top_n processes by CPU usage"""
+        first_sample = not self._entries
+        live = set(self._pids())
+        exited = []
+        spawned = []
+        for pid in [pid for pid in self._entries if pid not in live]:
+            entry = self._entries.pop(pid)
+            exited.append({"key": self._key(entry), "name": entry["static"]["name"]})
+        for pid in live:
+            entry = self._entries.get(pid)
+            if entry is not None and self._reused(pid, entry):
+                del self._entries[pid]
+                exited.append({"key": self._key(entry), "name": entry["static"]["name"]})
+                entry = None
+            if entry is None:
+                entry = self._track(pid)
+                if entry is not None:
+                    spawned.append(pid)
+
+        if first_sample and self.prime_window:
+            # Without a baseline every process would report 0.0% CPU
+            time.sleep(self.prime_window)
+
+        processes = []
+        changed = []
+        usages = []
+        spawned_set = set(spawned)
+        accounting = self.accounting
+        attrs = self.DYNAMIC_ATTRS + self.ACCOUNTING_ATTRS if accounting is not None else self.DYNAMIC_ATTRS
+        for pid, entry in list(self._entries.items()):
+            try:
+                entry["dynamic"] = entry["proc"].as_dict(attrs=attrs)
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                del self._entries[pid]
+                if pid in spawned_set:
+                    spawned_set.discard(pid)
+                else:
+                    exited.append({"key": self._key(entry), "name": entry["static"]["name"]})
+                continue
+            except psutil.AccessDenied:
+                # Keep the previous values rather than dropping a process that is still alive
+                denied = True
+                if not entry["dynamic"]:
+                    entry["dynamic"] = dict.fromkeys(self.DYNAMIC_ATTRS)
+            else:
+                denied = False
+            if accounting is not None:
+                if denied:
+                    usages.append((tuple(self._key(entry)), entry["static"]["name"], None, None, None, None))
+                else:
+                    usages.append(self._usage(entry))
+            if pid not in spawned_set:
+                fields = self._changed_fields(entry)
+                if fields:
+                    changed.append({"key": self._key(entry), **fields})
+            processes.append(entry)
+
+        spawned_info = []
+        for pid in spawned:
+            if pid in spawned_set:
+                entry = self._entries[pid]
+                entry["reported"] = dict(entry["dynamic"])
+                spawned_info.append({"key": self._key(entry), **entry["static"], **entry["dynamic"]})
+        self.last_delta = {"spawned": spawned_info, "exited": exited, "changed": changed}
+        if accounting is not None:
+            accounting.update(time.time(), usages, [tuple(process["key"]) for process in exited])
+
+        # Sort by CPU usage (highest first) without sorting the whole table
+        top = heapq.nlargest(top_n, processes, key=lambda e: e["dynamic"]["cpu_percent"] or 0.0)
+        return [{**entry["static"], **entry["dynamic"]} for entry in top]
+
+    def top(self, n, key="cpu_percent", reverse=True):
+        """Return n processes from the last sample ordered by any static or dynamic field"""
+        text_field = key in ("name", "username", "status", "cmdline")
+
+        def sort_value(entry):
+            value = entry["dynamic"].get(key, entry["static"].get(key))
+            if value is None:
+                return "" if text_field else 0.0
+            return value.lower() if text_field else value
+
+        pick = heapq.nlargest if reverse else heapq.nsmallest
+        # Copy the values first; a concurrent sample may add or remove entries
+        return [{**entry["static"], **entry["dynamic"]}
+                for entry in pick(n, list(self._entries.values()), key=sort_value)]
 
-# Initialize colorama
-init(autoreset=True)
 
 class SystemMonitor:
-    def __init__(self, output_file="system_health_report.json"):
+    # Collector name -> method, in report order
+    COLLECTORS = {
+        "basic": "collect_basic_system_info",
+        "memory": "collect_memory_info",
+        "disk": "collect_disk_info",
+        "network": "collect_network_info",
+        "process": "collect_process_info",
+        "cgroup": "collect_cgroup_info",
+        "user": "collect_user_info",
+        "application": "collect_application_info",
+        "cpu": "collect_cpu_info",
+        "security": "collect_security_info",
+    }
+
+    # Per-collector timeouts in seconds; collectors not listed use DEFAULT_TIMEOUT
+    COLLECTOR_TIMEOUTS = {
+        "application": 60,
+        "security": 30,
+    }
+    DEFAULT_TIMEOUT = 15
+
+    # Report keys written by each collector
+    COLLECTOR_SECTIONS = {
+        "basic": ["basic_info"],
+        "memory": ["memory_info"],
+        "disk": ["disk_info", "disk_io_info", "disk_io_rates"],
+        "network": ["network_info"],
+        "process": ["process_info", "process_accounting"],
+        "cgroup": ["cgroup_info"],
+        "user": ["user_info"],
+        "application": ["application_info"],
+        "cpu": ["cpu_info"],
+        "security": ["security_info"],
+    }
+
+    # Default resampling intervals in seconds for watch mode
+    WATCH_INTERVALS = {
+        "cpu": 1,
+        "memory": 1,
+        "network": 5,
+        "process": 5,
+        "cgroup": 5,
+        "disk": 30,
+        "user": 60,
+        "security": 300,
+        "basic": 3600,
+        "application": 3600,
+    }
+
+    def __init__(self, output_file="system_health_report.json", max_workers=None, cpu_window=1.0, quiet=False,
+                 include_packages=False, cache_dir=None, hostname=None, procfs=False, cgroup_root=None):
         self.output_file = output_file
-        self.system_info = {}
-        self.collection_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-    
+        self.hostname = hostname or socket.gethostname()
+        self.max_workers = max_workers
+        self.quiet = quiet
+        self.include_packages = include_packages
+        self.package_inventory = PackageInventory(cache_dir=cache_dir)
+        # Optional syscore_procfs.ProcfsReader for the hot CPU, memory, disk and network counters
+        self.procfs = None
+        if procfs:
+            import syscore_procfs
+            if syscore_procfs.available():
+                self.procfs = syscore_procfs.ProcfsReader()
+        if self.procfs is not None:
+            self.cpu_sampler = CpuSampler(window=cpu_window, read_busy_total=self.procfs.cpu_busy_total)
+            self.disk_rates = CounterRates(self.procfs.disk_counters, window=cpu_window)
+            self.net_rates = CounterRates(self.procfs.net_counters, window=cpu_window)
+        else:
+            self.cpu_sampler = CpuSampler(window=cpu_window)
+            self.disk_rates = CounterRates(lambda: psutil.disk_io_counters(perdisk=True), window=cpu_window)
+            self.net_rates = CounterRates(lambda: psutil.net_io_counters(pernic=True), window=cpu_window)
+        self.process_table = ProcessTable(prime_window=cpu_window)
+        # syscore_cgroup.CgroupSampler, created on the first cgroup collection
+        self.cgroup_root = cgroup_root
+        self.cgroup_sampler = None
+        self.system_info = {"schema_version": REPORT_SCHEMA_VERSION}
+        self.collection_time = time.time()
+        self._executor = None
+        self._running = {}
+        self._output_lock = threading.Lock()
+        # Optional syscore_ringbuf.MetricHistory, syscore_alerts.AlertEngine and
+        # syscore_exporter.MetricsExporter fed by watch()
+        self.history = None
+        self.alerts = None
+        self.exporter = None
+        self.accounting_windows = None
+        # Options for syscore_sockets.summarize_connections; None lists every connection
+        self.connection_summary = None
+        # Optional syscore_diskscan.DiskScanner run on partitions above disk_scan_threshold percent
+        self.disk_scanner = None
+        self.disk_scan_threshold = None
+        self.disk_scan_interval = None
+        self._disk_scans = {}
+
+    def enable_disk_scan(self, threshold=90.0, top_n=10, interval=900, index_path=None):
+        """Find the largest directories and files on partitions at least threshold percent full
+
+        Each partition is rescanned at most once per interval seconds; the
+        last result is reported in between.
+        """
+        from syscore_diskscan import DiskScanner
+        self.disk_scanner = DiskScanner(index_path=index_path, top_n=top_n)
+        self.disk_scan_threshold = threshold
+        self.disk_scan_interval = interval
+        # A first scan of a large filesystem can take a while
+        self.COLLECTOR_TIMEOUTS = dict(self.COLLECTOR_TIMEOUTS, disk=600)
+
+    def enable_connection_summary(self, raw_limit=0, top=20):
+        """Report connection counts instead of one record per socket, keeping at most raw_limit sockets"""
+        self.connection_summary = {"raw_limit": raw_limit, "top": top}
+
+    def enable_accounting(self, windows):
+        """Accumulate per-process usage and report top offenders over {label: seconds} windows"""
+        from syscore_accounting import ProcessAccounting
+        # Ten buckets across the shortest window keeps its edges reasonably sharp
+        bucket_seconds = min(60, max(1, min(windows.values()) / 10))
+        self.process_table.accounting = ProcessAccounting(retention=max(windows.values()),
+                                                          bucket_seconds=bucket_seconds)
+        self.accounting_windows = windows
+
+    def _status(self, message):
+        """Print a progress message unless running quietly"""
+        if not self.quiet:
+            # colorama splits writes at escape codes, so serialize whole lines
+            with self._output_lock:
+                print(message)
+
 
     def display_banner(self):
         """Display a colorful banner for the tool"""
@@ -58,13 +632,13 @@ class SystemMonitor:
 {Fore.CYAN}╚═══════════════════════════════════════════════════════════════════════════════════╝
     """
         print(banner)
-        print(f"{Fore.YELLOW}[*] {Fore.WHITE}System scan initiated at: {Fore.GREEN}{self.collection_time}")
+        print(f"{Fore.YELLOW}[*] {Fore.WHITE}System scan initiated at: {Fore.GREEN}{format_timestamp(self.collection_time)}")
         print(f"{Fore.YELLOW}[*] {Fore.WHITE}Running on: {Fore.GREEN}{platform.system()} {platform.release()}")
         print()
         
     def collect_basic_system_info(self):
         """Collect basic system information"""
-        print(f"{Fore.BLUE}[+] {Fore.WHITE}Collecting basic system information...")
+        self._status(f"{Fore.BLUE}[+] {Fore.WHITE}Collecting basic system information...")
         
         self.system_info["basic_info"] = {
             "collection_time": self.collection_time,
@@ -75,29 +649,33 @@ class SystemMonitor:
             "architecture": platform.machine(),
             "processor": platform.processor(),
             "python_version": platform.python_version(),
-            "boot_time": datetime.datetime.fromtimestamp(psutil.boot_time()).strftime("%Y-%m-%d %H:%M:%S")
+            "boot_time": psutil.boot_time()
         }
         
     def collect_memory_info(self):
         """Collect memory usage information"""
-        print(f"{Fore.BLUE}[+] {Fore.WHITE}Collecting memory information...")
+        self._status(f"{Fore.BLUE}[+] {Fore.WHITE}Collecting memory information...")
         
+        if self.procfs is not None:
+            self.system_info["memory_info"] = self.procfs.memory()
+            return
+
         virtual_memory = psutil.virtual_memory()
         swap_memory = psutil.swap_memory()
         
         self.system_info["memory_info"] = {
-            "total_memory": f"{virtual_memory.total / (1024**3):.2f} GB",
-            "available_memory": f"{virtual_memory.available / (1024**3):.2f} GB",
-            "used_memory": f"{virtual_memory.used / (1024**3):.2f} GB",
-            "memory_percent": f"{virtual_memory.percent}%",
-            "swap_total": f"{swap_memory.total / (1024**3):.2f} GB",
-            "swap_used": f"{swap_memory.used / (1024**3):.2f} GB",
-            "swap_percent": f"{swap_memory.percent}%"
+            "total_memory": virtual_memory.total,
+            "available_memory": virtual_memory.available,
+            "used_memory": virtual_memory.used,
+            "memory_percent": float(virtual_memory.percent),
+            "swap_total": swap_memory.total,
+            "swap_used": swap_memory.used,
+            "swap_percent": float(swap_memory.percent)
         }
         
     def collect_disk_info(self):
         """Collect disk usage information"""
-        print(f"{Fore.BLUE}[+] {Fore.WHITE}Collecting disk information...")
+        self._status(f"{Fore.BLUE}[+] {Fore.WHITE}Collecting disk information...")
         
         partitions = []
         for partition in psutil.disk_partitions():
@@ -107,30 +685,65 @@ class SystemMonitor:
                     "device": partition.device,
                     "mountpoint": partition.mountpoint,
                     "filesystem_type": partition.fstype,
-                    "total_size": f"{usage.total / (1024**3):.2f} GB",
-                    "used": f"{usage.used / (1024**3):.2f} GB",
-                    "free": f"{usage.free / (1024**3):.2f} GB",
-                    "usage_percent": f"{usage.percent}%"
+                    "total_size": usage.total,
+                    "used": usage.used,
+                    "free": usage.free,
+                    "usage_percent": float(usage.percent)
                 }
                 partitions.append(partition_info)
             except PermissionError:
                 continue
         
+        if self.disk_scanner is not None:
+            for partition_info in partitions:
+                if partition_info["usage_percent"] >= self.disk_scan_threshold:
+                    partition_info["hot_spots"] = self._disk_hot_spots(partition_info["mountpoint"])
         self.system_info["disk_info"] = partitions
         
         # IO statistics
-        io_counters = psutil.disk_io_counters()
+        if self.procfs is not None:
+            io_counters = self.procfs.disk_totals()
+        else:
+            io_counters = psutil.disk_io_counters()
+            io_counters = io_counters._asdict() if io_counters else None
         if io_counters:
             self.system_info["disk_io_info"] = {
-                "read_count": io_counters.read_count,
-                "write_count": io_counters.write_count,
-                "read_bytes": f"{io_counters.read_bytes / (1024**3):.2f} GB",
-                "write_bytes": f"{io_counters.write_bytes / (1024**3):.2f} GB"
+                "read_count": io_counters["read_count"],
+                "write_count": io_counters["write_count"],
+                "read_bytes": io_counters["read_bytes"],
+                "write_bytes": io_counters["write_bytes"]
             }
         
+        # Per-device rates over the interval since the previous sample
+        rates, elapsed = self.disk_rates.sample()
+        device_rates = {}
+        for device, counters in rates.items():
+            device_rates[device] = {
+                "read_bytes_per_sec": round(counters["read_bytes"], 1),
+                "write_bytes_per_sec": round(counters["write_bytes"], 1),
+                "read_iops": round(counters["read_count"], 2),
+                "write_iops": round(counters["write_count"], 2)
+            }
+            if "busy_time" in counters:
+                # busy_time is in milliseconds
+                device_rates[device]["busy_percent"] = round(min(100.0, counters["busy_time"] / 10), 1)
+        self.system_info["disk_io_rates"] = {"interval": round(elapsed, 3), "devices": device_rates}
+        
+    def _disk_hot_spots(self, mountpoint):
+        """Latest hot-spot scan of a mount point, rescanning once it is older than disk_scan_interval"""
+        previous = self._disk_scans.get(mountpoint)
+        if previous is not None and time.time() - previous["scanned_at"] < self.disk_scan_interval:
+            return previous
+        try:
+            result = self.disk_scanner.scan(mountpoint)
+        except OSError as e:
+            return {"error": f"Unable to scan {mountpoint}: {str(e)}"}
+        self._disk_scans[mountpoint] = result
+        return result
+
     def collect_network_info(self):
         """Collect network information"""
-        print(f"{Fore.BLUE}[+] {Fore.WHITE}Collecting network information...")
+        self._status(f"{Fore.BLUE}[+] {Fore.WHITE}Collecting network information...")
         
         # Network interfaces
         interfaces = []
@@ -146,58 +759,101 @@ class SystemMonitor:
         
         # Network connections
         connections = []
-        for conn in psutil.net_connections(kind='inet'):
-            try:
-                connections.append({
-                    "proto": "TCP" if conn.type == socket.SOCK_STREAM else "UDP",
-                    "local_address": f"{conn.laddr.ip}:{conn.laddr.port}" if hasattr(conn, 'laddr') and conn.laddr else "N/A",
-                    "remote_address": f"{conn.raddr.ip}:{conn.raddr.port}" if hasattr(conn, 'raddr') and conn.raddr else "N/A",
-                    "status": conn.status if hasattr(conn, 'status') else "N/A",
-                    "pid": conn.pid if hasattr(conn, 'pid') and conn.pid else "N/A"
-                })
-            except (AttributeError, KeyError):
-                pass
+        connection_summary = None
+        if self.connection_summary is not None:
+            # Busy servers have far too many sockets to list; count them instead
+            connection_summary = summarize_connections(**self.connection_summary)
+            connections = connection_summary.pop("raw", [])
+        else:
+            for conn in psutil.net_connections(kind='inet'):
+                try:
+                    connections.append({
+                        "proto": "TCP" if conn.type == socket.SOCK_STREAM else "UDP",
+                        "local_address": f"{conn.laddr.ip}:{conn.laddr.port}" if hasattr(conn, 'laddr') and conn.laddr else None,
+                        "remote_address": f"{conn.raddr.ip}:{conn.raddr.port}" if hasattr(conn, 'raddr') and conn.raddr else None,
+                        "status": conn.status if hasattr(conn, 'status') else None,
+                        "pid": conn.pid if hasattr(conn, 'pid') and conn.pid else None
+                    })
+                except (AttributeError, KeyError):
+                    pass
         
         # Network IO statistics
-        io_counters = psutil.net_io_counters()
+        if self.procfs is not None:
+            io_counters = self.procfs.net_totals()
+        else:
+            io_counters = psutil.net_io_counters()._asdict()
         network_stats = {
-            "bytes_sent": f"{io_counters.bytes_sent / (1024**2):.2f} MB",
-            "bytes_recv": f"{io_counters.bytes_recv / (1024**2):.2f} MB",
-            "packets_sent": io_counters.packets_sent,
-            "packets_recv": io_counters.packets_recv,
-            "error_in": io_counters.errin,
-            "error_out": io_counters.errout,
-            "drop_in": io_counters.dropin,
-            "drop_out": io_counters.dropout
+            "bytes_sent": io_counters["bytes_sent"],
+            "bytes_recv": io_counters["bytes_recv"],
+            "packets_sent": io_counters["packets_sent"],
+            "packets_recv": io_counters["packets_recv"],
+            "error_in": io_counters["errin"],
+            "error_out": io_counters["errout"],
+            "drop_in": io_counters["dropin"],
+            "drop_out": io_counters["dropout"]
         }
         
+        # Per-NIC rates over the interval since the previous sample
+        rates, elapsed = self.net_rates.sample()
+        nic_rates = {}
+        for nic, counters in rates.items():
+            nic_rates[nic] = {
+                "bytes_sent_per_sec": round(counters["bytes_sent"], 1),
+                "bytes_recv_per_sec": round(counters["bytes_recv"], 1),
+                "packets_sent_per_sec": round(counters["packets_sent"], 2),
+                "packets_recv_per_sec": round(counters["packets_recv"], 2),
+                "errors_per_sec": round(counters["errin"] + counters["errout"], 2),
+                "drops_per_sec": round(counters["dropin"] + counters["dropout"], 2)
+            }
+        
         self.system_info["network_info"] = {
             "interfaces": interfaces,
             "connections": connections,
-            "statistics": network_stats
+            "statistics": network_stats,
+            "rates": {"interval": round(elapsed, 3), "interfaces": nic_rates}
         }
+        if connection_summary is not None:
+            self.system_info["network_info"]["connection_summary"] = connection_summary
         
     def collect_process_info(self):
         """Collect information about running processes"""
-        print(f"{Fore.BLUE}[+] {Fore.WHITE}Collecting process information...")
-        
-        processes = []
-        for proc in psutil.process_iter(['pid', 'name', 'username', 'status', 'cpu_percent', 'memory_percent', 'create_time', 'cmdline']):
-            try:
-                process_info = proc.info
-                process_info['create_time'] = datetime.datetime.fromtimestamp(process_info['create_time']).strftime("%Y-%m-%d %H:%M:%S")
-                process_info['cmdline'] = ' '.join(proc.cmdline()) if proc.cmdline() else ""
-                processes.append(process_info)
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                pass
+        self._status(f"{Fore.BLUE}[+] {Fore.WHITE}Collecting process information...")
         
-        # Sort by CPU usage (highest first)
-        processes = sorted(processes, key=lambda p: p['cpu_percent'], reverse=True)
-        self.system_info["process_info"] = processes[:50]  # Limiting to top 50 to keep file size reasonable
+        # Limiting to top 50 to keep file size reasonable
+        processes = self.process_table.sample(top_n=50)
+        if self.cgroup_sampler is not None:
+            from syscore_accounting import read_cgroup
+            # The cgroup collector maps every pid from cgroup.procs; pids newer than that are read directly
+            pid_map = self.cgroup_sampler.reader.pid_map
+            for process in processes:
+                cgroup = pid_map.get(process["pid"])
+                process["cgroup"] = cgroup if cgroup is not None else read_cgroup(process["pid"])
+        self.system_info["process_info"] = processes
+        if self.process_table.accounting is not None:
+            self.system_info["process_accounting"] = self.process_table.accounting.report(self.accounting_windows)
         
+    def collect_cgroup_info(self):
+        """Collect per-cgroup CPU, memory and IO usage from the cgroup v2 hierarchy"""
+        self._status(f"{Fore.BLUE}[+] {Fore.WHITE}Collecting cgroup information...")
+
+        if self.cgroup_sampler is None:
+            from syscore_cgroup import CgroupReader, CgroupSampler
+            try:
+                reader = CgroupReader(root=self.cgroup_root)
+            except RuntimeError as e:
+                self.system_info["cgroup_info"] = {"error": str(e)}
+                return
+            self.cgroup_sampler = CgroupSampler(reader, window=self.cpu_sampler.window)
+        cgroups, elapsed = self.cgroup_sampler.sample()
+        self.system_info["cgroup_info"] = {
+            "root": self.cgroup_sampler.reader.root,
+            "interval": round(elapsed, 3),
+            "cgroups": cgroups,
+        }
+
     def collect_user_info(self):
         """Collect information about logged-in users"""
-        print(f"{Fore.BLUE}[+] {Fore.WHITE}Collecting user information...")
+        self._status(f"{Fore.BLUE}[+] {Fore.WHITE}Collecting user information...")
         
         users = []
         for user in psutil.users():
@@ -205,93 +861,54 @@ class SystemMonitor:
                 "name": user.name,
                 "terminal": user.terminal,
                 "host": user.host,
-                "started": datetime.datetime.fromtimestamp(user.started).strftime("%Y-%m-%d %H:%M:%S")
+                "started": user.started
             })
         
         self.system_info["user_info"] = users
         
     def collect_application_info(self):
         """Collect information about installed applications"""
-        print(f"{Fore.BLUE}[+] {Fore.WHITE}Collecting application information...")
+        self._status(f"{Fore.BLUE}[+] {Fore.WHITE}Collecting application information...")
         
-        installed_apps = []
-        
-        # This approach varies by OS
         try:
-            if platform.system() == "Windows":
-                # For Windows
-                import winreg
-                key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall")
-                for i in range(0, winreg.QueryInfoKey(key)[0]):
-                    try:
-                        subkey_name = winreg.EnumKey(key, i)
-                        subkey = winreg.OpenKey(key, subkey_name)
-                        try:
-                            name = winreg.QueryValueEx(subkey, "DisplayName")[0]
-                            version = winreg.QueryValueEx(subkey, "DisplayVersion")[0]
-                            installed_apps.append({"name": name, "version": version})
-                        except (WindowsError, KeyError):
-                            pass
-                    except (WindowsError):
-                        continue
-            
-            elif platform.system() == "Linux":
-                # For Debian-based Linux
-                try:
-                    output = subprocess.check_output("dpkg --get-selections", shell=True, text=True)
-                    for line in output.splitlines():
-                        package = line.split()[0]
-                        installed_apps.append({"name": package, "version": "N/A"})
-                except subprocess.CalledProcessError:
-                    # For Red Hat-based Linux
-                    try:
-                        output = subprocess.check_output("rpm -qa", shell=True, text=True)
-                        for line in output.splitlines():
-                            installed_apps.append({"name": line, "version": "N/A"})
-                    except subprocess.CalledProcessError:
-                        pass
-            
-            elif platform.system() == "Darwin":  # macOS
-                try:
-                    output = subprocess.check_output("ls -la /Applications", shell=True, text=True)
-                    for line in output.splitlines():
-                        if ".app" in line:
-                            parts = line.split()
-                            if len(parts) > 8:
-                                app_name = parts[8].replace(".app", "")
-                                installed_apps.append({"name": app_name, "version": "N/A"})
-                except subprocess.CalledProcessError:
-                    pass
-        
+            application_info = self.package_inventory.collect(include_packages=self.include_packages)
         except Exception as e:
-            installed_apps.append({"error": f"Unable to fetch application info: {str(e)}"})
+            application_info = {"error": f"Unable to fetch application info: {str(e)}"}
         
-        self.system_info["application_info"] = installed_apps
+        self.system_info["application_info"] = application_info
     
     def collect_cpu_info(self):
         """Collect detailed CPU information"""
-        print(f"{Fore.BLUE}[+] {Fore.WHITE}Collecting CPU information...")
+        self._status(f"{Fore.BLUE}[+] {Fore.WHITE}Collecting CPU information...")
+        
+        per_core, overall, window = self.cpu_sampler.sample()
+        try:
+            cpu_freq = psutil.cpu_freq()
+        except (NotImplementedError, OSError):
+            cpu_freq = None
         
         cpu_info = {
             "physical_cores": psutil.cpu_count(logical=False),
             "total_cores": psutil.cpu_count(logical=True),
-            "cpu_freq_current": f"{psutil.cpu_freq().current:.2f} MHz" if hasattr(psutil.cpu_freq(), 'current') else "N/A",
-            "cpu_freq_min": f"{psutil.cpu_freq().min:.2f} MHz" if hasattr(psutil.cpu_freq(), 'min') else "N/A",
-            "cpu_freq_max": f"{psutil.cpu_freq().max:.2f} MHz" if hasattr(psutil.cpu_freq(), 'max') else "N/A",
-            "cpu_percent_per_core": [f"{percentage}%" for percentage in psutil.cpu_percent(interval=1, percpu=True)],
-            "cpu_percent_overall": f"{psutil.cpu_percent(interval=1)}%"
+            "cpu_freq_current": cpu_freq.current if cpu_freq else None,
+            "cpu_freq_min": cpu_freq.min if cpu_freq else None,
+            "cpu_freq_max": cpu_freq.max if cpu_freq else None,
+            "cpu_percent_per_core": per_core,
+            "cpu_percent_overall": overall,
+            "sample_window": round(window, 3)
         }
         
         self.system_info["cpu_info"] = cpu_info
     
     def collect_security_info(self):
         """Collect basic security information"""
-        print(f"{Fore.BLUE}[+] {Fore.WHITE}Collecting security information...")
+        self._status(f"{Fore.BLUE}[+] {Fore.WHITE}Collecting security information...")
         
         security_info = {}
         
         # Windows-specific security info
         if platform.system() == "Windows":
+            import subprocess
             try:
                 # Check Windows Defender status
                 defender_status = subprocess.check_output(
@@ -311,161 +928,432 @@ class SystemMonitor:
         
         # Linux-specific security info
         elif platform.system() == "Linux":
-            try:
-                # Check iptables
-                iptables_status = subprocess.check_output(
-                    "which iptables && iptables -L | grep -c 'Chain'", 
-                    shell=True, text=True
-                )
-                security_info["firewall_rules"] = f"{iptables_status.strip()} iptables chains found"
-            except:
-                try:
-                    # Try ufw if iptables fails
-                    ufw_status = subprocess.check_output(
-                        "which ufw && ufw status", 
-                        shell=True, text=True
-                    )
-                    security_info["firewall_status"] = ufw_status.strip()
-                except:
-                    security_info["linux_firewall_check"] = "No firewall information available"
+            firewall = linux_firewall_status()
+            if firewall:
+                security_info["firewall"] = firewall
+            else:
+                security_info["linux_firewall_check"] = "No firewall information available"
         
         # Common security checks
         try:
-            # List listening ports
-            if platform.system() == "Windows":
-                netstat_output = subprocess.check_output(
-                    "netstat -ano | findstr LISTENING", 
-                    shell=True, text=True
-                )
-            else:
-                netstat_output = subprocess.check_output(
-                    "netstat -tuln | grep LISTEN", 
-                    shell=True, text=True
-                )
-            
-            # Parse and clean up the output
-            listening_ports = []
-            for line in netstat_output.splitlines():
-                listening_ports.append(line.strip())
-            
-            security_info["listening_ports"] = listening_ports[:20]  # Limit to 20 ports
-        except:
-            security_info["listening_ports_check"] = "Failed to retrieve listening ports"
+            # List listening ports straight from /proc/net (psutil elsewhere)
+            security_info["listening_ports"] = listening_sockets()
+        except Exception as e:
+            security_info["listening_ports_check"] = f"Failed to retrieve listening ports: {str(e)}"
         
         self.system_info["security_info"] = security_info
     
+    def run_collectors(self, names):
+        """Run the named collectors concurrently and record per-collector timings"""
+        started = time.monotonic()
+        self.collection_time = time.time()
+        if self._executor is None:
+            # Kept for the lifetime of the monitor so watch mode reuses warm threads
+            self._executor = CollectorPool(max_workers=self.max_workers or len(self.COLLECTORS))
+
+        stats = {}
+        futures = {}
+        for name in names:
+            previous = self._running.get(name)
+            if previous is not None and not previous.done():
+                # Still stuck in an earlier run; don't pile up another copy
+                stats[name] = {"status": "skipped", "duration": 0.0}
+                continue
+            futures[name] = self._running[name] = self._executor.submit(self._timed_collect, name)
+
+        # Timeouts are measured from the start of the run, not from when we
+        # begin waiting on a given collector
+        for name, future in futures.items():
+            timeout = self.COLLECTOR_TIMEOUTS.get(name, self.DEFAULT_TIMEOUT)
+            remaining = max(0.0, started + timeout - time.monotonic())
+            try:
+                stats[name] = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                stats[name] = {"status": "timeout", "duration": round(time.monotonic() - started, 4)}
+                print(f"{Fore.RED}[-] {Fore.WHITE}Collector '{name}' timed out after {timeout}s", file=sys.stderr)
+
+        self.system_info["collection_stats"] = {
+            "wall_time": round(time.monotonic() - started, 4),
+            "collectors": stats
+        }
+        return stats
+
+    def _timed_collect(self, name):
+        """Run a single collector and return its status and duration"""
+        started = time.monotonic()
+        try:
+            getattr(self, self.COLLECTORS[name])()
+            status = {"status": "ok"}
+        except Exception as e:
+            status = {"status": "error", "error": str(e)}
+            print(f"{Fore.RED}[-] {Fore.WHITE}Collector '{name}' failed: {str(e)}", file=sys.stderr)
+        status["duration"] = round(time.monotonic() - started, 4)
+        return status
+
     def collect_all_info(self):
         """Collect all system information"""
-        self.collect_basic_system_info()
-        self.collect_memory_info()
-        self.collect_disk_info()
-        self.collect_network_info()
-        self.collect_process_info()
-        self.collect_user_info()
-        self.collect_application_info()
-        self.collect_cpu_info()
-        self.collect_security_info()
-        
+        self.run_collectors(list(self.COLLECTORS))
+
+    def metrics(self, names=None):
+        """Flatten numeric readings from the named collectors into {metric key: float}"""
+        names = set(names or self.COLLECTORS)
+        info = self.system_info
+        metrics = {}
+
+        if "cpu" in names and "cpu_info" in info:
+            cpu_info = info["cpu_info"]
+            metrics["cpu_percent"] = cpu_info["cpu_percent_overall"]
+            for core, percent in enumerate(cpu_info["cpu_percent_per_core"]):
+                metrics[metric_key("cpu_core_percent", core=core)] = percent
+
+        if "memory" in names and "memory_info" in info:
+            memory_info = info["memory_info"]
+            metrics["memory_percent"] = memory_info["memory_percent"]
+            metrics["memory_used_bytes"] = memory_info["used_memory"]
+            metrics["memory_available_bytes"] = memory_info["available_memory"]
+            metrics["swap_percent"] = memory_info["swap_percent"]
+            metrics["swap_used_bytes"] = memory_info["swap_used"]
+
+        if "disk" in names and "disk_info" in info:
+            for partition in info["disk_info"]:
+                mountpoint = partition["mountpoint"]
+                metrics[metric_key("disk_usage_percent", mountpoint=mountpoint)] = partition["usage_percent"]
+                metrics[metric_key("disk_used_bytes", mountpoint=mountpoint)] = partition["used"]
+                metrics[metric_key("disk_free_bytes", mountpoint=mountpoint)] = partition["free"]
+            io_info = info.get("disk_io_info")
+            if io_info:
+                metrics["disk_read_bytes_total"] = io_info["read_bytes"]
+                metrics["disk_write_bytes_total"] = io_info["write_bytes"]
+                metrics["disk_reads_total"] = io_info["read_count"]
+                metrics["disk_writes_total"] = io_info["write_count"]
+            for device, device_rates in info.get("disk_io_rates", {}).get("devices", {}).items():
+                for field, value in device_rates.items():
+                    metrics[metric_key(f"disk_{field}", device=device)] = value
+
+        if "network" in names and "network_info" in info:
+            stats = info["network_info"]["statistics"]
+            metrics["net_bytes_sent_total"] = stats["bytes_sent"]
+            metrics["net_bytes_recv_total"] = stats["bytes_recv"]
+            metrics["net_packets_sent_total"] = stats["packets_sent"]
+            metrics["net_packets_recv_total"] = stats["packets_recv"]
+            metrics["net_errors_in_total"] = stats["error_in"]
+            metrics["net_errors_out_total"] = stats["error_out"]
+            metrics["net_drops_in_total"] = stats["drop_in"]
+            metrics["net_drops_out_total"] = stats["drop_out"]
+            summary = info["network_info"].get("connection_summary")
+            if summary is not None:
+                metrics["net_connections"] = summary["total"]
+                for state, count in summary["by_state"].items():
+                    metrics[metric_key("net_connections_by_state", state=state)] = count
+            else:
+                metrics["net_connections"] = len(info["network_info"]["connections"])
+            for nic, nic_rates in info["network_info"]["rates"]["interfaces"].items():
+                for field, value in nic_rates.items():
+                    metrics[metric_key(f"net_{field}", interface=nic)] = value
+
+        if "cgroup" in names and "cgroups" in info.get("cgroup_info", {}):
+            for path, values in info["cgroup_info"]["cgroups"].items():
+                for field in ("cpu_percent", "memory_current", "io_read_bytes_per_sec", "io_write_bytes_per_sec"):
+                    if field in values:
+                        metrics[metric_key(f"cgroup_{field}", cgroup=path)] = values[field]
+
+        if "user" in names and "user_info" in info:
+            metrics["users_logged_in"] = len(info["user_info"])
+
+        return {key: float(value) for key, value in metrics.items() if value is not None}
+
+    def build_sample(self, names, incremental=False):
+        """Build a compact sample record holding the sections refreshed by the named collectors
+
+        With incremental=True the process table is replaced by the spawned,
+        exited and changed processes since the previous sample.
+        """
+        data = {}
+        for name in names:
+            if incremental and name == "process":
+                data["process_delta"] = self.process_table.last_delta
+                if "process_accounting" in self.system_info:
+                    data["process_accounting"] = self.system_info["process_accounting"]
+                continue
+            for key in self.COLLECTOR_SECTIONS[name]:
+                if key in self.system_info:
+                    data[key] = self.system_info[key]
+        return {
+            "ts": round(time.time(), 3),
+            "host": self.hostname,
+            "data": data,
+            "collection_stats": self.system_info.get("collection_stats")
+        }
+
+    def watch(self, emit, intervals=None, max_samples=None, stop_event=None):
+        """Resample collectors on their own intervals and pass each sample to emit()
+
+        Ticks are kept on a fixed grid anchored at the start time, so slow
+        collections don't make the schedule drift. Ticks that were missed
+        because a collection overran are skipped rather than queued. Setting
+        stop_event ends the loop at the next tick.
+        """
+        intervals = intervals or self.WATCH_INTERVALS
+        tick = min(intervals.values())
+        start = time.monotonic()
+        next_due = dict.fromkeys(intervals, start)
+        tick_index = 0
+        skipped_ticks = 0
+        samples = 0
+
+        while (max_samples is None or samples < max_samples) and not (stop_event and stop_event.is_set()):
+            now = time.monotonic()
+            due = [name for name in intervals if next_due[name] <= now]
+            if due:
+                self.run_collectors(due)
+                sampled_at = time.time()
+                metrics = self.metrics(due)
+                if self.history is not None:
+                    self.history.record(sampled_at, metrics)
+                alerts = None
+                if self.alerts is not None:
+                    listening = None
+                    if "security" in due:
+                        listening = self.system_info.get("security_info", {}).get("listening_ports")
+                    alerts = self.alerts.evaluate(sampled_at, metrics, listening)
+                if self.exporter is not None:
+                    # Export every section's latest values, not just the ones refreshed this tick
+                    self.exporter.update(self.metrics(intervals), sampled_at)
+                for name in due:
+                    interval = intervals[name]
+                    next_due[name] = start + (int((now - start) // interval) + 1) * interval
+                sample = self.build_sample(due, incremental=True)
+                sample["metrics"] = metrics
+                sample["skipped_ticks"] = skipped_ticks
+                if alerts:
+                    sample["alerts"] = alerts
+                emit(sample)
+                samples += 1
+
+            tick_index += 1
+            target = start + tick_index * tick
+            now = time.monotonic()
+            if now >= target:
+                missed = int((now - target) // tick) + 1
+                skipped_ticks += missed
+                tick_index += missed
+                target = start + tick_index * tick
+            if stop_event is not None:
+                stop_event.wait(target - now)
+            else:
+                time.sleep(target - now)
+
+
     def save_to_file(self):
         """Save the collected information to a file"""
-        print(f"{Fore.GREEN}[+] {Fore.WHITE}Saving system information to {self.output_file}...")
-        with open(self.output_file, 'w') as f:
-            json.dump(self.system_info, f, indent=4)
-        print(f"{Fore.GREEN}[+] {Fore.WHITE}System information saved to {Fore.YELLOW}{self.output_file}")
+        self._status(f"{Fore.GREEN}[+] {Fore.WHITE}Saving system information to {self.output_file}...")
+        if self.output_file.endswith(NDJSON_EXTENSIONS):
+            # Time-series files get one compact record appended per run
+            with NdjsonSink(self.output_file, buffer_records=1) as sink:
+                sink.write(self.build_sample(list(self.COLLECTORS)))
+        else:
+            with open(self.output_file, 'w') as f:
+                json.dump(self.system_info, f, indent=4)
+        self._status(f"{Fore.GREEN}[+] {Fore.WHITE}System information saved to {Fore.YELLOW}{self.output_file}")
     
     def display_summary(self):
         """Display a summary of the collected information"""
+        try:
+            from tabulate import tabulate
+        except ImportError:
+            raise RuntimeError("Table output requires tabulate. Install it with: pip install tabulate")
         print(f"\n{Fore.CYAN}{'='*30} SYSTEM HEALTH SUMMARY {'='*30}{Fore.RESET}")
         
+        # Sections are skipped when their collector was not run or timed out
         # Basic info
-        print(f"\n{Fore.YELLOW}--- Basic System Information ---{Fore.RESET}")
-        basic_info = self.system_info["basic_info"]
-        basic_table = []
-        for key, value in basic_info.items():
-            basic_table.append([key, value])
-        print(tabulate(basic_table, headers=["Property", "Value"], tablefmt="grid"))
+        if "basic_info" in self.system_info:
+            print(f"\n{Fore.YELLOW}--- Basic System Information ---{Fore.RESET}")
+            basic_info = self.system_info["basic_info"]
+            basic_table = []
+            for key, value in basic_info.items():
+                basic_table.append([key, format_value(key, value)])
+            print(tabulate(basic_table, headers=["Property", "Value"], tablefmt="grid"))
         
         # CPU info
-        print(f"\n{Fore.YELLOW}--- CPU Information ---{Fore.RESET}")
-        cpu_info = self.system_info["cpu_info"]
-        cpu_table = []
-        for key, value in cpu_info.items():
-            if key != "cpu_percent_per_core":
-                cpu_table.append([key, value])
-        print(tabulate(cpu_table, headers=["Property", "Value"], tablefmt="grid"))
+        if "cpu_info" in self.system_info:
+            print(f"\n{Fore.YELLOW}--- CPU Information ---{Fore.RESET}")
+            cpu_info = self.system_info["cpu_info"]
+            cpu_table = []
+            for key, value in cpu_info.items():
+                if key != "cpu_percent_per_core":
+                    cpu_table.append([key, format_value(key, value)])
+            print(tabulate(cpu_table, headers=["Property", "Value"], tablefmt="grid"))
         
         # Memory info
-        print(f"\n{Fore.YELLOW}--- Memory Information ---{Fore.RESET}")
-        memory_info = self.system_info["memory_info"]
-        memory_table = []
-        for key, value in memory_info.items():
-            memory_table.append([key, value])
-        print(tabulate(memory_table, headers=["Property", "Value"], tablefmt="grid"))
+        if "memory_info" in self.system_info:
+            print(f"\n{Fore.YELLOW}--- Memory Information ---{Fore.RESET}")
+            memory_info = self.system_info["memory_info"]
+            memory_table = []
+            for key, value in memory_info.items():
+                memory_table.append([key, format_value(key, value)])
+            print(tabulate(memory_table, headers=["Property", "Value"], tablefmt="grid"))
         
         # Disk info (first few entries)
-        print(f"\n{Fore.YELLOW}--- Disk Information (Top Partitions) ---{Fore.RESET}")
-        disk_headers = ["Device", "Mount Point", "Total", "Used", "Free", "Usage %"]
-        disk_table = []
-        for partition in self.system_info["disk_info"][:3]:  # Show first 3 partitions
-            disk_table.append([
-                partition["device"],
-                partition["mountpoint"],
-                partition["total_size"],
-                partition["used"],
-                partition["free"],
-                partition["usage_percent"]
-            ])
-        print(tabulate(disk_table, headers=disk_headers, tablefmt="grid"))
+        if "disk_info" in self.system_info:
+            print(f"\n{Fore.YELLOW}--- Disk Information (Top Partitions) ---{Fore.RESET}")
+            disk_headers = ["Device", "Mount Point", "Total", "Used", "Free", "Usage %"]
+            disk_table = []
+            for partition in self.system_info["disk_info"][:3]:  # Show first 3 partitions
+                disk_table.append([
+                    partition["device"],
+                    partition["mountpoint"],
+                    format_bytes(partition["total_size"]),
+                    format_bytes(partition["used"]),
+                    format_bytes(partition["free"]),
+                    format_value("usage_percent", partition["usage_percent"])
+                ])
+            print(tabulate(disk_table, headers=disk_headers, tablefmt="grid"))
+            
+            for partition in self.system_info["disk_info"]:
+                hot_spots = partition.get("hot_spots")
+                if not hot_spots or "error" in hot_spots:
+                    continue
+                print(f"\n{Fore.YELLOW}--- Largest on {partition['mountpoint']} "
+                      f"({format_value('usage_percent', partition['usage_percent'])} used) ---{Fore.RESET}")
+                hot_spot_table = [["dir", entry["path"], format_bytes(entry["bytes"])]
+                                  for entry in hot_spots["largest_directories"][:5]]
+                hot_spot_table += [["file", entry["path"], format_bytes(entry["bytes"])]
+                                   for entry in hot_spots["largest_files"][:5]]
+                print(tabulate(hot_spot_table, headers=["Type", "Path", "Size"], tablefmt="grid"))
         
-        # Network interfaces
-        print(f"\n{Fore.YELLOW}--- Network Interfaces ---{Fore.RESET}")
-        if self.system_info["network_info"]["interfaces"]:
-            interface_headers = ["Interface", "IP Address", "Netmask", "Broadcast"]
-            interface_table = []
-            for interface in self.system_info["network_info"]["interfaces"]:
-                interface_table.append([
-                    interface["interface"],
-                    interface["ip_address"],
-                    interface["netmask"],
-                    interface["broadcast"] if interface["broadcast"] else "N/A"
+        # Disk IO rates
+        device_rates = self.system_info.get("disk_io_rates", {}).get("devices")
+        if device_rates:
+            print(f"\n{Fore.YELLOW}--- Disk IO Rates ---{Fore.RESET}")
+            rate_table = []
+            for device, rates in device_rates.items():
+                rate_table.append([
+                    device,
+                    format_value("read_bytes_per_sec", rates["read_bytes_per_sec"]),
+                    format_value("write_bytes_per_sec", rates["write_bytes_per_sec"]),
+                    f"{rates['read_iops']:.1f}",
+                    f"{rates['write_iops']:.1f}",
+                    format_value("busy_percent", rates.get("busy_percent"))
                 ])
-            print(tabulate(interface_table, headers=interface_headers, tablefmt="grid"))
-        else:
-            print("No network interfaces found")
+            print(tabulate(rate_table, headers=["Device", "Read", "Write", "Read IOPS", "Write IOPS", "Busy %"], tablefmt="grid"))
+        
+        # Network interfaces
+        if "network_info" in self.system_info:
+            print(f"\n{Fore.YELLOW}--- Network Interfaces ---{Fore.RESET}")
+            if self.system_info["network_info"]["interfaces"]:
+                interface_headers = ["Interface", "IP Address", "Netmask", "Broadcast"]
+                interface_table = []
+                for interface in self.system_info["network_info"]["interfaces"]:
+                    interface_table.append([
+                        interface["interface"],
+                        interface["ip_address"],
+                        interface["netmask"],
+                        interface["broadcast"] if interface["broadcast"] else "N/A"
+                    ])
+                print(tabulate(interface_table, headers=interface_headers, tablefmt="grid"))
+            else:
+                print("No network interfaces found")
+            
+            nic_rates = self.system_info["network_info"]["rates"]["interfaces"]
+            if nic_rates:
+                print(f"\n{Fore.YELLOW}--- Network IO Rates ---{Fore.RESET}")
+                rate_table = []
+                for nic, rates in nic_rates.items():
+                    rate_table.append([
+                        nic,
+                        format_value("bytes_sent_per_sec", rates["bytes_sent_per_sec"]),
+                        format_value("bytes_recv_per_sec", rates["bytes_recv_per_sec"]),
+                        f"{rates['packets_sent_per_sec']:.1f}",
+                        f"{rates['packets_recv_per_sec']:.1f}"
+                    ])
+                print(tabulate(rate_table, headers=["Interface", "Sent", "Received", "Packets out/s", "Packets in/s"], tablefmt="grid"))
         
         # Top processes
-        print(f"\n{Fore.YELLOW}--- Top Processes (by CPU usage) ---{Fore.RESET}")
-        process_headers = ["PID", "Name", "User", "Status", "CPU %", "Mem %"]
-        process_table = []
-        for proc in self.system_info["process_info"][:5]:  # Show top 5 processes
-            process_table.append([
-                proc["pid"],
-                proc["name"],
-                proc["username"],
-                proc["status"],
-                f"{proc['cpu_percent']:.1f}%",
-                f"{proc['memory_percent']:.1f}%"
-            ])
-        print(tabulate(process_table, headers=process_headers, tablefmt="grid"))
+        if "process_info" in self.system_info:
+            print(f"\n{Fore.YELLOW}--- Top Processes (by CPU usage) ---{Fore.RESET}")
+            process_headers = ["PID", "Name", "User", "Status", "CPU %", "Mem %"]
+            process_table = []
+            for proc in self.system_info["process_info"][:5]:  # Show top 5 processes
+                process_table.append([
+                    proc["pid"],
+                    proc["name"],
+                    proc["username"],
+                    proc["status"],
+                    format_value("cpu_percent", proc["cpu_percent"]),
+                    format_value("memory_percent", proc["memory_percent"])
+                ])
+            print(tabulate(process_table, headers=process_headers, tablefmt="grid"))
         
-        # Logged-in users
-        print(f"\n{Fore.YELLOW}--- Logged-in Users ---{Fore.RESET}")
-        if self.system_info["user_info"]:
-            user_headers = ["Username", "Terminal", "Host", "Login Time"]
-            user_table = []
-            for user in self.system_info["user_info"]:
-                user_table.append([
-                    user["name"],
-                    user["terminal"],
-                    user["host"],
-                    user["started"]
+        # Busiest cgroups
+        cgroups = self.system_info.get("cgroup_info", {}).get("cgroups")
+        if cgroups:
+            print(f"\n{Fore.YELLOW}--- Top Cgroups (by CPU usage) ---{Fore.RESET}")
+            busiest = heapq.nlargest(10, cgroups.items(), key=lambda item: item[1].get("cpu_percent", 0.0))
+            cgroup_table = []
+            for path, values in busiest:
+                cgroup_table.append([
+                    path,
+                    values["pids"],
+                    format_value("cpu_percent", values.get("cpu_percent")),
+                    format_bytes(values["memory_current"]) if "memory_current" in values else "N/A",
+                    format_value("read_bytes_per_sec", values.get("io_read_bytes_per_sec")),
+                    format_value("write_bytes_per_sec", values.get("io_write_bytes_per_sec"))
                 ])
-            print(tabulate(user_table, headers=user_headers, tablefmt="grid"))
-        else:
-            print("No users currently logged in")
+            print(tabulate(cgroup_table, headers=["Cgroup", "Procs", "CPU %", "Memory", "Read", "Write"], tablefmt="grid"))
+        
+        # Logged-in users
+        if "user_info" in self.system_info:
+            print(f"\n{Fore.YELLOW}--- Logged-in Users ---{Fore.RESET}")
+            if self.system_info["user_info"]:
+                user_headers = ["Username", "Terminal", "Host", "Login Time"]
+                user_table = []
+                for user in self.system_info["user_info"]:
+                    user_table.append([
+                        user["name"],
+                        user["terminal"],
+                        user["host"],
+                        format_timestamp(user["started"])
+                    ])
+                print(tabulate(user_table, headers=user_headers, tablefmt="grid"))
+            else:
+                print("No users currently logged in")
+        
+        # Installed applications
+        application_info = self.system_info.get("application_info")
+        if application_info and "error" not in application_info:
+            print(f"\n{Fore.YELLOW}--- Installed Applications ---{Fore.RESET}")
+            print(tabulate([
+                ["package_manager", application_info["manager"]],
+                ["installed", application_info["count"]],
+                ["inventory_hash", application_info["hash"][:16]],
+                ["added", len(application_info["added"])],
+                ["removed", len(application_info["removed"])],
+                ["upgraded", len(application_info["upgraded"])],
+            ], headers=["Property", "Value"], tablefmt="grid"))
+        
+        # Collection timings
+        if "collection_stats" in self.system_info:
+            stats = self.system_info["collection_stats"]
+            print(f"\n{Fore.YELLOW}--- Collection Timings ---{Fore.RESET}")
+            timing_table = []
+            for name, collector_stats in stats["collectors"].items():
+                timing_table.append([name, collector_stats["status"], f"{collector_stats['duration']:.3f}s"])
+            timing_table.append(["total (wall clock)", "", f"{stats['wall_time']:.3f}s"])
+            print(tabulate(timing_table, headers=["Collector", "Status", "Duration"], tablefmt="grid"))
             
         print(f"\n{Fore.GREEN}Full report saved to: {Fore.YELLOW}{self.output_file}{Fore.RESET}")
 
+# Interactive menu choice -> collectors to run
+MENU_BUNDLES = {
+    "2": ["basic"],
+    "3": ["basic", "memory", "cpu"],
+    "4": ["basic", "disk"],
+    "5": ["basic", "network"],
+    "6": ["basic", "process"],
+    "7": ["basic", "user", "application"],
+    "8": ["basic", "security"],
+}
+
 def run_interactive_mode():
     """Run the system monitor in interactive mode"""
     monitor = SystemMonitor()
@@ -489,28 +1377,8 @@ def run_interactive_mode():
         sys.exit(0)
     elif choice == "1":
         monitor.collect_all_info()
-    elif choice == "2":
-        monitor.collect_basic_system_info()
-    elif choice == "3":
-        monitor.collect_basic_system_info()
-        monitor.collect_memory_info()
-        monitor.collect_cpu_info()
-    elif choice == "4":
-        monitor.collect_basic_system_info()
-        monitor.collect_disk_info()
-    elif choice == "5":
-        monitor.collect_basic_system_info()
-        monitor.collect_network_info()
-    elif choice == "6":
-        monitor.collect_basic_system_info()
-        monitor.collect_process_info()
-    elif choice == "7":
-        monitor.collect_basic_system_info()
-        monitor.collect_user_info()
-        monitor.collect_application_info()
-    elif choice == "8":
-        monitor.collect_basic_system_info()
-        monitor.collect_security_info()
+    elif choice in MENU_BUNDLES:
+        monitor.run_collectors(MENU_BUNDLES[choice])
     else:
         print(f"{Fore.RED}Invalid choice. Collecting all information by default.")
         monitor.collect_all_info()
@@ -530,15 +1398,511 @@ def run_interactive_mode():
     
     print(f"\n{Fore.CYAN}Thank you for using SysCore Sentry!{Fore.RESET}")
         
-def main():
+def parse_collectors(spec):
+    """Parse a collector list such as "cpu,memory,disk" or "all" """
+    if not spec or spec.strip() == "all":
+        return list(SystemMonitor.COLLECTORS)
+    names = []
+    for name in spec.split(","):
+        name = name.strip()
+        if name not in SystemMonitor.COLLECTORS:
+            raise ValueError(f"Unknown collector '{name}' (choose from: {', '.join(SystemMonitor.COLLECTORS)})")
+        if name not in names:
+            names.append(name)
+    return names
+
+def parse_intervals(spec, collectors=None):
+    """Parse watch interval overrides such as "cpu=1,disk=30" """
+    intervals = dict(SystemMonitor.WATCH_INTERVALS)
+    if collectors is not None:
+        intervals = {name: seconds for name, seconds in intervals.items() if name in collectors}
+    if not spec:
+        return intervals
+    for item in spec.split(","):
+        name, _, seconds = item.partition("=")
+        name = name.strip()
+        if name not in SystemMonitor.COLLECTORS:
+            raise ValueError(f"Unknown collector '{name}'")
+        if seconds.strip() in ("", "0", "off"):
+            intervals.pop(name, None)
+        else:
+            intervals[name] = float(seconds)
+    if not intervals:
+        raise ValueError("No collectors left to watch")
+    return intervals
+
+def emit_json_line(sample):
+    """Write a sample to stdout as a single compact JSON line"""
+    sys.stdout.write(json.dumps(sample, separators=(",", ":"), default=str) + "\n")
+    sys.stdout.flush()
+
+def print_alerts(sample):
+    """Print alert state changes carried by a watch sample to stderr"""
+    for alert in sample.get("alerts", ()):
+        if alert["state"] == "firing":
+            color = Fore.RED if alert["severity"] in ("critical", "warning") else Fore.YELLOW
+            print(f"{color}[!] {Fore.WHITE}{alert['rule']}: {alert['metric']} = {alert['value']}", file=sys.stderr)
+        else:
+            print(f"{Fore.GREEN}[+] {Fore.WHITE}{alert['rule']} resolved: {alert['metric']} = {alert['value']}",
+                  file=sys.stderr)
+
+def run_watch_mode(args):
+    """Run the system monitor as a long-lived sampling loop"""
+    monitor = SystemMonitor(cpu_window=args.cpu_window, quiet=True, hostname=args.hostname, procfs=args.procfs,
+                            cgroup_root=args.cgroup_root, include_packages=args.include_packages)
+    intervals = parse_intervals(args.intervals, parse_collectors(args.collectors))
+    if args.rules:
+        from syscore_alerts import AlertEngine, load_rules
+        monitor.alerts = AlertEngine(load_rules(args.rules))
+        print(f"{Fore.YELLOW}[*] {Fore.WHITE}Loaded {len(monitor.alerts.threshold_rules)} threshold, "
+              f"{len(monitor.alerts.allowlists)} allowlist and {len(monitor.alerts.anomaly_specs)} anomaly rules "
+              f"from {args.rules}", file=sys.stderr)
+    if args.connection_summary:
+        monitor.enable_connection_summary(raw_limit=args.connection_raw)
+    if args.disk_scan is not None:
+        monitor.enable_disk_scan(threshold=args.disk_scan, top_n=args.disk_scan_top)
+    if args.accounting:
+        monitor.enable_accounting({label.strip(): parse_duration(label) for label in args.accounting.split(",")})
+    if args.history_window:
+        from syscore_ringbuf import MetricHistory
+        # One slot per tick of the fastest collector covers the whole window
+        monitor.history = MetricHistory(capacity=max(1, int(args.history_window / min(intervals.values())) + 1))
+    if args.exporter_port is not None:
+        from syscore_exporter import MetricsExporter
+        monitor.exporter = MetricsExporter(address=args.exporter_address, port=args.exporter_port)
+        monitor.exporter.start()
+        print(f"{Fore.YELLOW}[*] {Fore.WHITE}Serving metrics at "
+              f"{Fore.GREEN}http://{args.exporter_address}:{monitor.exporter.port}/metrics", file=sys.stderr)
+    print(f"{Fore.YELLOW}[*] {Fore.WHITE}Watching collectors: "
+          f"{', '.join(f'{name}={seconds:g}s' for name, seconds in intervals.items())}", file=sys.stderr)
+    emitters = []
+    closers = []
+    if monitor.alerts is not None:
+        emitters.append(print_alerts)
+    if args.output:
+        sink = NdjsonSink(
+            args.output,
+            buffer_records=args.buffer,
+            max_bytes=parse_size(args.rotate_size) if args.rotate_size else None,
+            max_age=parse_duration(args.rotate_interval) if args.rotate_interval else None,
+            compress=args.compress
+        )
+        emitters.append(sink.write)
+        closers.append(sink.close)
+        print(f"{Fore.YELLOW}[*] {Fore.WHITE}Appending samples to {Fore.GREEN}{args.output}", file=sys.stderr)
+    if args.history_db is not None:
+        from syscore_history import HistoryStore, parse_retention
+        store = HistoryStore(args.history_db or None, retention=parse_retention(args.history_retention))
+        emitters.append(store.record_sample)
+        closers.append(store.close)
+        print(f"{Fore.YELLOW}[*] {Fore.WHITE}Recording history to {Fore.GREEN}{store.path}", file=sys.stderr)
+    if args.push:
+        from syscore_fleet import PushClient
+        client = PushClient(args.push)
+        emitters.append(client.write)
+        closers.append(client.close)
+        print(f"{Fore.YELLOW}[*] {Fore.WHITE}Pushing samples to {Fore.GREEN}{args.push}", file=sys.stderr)
+    if not args.output and not args.push:
+        emitters.append(emit_json_line)
+
+    def emit(sample):
+        for emitter in emitters:
+            emitter(sample)
+
+    try:
+        monitor.watch(emit, intervals=intervals, max_samples=args.count)
+    finally:
+        for close in closers:
+            close()
+
+def run_dashboard_mode(args):
+    """Show a live full-screen view of the system"""
+    from syscore_dashboard import Dashboard, DASHBOARD_INTERVALS
+
+    monitor = SystemMonitor(cpu_window=args.cpu_window, quiet=True, procfs=args.procfs, cgroup_root=args.cgroup_root)
+    if args.connection_summary:
+        monitor.enable_connection_summary(raw_limit=args.connection_raw)
+    intervals = DASHBOARD_INTERVALS
+    if args.intervals or args.collectors:
+        intervals = parse_intervals(args.intervals, parse_collectors(args.collectors))
+    Dashboard(monitor, intervals=intervals, max_fps=args.max_fps).run()
+
+def run_benchmark_mode(args):
+    """Benchmark each collector and write the results as JSON"""
+    import syscore_bench
+
+    names = parse_collectors(args.collectors)
+    report = syscore_bench.run_benchmarks(
+        names,
+        iterations=args.benchmark,
+        synthetic_processes=args.bench_synthetic_processes,
+        include_legacy=args.bench_legacy,
+        procfs=args.procfs
+    )
+    if args.bench_output:
+        syscore_bench.save_report(report, args.bench_output)
+        print(f"{Fore.GREEN}[+] {Fore.WHITE}Benchmark results saved to {Fore.YELLOW}{args.bench_output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.bench_baseline:
+        with open(args.bench_baseline) as f:
+            baseline = json.load(f)
+        regressions = syscore_bench.compare_reports(baseline, report)
+        for regression in regressions:
+            print(f"{Fore.RED}[-] {Fore.WHITE}{regression['collector']}: p50 {regression['baseline_p50_ms']}ms -> "
+                  f"{regression['p50_ms']}ms ({regression['ratio']}x)", file=sys.stderr)
+        if regressions:
+            sys.exit(2)
+
+def run_headless_mode(args):
+    """Collect once without prompts and write the report in the requested format"""
+    output_format = args.format
+    if output_format is None:
+        if args.output:
+            output_format = "ndjson" if args.output.endswith(NDJSON_EXTENSIONS) else "json"
+        else:
+            output_format = "table" if sys.stdout.isatty() else "json"
+    if output_format == "table":
+        init_colors()
+
+    # Progress lines would corrupt a machine-readable report on stdout
+    quiet = args.quiet or (output_format != "table" and not args.output)
+    monitor = SystemMonitor(output_file=args.output or "system_health_report.json",
+                            cpu_window=args.cpu_window, quiet=quiet, procfs=args.procfs, cgroup_root=args.cgroup_root,
+                            include_packages=args.include_packages)
+    if args.connection_summary:
+        monitor.enable_connection_summary(raw_limit=args.connection_raw)
+    if args.disk_scan is not None:
+        monitor.enable_disk_scan(threshold=args.disk_scan, top_n=args.disk_scan_top)
+    names = parse_collectors(args.collectors)
+    monitor.run_collectors(names)
+
+    if output_format == "table":
+        monitor.display_summary()
+        if args.output:
+            monitor.save_to_file()
+    elif args.output:
+        if output_format == "ndjson" and not args.output.endswith(NDJSON_EXTENSIONS):
+            with NdjsonSink(args.output, buffer_records=1) as sink:
+                sink.write(monitor.build_sample(names))
+        else:
+            monitor.save_to_file()
+    elif output_format == "ndjson":
+        emit_json_line(monitor.build_sample(names))
+    else:
+        json.dump(monitor.system_info, sys.stdout, indent=4)
+        sys.stdout.write("\n")
+
+def parse_importtime(output):
+    """Parse python -X importtime output into per-module timings"""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except (ValueError, IndexError):
+            continue  # column header
+        modules.append({
+            "module": fields[2].strip(),
+            "self_ms": self_us / 1000,
+            "cumulative_ms": cumulative_us / 1000
+        })
+    modules.sort(key=lambda m: m["cumulative_ms"], reverse=True)
+    return modules
+
+def process_age():
+    """Seconds since this process started"""
+    try:
+        # psutil's create_time is anchored to the whole-second boot time,
+        # so use jiffies since boot directly where available
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return time.time() - psutil.Process().create_time()
+
+def run_startup_profile(args):
+    """Report per-module import times and the time it takes to get the first sample"""
+    import subprocess
+
+    started = time.perf_counter()
+    monitor = SystemMonitor(cpu_window=args.cpu_window, quiet=True)
+    names = parse_collectors(args.collectors)
+    monitor.run_collectors(names)
+    first_collection = time.perf_counter() - started
+    process_start_to_first_sample = process_age()
+
+    # A fresh interpreter gives honest numbers; this one has already imported everything
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import syscore_entry"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True
+    )
+    modules = parse_importtime(result.stderr)
+
+    report = {
+        "process_start_to_first_sample_ms": round(process_start_to_first_sample * 1000, 1),
+        "module_import_ms": round((_IMPORT_FINISHED - _IMPORT_STARTED) * 1000, 3),
+        "first_collection_ms": round(first_collection * 1000, 3),
+        "collectors": names,
+        "total_import_ms": next((m["cumulative_ms"] for m in modules if m["module"] == "syscore_entry"), None),
+        "imports": modules[:25]
+    }
+    print(json.dumps(report, indent=2))
+
+def parse_args(argv=None):
+    """Parse command-line arguments"""
+    parser = argparse.ArgumentParser(
+        prog="syscore-sentry",
+        description="SysCore Sentry - system monitoring and diagnostics tool"
+    )
+    parser.add_argument("--collectors", metavar="LIST",
+                        help=f"comma-separated collectors to run, or 'all' ({','.join(SystemMonitor.COLLECTORS)})")
+    parser.add_argument("--format", choices=["json", "ndjson", "table"],
+                        help="report format for non-interactive runs (default: table on a terminal, json otherwise)")
+    parser.add_argument("--quiet", "-q", action="store_true",
+                        help="suppress banner and progress messages")
+    parser.add_argument("--watch", "--daemon", dest="watch", action="store_true",
+                        help="keep sampling collectors on fixed intervals and print one JSON line per sample")
+    parser.add_argument("--dashboard", action="store_true",
+                        help="show a live full-screen dashboard with sortable process and connection panes")
+    parser.add_argument("--max-fps", type=float, default=2.0, metavar="N",
+                        help="maximum dashboard redraws per second (default: 2)")
+    parser.add_argument("--intervals", metavar="SPEC",
+                        help="watch interval overrides, e.g. cpu=1,memory=1,disk=30,application=off")
+    parser.add_argument("--count", type=int, metavar="N",
+                        help="stop watch mode after N samples")
+    parser.add_argument("--history-window", type=float, default=600, metavar="SECONDS",
+                        help="seconds of metric history kept in memory in watch mode (default: 600, 0 to disable)")
+    parser.add_argument("--history-db", nargs="?", const="", metavar="FILE",
+                        help="record watch samples in an SQLite history database (default: in the cache directory)")
+    parser.add_argument("--history-retention", metavar="SPEC",
+                        help="history retention per resolution, e.g. raw=48h,1m=30d,1h=52w")
+    parser.add_argument("--accounting", metavar="WINDOWS",
+                        help="report top processes by CPU time, IO and RSS over time windows, e.g. 1m,10m,1h")
+    parser.add_argument("--rules", metavar="FILE",
+                        help="evaluate threshold/anomaly alert rules from a JSON or YAML file in watch mode")
+    parser.add_argument("--exporter-port", type=int, metavar="PORT",
+                        help="serve the latest watch sample as Prometheus/OpenMetrics text on PORT")
+    parser.add_argument("--exporter-address", default="127.0.0.1", metavar="ADDRESS",
+                        help="address for the metrics exporter to bind (default: 127.0.0.1)")
+    parser.add_argument("--push", metavar="ADDRESS",
+                        help="send watch samples to a fleet aggregator at host:port or unix:/path")
+    parser.add_argument("--hostname", metavar="NAME",
+                        help="host name to label watch samples with (default: this machine's hostname)")
+    parser.add_argument("--output", "-o", metavar="FILE",
+                        help="write the report to FILE; in watch mode samples are appended as NDJSON")
+    parser.add_argument("--buffer", type=int, default=64, metavar="N",
+                        help="number of samples to buffer before writing (default: 64)")
+    parser.add_argument("--rotate-size", metavar="SIZE",
+                        help="rotate the NDJSON file once it reaches SIZE, e.g. 100M")
+    parser.add_argument("--rotate-interval", metavar="DURATION",
+                        help="rotate the NDJSON file after DURATION, e.g. 1h or 1d")
+    parser.add_argument("--compress", choices=["gzip", "zstd"],
+                        help="compress rotated NDJSON segments (zstd needs the zstandard package)")
+    parser.add_argument("--benchmark", type=int, metavar="N",
+                        help="run every collector N times and report latency and memory figures as JSON")
+    parser.add_argument("--bench-output", metavar="FILE",
+                        help="write benchmark results to FILE instead of stdout")
+    parser.add_argument("--bench-baseline", metavar="FILE",
+                        help="compare against an earlier benchmark file and exit 2 on p50 regressions")
+    parser.add_argument("--bench-synthetic-processes", type=int, metavar="N",
+                        help="benchmark the process collector against N synthetic processes")
+    parser.add_argument("--bench-legacy", action="store_true",
+                        help="also benchmark the equivalent method_3.py collectors")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="report per-module import times and time to the first sample as JSON")
+    parser.add_argument("--connection-summary", action="store_true",
+                        help="report connection counts by state, listening port, remote network and pid "
+                             "instead of listing every socket")
+    parser.add_argument("--connection-raw", type=int, default=0, metavar="N",
+                        help="with --connection-summary, also list the first N sockets (default: 0)")
+    parser.add_argument("--disk-scan", type=float, metavar="PERCENT",
+                        help="find the largest directories and files on partitions at least PERCENT full")
+    parser.add_argument("--disk-scan-top", type=int, default=10, metavar="N",
+                        help="directories and files to report per scanned partition (default: 10)")
+    parser.add_argument("--include-packages", action="store_true",
+                        help="save the full package list in the report, so `diff` can show package changes")
+    parser.add_argument("--cgroup-root", metavar="DIR",
+                        help="cgroup v2 mount point for the cgroup collector (default: auto-detect)")
+    parser.add_argument("--procfs", action="store_true",
+                        help="read CPU, memory, disk and network counters straight from /proc on Linux")
+    parser.add_argument("--cpu-window", type=float, default=1.0, metavar="SECONDS",
+                        help="CPU sampling window for the first sample (default: 1.0)")
+    return parser.parse_args(argv)
+
+def run_aggregate_command(args):
+    """Collect samples pushed by agents or dropped in a spool directory into a fleet database"""
+    from syscore_fleet import Aggregator, FleetStore
+
+    if not args.listen and not args.spool:
+        raise ValueError("aggregate needs --listen and/or --spool")
+    store = FleetStore(args.db)
+    aggregator = Aggregator(store, listen=args.listen, spool_dir=args.spool, batch_size=args.batch)
+    if args.listen:
+        print(f"{Fore.YELLOW}[*] {Fore.WHITE}Accepting samples on {Fore.GREEN}{args.listen}", file=sys.stderr)
+    if args.spool:
+        print(f"{Fore.YELLOW}[*] {Fore.WHITE}Ingesting spool directory {Fore.GREEN}{args.spool}", file=sys.stderr)
+    try:
+        aggregator.run(duration=args.duration)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.close()
+        print(json.dumps(aggregator.stats()), file=sys.stderr)
+
+def run_fleet_command(args):
+    """Query a fleet database"""
+    from syscore_fleet import FleetStore
+
+    store = FleetStore(args.db)
+    try:
+        if args.fleet_command == "top":
+            rows = store.top_hosts(args.metric, parse_duration(args.since), limit=args.limit, by=args.by)
+        else:
+            rows = store.hosts()
+    finally:
+        store.close()
+    print(json.dumps(rows, indent=2))
+
+def run_history_command(args):
+    """Query the on-disk metric history"""
+    from syscore_history import HistoryStore
+
+    now = time.time()
+    store = HistoryStore(args.db or None)
+    try:
+        result = store.query(
+            args.metric,
+            since=now - parse_duration(args.since),
+            until=now - parse_duration(args.until) if args.until else None,
+            resolution=args.resolution
+        )
+    finally:
+        store.close()
+    print(json.dumps(result, indent=2))
+
+def run_diskscan_command(args):
+    """Report the largest directories and files under a path"""
+    from syscore_diskscan import DiskScanner
+
+    scanner = DiskScanner(index_path="" if args.no_index else args.index, workers=args.workers, top_n=args.top)
+    try:
+        report = scanner.scan(args.path)
+    finally:
+        scanner.close()
+    print(json.dumps(report, indent=2))
+
+def run_diff_command(args):
+    """Compare two saved reports"""
+    from syscore_diff import COMPARISONS, diff_reports, has_changes
+
+    sections = None
+    if args.sections:
+        sections = [name.strip() for name in args.sections.split(",")]
+        for name in sections:
+            if name not in COMPARISONS:
+                raise ValueError(f"Unknown section '{name}' (choose from: {', '.join(COMPARISONS)})")
+    delta = diff_reports(args.old, args.new, sections)
+    print(json.dumps(delta, indent=2))
+    if args.exit_code and has_changes(delta):
+        sys.exit(1)
+
+def parse_command_args(argv):
+    """Parse arguments for the subcommands that don't collect from this host"""
+    parser = argparse.ArgumentParser(prog="syscore-sentry")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    aggregate = commands.add_parser("aggregate", help="collect samples from many agents into a fleet database")
+    aggregate.add_argument("--db", default="fleet.db", help="SQLite database path (default: fleet.db)")
+    aggregate.add_argument("--listen", metavar="ADDRESS",
+                           help="accept pushed samples on host:port or unix:/path")
+    aggregate.add_argument("--spool", metavar="DIR", help="ingest NDJSON files dropped into DIR")
+    aggregate.add_argument("--batch", type=int, default=500, metavar="N",
+                           help="records per insert transaction (default: 500)")
+    aggregate.add_argument("--duration", type=float, metavar="SECONDS", help="stop after SECONDS")
+    aggregate.set_defaults(handler=run_aggregate_command)
+
+    fleet = commands.add_parser("fleet", help="query a fleet database")
+    fleet_commands = fleet.add_subparsers(dest="fleet_command")
+    fleet_commands.required = True
+    top = fleet_commands.add_parser("top", help="rank hosts by a metric")
+    top.add_argument("metric", help="metric key or GLOB pattern, e.g. memory_percent")
+    top.add_argument("--since", default="1h", help="time window, e.g. 15m, 1h, 7d (default: 1h)")
+    top.add_argument("--limit", type=int, default=10, help="number of hosts (default: 10)")
+    top.add_argument("--by", choices=["avg", "max", "min"], default="avg", help="ranking aggregate (default: avg)")
+    fleet_commands.add_parser("hosts", help="list hosts and when they last reported")
+    for subparser in (top, fleet_commands.choices["hosts"]):
+        subparser.add_argument("--db", default="fleet.db", help="SQLite database path (default: fleet.db)")
+    fleet.set_defaults(handler=run_fleet_command)
+
+    history = commands.add_parser("history", help="query metric history recorded with --watch --history-db")
+    history.add_argument("metric", help="metric key or GLOB pattern, e.g. memory_percent")
+    history.add_argument("--since", default="1h", help="start of the range, e.g. 15m, 24h, 7d (default: 1h)")
+    history.add_argument("--until", help="end of the range as an age, e.g. 1h (default: now)")
+    history.add_argument("--resolution", choices=["auto", "raw", "1m", "1h"], default="auto",
+                         help="data resolution (default: pick from the range)")
+    history.add_argument("--db", default="", help="history database path (default: in the cache directory)")
+    history.set_defaults(handler=run_history_command)
+
+    diskscan = commands.add_parser("diskscan", help="find the largest directories and files on a filesystem")
+    diskscan.add_argument("path", help="directory to scan; the scan stays on its filesystem")
+    diskscan.add_argument("--top", type=int, default=20, help="directories and files to report (default: 20)")
+    diskscan.add_argument("--workers", type=int, default=8, help="parallel directory readers (default: 8)")
+    diskscan.add_argument("--index", help="scan index path (default: in the cache directory)")
+    diskscan.add_argument("--no-index", action="store_true", help="walk everything and don't keep an index")
+    diskscan.set_defaults(handler=run_diskscan_command)
+
+    diff = commands.add_parser("diff", help="show what changed between two saved reports")
+    diff.add_argument("old", help="earlier report (JSON or NDJSON)")
+    diff.add_argument("new", help="later report (JSON or NDJSON)")
+    diff.add_argument("--sections", metavar="LIST",
+                      help="comma-separated comparisons (default: system,packages,ports,processes,partitions,users)")
+    diff.add_argument("--exit-code", action="store_true", help="exit with status 1 when anything changed")
+    diff.set_defaults(handler=run_diff_command)
+
+    return parser.parse_args(argv)
+
+COMMANDS = ("aggregate", "fleet", "history", "diskscan", "diff")
+
+def main(argv=None):
     """Main function to run the system monitor"""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        args = parse_command_args(argv)
+        try:
+            args.handler(args)
+        except Exception as e:
+            print(f"{Fore.RED}Error: {str(e)}{Fore.RESET}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    args = parse_args(argv)
     try:
-        run_interactive_mode()
+        if args.startup_profile:
+            run_startup_profile(args)
+        elif args.benchmark:
+            run_benchmark_mode(args)
+        elif args.dashboard:
+            run_dashboard_mode(args)
+        elif args.watch:
+            run_watch_mode(args)
+        elif args.collectors or args.format or args.output or args.quiet:
+            run_headless_mode(args)
+        else:
+            init_colors()
+            run_interactive_mode()
     except KeyboardInterrupt:
-        print(f"\n{Fore.RED}Monitoring cancelled by user{Fore.RESET}")
+        print(f"\n{Fore.RED}Monitoring cancelled by user{Fore.RESET}", file=sys.stderr)
         sys.exit(1)
     except Exception as e:
-        print(f"{Fore.RED}Error: {str(e)}{Fore.RESET}")
+        print(f"{Fore.RED}Error: {str(e)}{Fore.RESET}", file=sys.stderr)
         sys.exit(1)
     
 if __name__ == "__main__":
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+SysCore Sentry - Prometheus/OpenMetrics exporter
+Serves the latest watch sample over HTTP. The exposition text is rendered
+once per sample and cached, so scrapes never trigger a collection and any
+number of concurrent scrapers share the same bytes.
+"""
+
+import sys
+import math
+import threading
+import socketserver
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+
+METRIC_PREFIX = "syscore_"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+TEXT_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def format_sample_value(value):
+    """Format a float the way the exposition formats expect"""
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def render_exposition(metrics, sample_ts):
+    """Render {metric key: float} as (OpenMetrics text, Prometheus text) bytes
+
+    Keys are grouped into families by the name before any labels. Families
+    ending in _total are typed as counters, everything else as gauges.
+    """
+    families = {}
+    for key, value in metrics.items():
+        name = key.split("{", 1)[0]
+        families.setdefault(name, []).append((key, value))
+    families.setdefault("last_sample_timestamp_seconds", []).append(("last_sample_timestamp_seconds", sample_ts))
+
+    openmetrics = []
+    prometheus = []
+    for name in sorted(families):
+        full_name = METRIC_PREFIX + name
+        if name.endswith("_total"):
+            # OpenMetrics names the counter family without the _total suffix
+            openmetrics.append(f"# TYPE {full_name[:-len('_total')]} counter")
+            prometheus.append(f"# TYPE {full_name} counter")
+        else:
+            openmetrics.append(f"# TYPE {full_name} gauge")
+            prometheus.append(f"# TYPE {full_name} gauge")
+        for key, value in sorted(families[name]):
+            line = f"{METRIC_PREFIX}{key} {format_sample_value(value)}"
+            openmetrics.append(line)
+            prometheus.append(line)
+    openmetrics.append("# EOF")
+    return ("\n".join(openmetrics) + "\n").encode("utf-8"), ("\n".join(prometheus) + "\n").encode("utf-8")
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    # http.server.ThreadingHTTPServer only exists from Python 3.7
+    daemon_threads = True
+
+
+class MetricsExporter:
+    """HTTP endpoint serving the most recently published sample"""
+
+    def __init__(self, address="127.0.0.1", port=9410):
+        self.address = address
+        self.port = port
+        self._lock = threading.Lock()
+        self._openmetrics = None
+        self._prometheus = None
+        self._server = None
+        self._thread = None
+        self.scrapes = 0
+
+    def update(self, metrics, sample_ts):
+        """Render a new sample and swap it in for subsequent scrapes"""
+        openmetrics, prometheus = render_exposition(metrics, sample_ts)
+        with self._lock:
+            self._openmetrics = openmetrics
+            self._prometheus = prometheus
+
+    def snapshot(self, openmetrics=True):
+        """Return the cached exposition bytes, or None before the first sample"""
+        with self._lock:
+            self.scrapes += 1
+            return self._openmetrics if openmetrics else self._prometheus
+
+    def start(self):
+        """Start serving on a background thread"""
+        handler = type("MetricsHandler", (MetricsHandler,), {"exporter": self})
+        self._server = _ThreadingHTTPServer((self.address, self.port), handler)
+        # Pick up the real port when 0 was requested
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="syscore-exporter", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Shut the server down"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serves /metrics from the exporter cache"""
+
+    exporter = None
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/":
+            self._respond(200, "text/plain; charset=utf-8", b"SysCore Sentry exporter - metrics at /metrics\n")
+            return
+        if path != "/metrics":
+            self._respond(404, "text/plain; charset=utf-8", b"Not found\n")
+            return
+
+        openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+        body = self.exporter.snapshot(openmetrics)
+        if body is None:
+            self._respond(503, "text/plain; charset=utf-8", b"No sample collected yet\n")
+            return
+        self._respond(200, OPENMETRICS_CONTENT_TYPE if openmetrics else TEXT_CONTENT_TYPE, body)
+
+    def _respond(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood stderr
+        pass
+
+    def log_error(self, format, *args):
+        print(f"[-] Exporter: {format % args}", file=sys.stderr)
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+SysCore Sentry - fleet aggregation
+Agents push watch samples as NDJSON over TCP or a UNIX socket, or drop NDJSON
+files into a spool directory. The aggregator batch-inserts the samples'
+metrics into one SQLite database that can be queried across hosts.
+"""
+
+import os
+import sys
+import json
+import time
+import glob
+import gzip
+import queue
+import socket
+import sqlite3
+import threading
+import socketserver
+from collections import deque
+
+
+DEFAULT_PORT = 9420
+MAX_LINE_BYTES = 4 * 1024 * 1024
+SPOOL_PATTERNS = ("*.ndjson*", "*.jsonl*")
+# Leading bytes kept per spool file to tell a reused inode from the file it replaced
+SPOOL_HEAD_BYTES = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hosts (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    last_seen REAL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS samples (
+    host_id INTEGER NOT NULL,
+    metric_id INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (host_id, metric_id, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS samples_metric_ts ON samples (metric_id, ts);
+CREATE TABLE IF NOT EXISTS spool_files (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    path TEXT,
+    offset INTEGER NOT NULL,
+    head BLOB,
+    PRIMARY KEY (dev, ino)
+);
+"""
+
+
+def parse_address(text, default_host="127.0.0.1"):
+    """Parse "host:port", ":port" or "unix:/path" into (family, address)"""
+    if text.startswith("unix:"):
+        return "unix", text[len("unix:"):]
+    host, _, port = text.rpartition(":")
+    return "tcp", (host.strip("[]") or default_host, int(port or DEFAULT_PORT))
+
+
+class FleetStore:
+    """SQLite store of (host, metric, ts, value) rows
+
+    Host and metric names are interned into small tables so each sample row
+    is four numbers. The primary key makes re-ingesting a record a no-op.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        if "head" not in [row[1] for row in self.db.execute("PRAGMA table_info(spool_files)")]:
+            # Databases created before spool files were fingerprinted
+            self.db.execute("ALTER TABLE spool_files ADD COLUMN head BLOB")
+        self._host_ids = dict(self.db.execute("SELECT name, id FROM hosts"))
+        self._metric_ids = dict(self.db.execute("SELECT name, id FROM metrics"))
+
+    def _intern(self, table, cache, name):
+        """Return the id for a host or metric name, inserting it if new"""
+        row_id = cache.get(name)
+        if row_id is None:
+            row_id = self.db.execute(f"INSERT INTO {table} (name) VALUES (?)", (name,)).lastrowid
+            cache[name] = row_id
+        return row_id
+
+    def ingest(self, records):
+        """Insert the metrics of many sample records in one transaction; returns rows written"""
+        rows = []
+        last_seen = {}
+        with self.db:
+            for record in records:
+                metrics = record.get("metrics")
+                host = record.get("host")
+                ts = record.get("ts")
+                if not metrics or not host or ts is None:
+                    continue
+                host_id = self._intern("hosts", self._host_ids, host)
+                last_seen[host_id] = max(ts, last_seen.get(host_id, ts))
+                for name, value in metrics.items():
+                    if value is not None:
+                        rows.append((host_id, self._intern("metrics", self._metric_ids, name), ts, value))
+            before = self.db.total_changes
+            self.db.executemany("INSERT OR IGNORE INTO samples VALUES (?, ?, ?, ?)", rows)
+            written = self.db.total_changes - before
+            self.db.executemany(
+                "UPDATE hosts SET last_seen = max(coalesce(last_seen, 0), ?) WHERE id = ?",
+                [(ts, host_id) for host_id, ts in last_seen.items()]
+            )
+        return written
+
+    def top_hosts(self, metric, since, limit=10, by="avg", now=None):
+        """Rank hosts by a metric over the last `since` seconds
+
+        metric may be a GLOB pattern such as disk_usage_percent*, in which case
+        every matching series of a host counts towards its ranking.
+        """
+        aggregates = {"avg": "AVG(s.value)", "max": "MAX(s.value)", "min": "MIN(s.value)"}
+        if by not in aggregates:
+            raise ValueError(f"Unknown aggregate '{by}' (choose from: {', '.join(aggregates)})")
+        cutoff = (now if now is not None else time.time()) - since
+        rows = self.db.execute(
+            f"""
+            SELECT h.name, {aggregates[by]}, COUNT(*), MAX(s.ts)
+            FROM samples s JOIN hosts h ON h.id = s.host_id
+            WHERE s.metric_id IN (SELECT id FROM metrics WHERE name GLOB ?) AND s.ts >= ?
+            GROUP BY s.host_id
+            ORDER BY 2 DESC
+            LIMIT ?
+            """,
+            (metric, cutoff, limit)
+        )
+        return [{"host": host, by: value, "samples": count, "last_ts": last_ts}
+                for host, value, count, last_ts in rows]
+
+    def hosts(self):
+        """Known hosts and when each was last heard from"""
+        return [{"host": name, "last_seen": last_seen}
+                for name, last_seen in self.db.execute("SELECT name, last_seen FROM hosts ORDER BY name")]
+
+    def spool_offset(self, stat, head):
+        """Bytes of a spool file already ingested
+
+        head is the file's first SPOOL_HEAD_BYTES. Deleting a segment frees
+        its inode for the next one, so an offset only carries over when the
+        file still starts with the bytes recorded for it and hasn't shrunk.
+        """
+        row = self.db.execute("SELECT offset, head FROM spool_files WHERE dev = ? AND ino = ?",
+                              (stat.st_dev, stat.st_ino)).fetchone()
+        if row is None:
+            return 0
+        offset, known_head = row
+        if offset > stat.st_size or (known_head is not None and head[:len(known_head)] != known_head):
+            return 0
+        return offset
+
+    def set_spool_offset(self, stat, path, offset, head):
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO spool_files VALUES (?, ?, ?, ?, ?)",
+                            (stat.st_dev, stat.st_ino, path, offset, head))
+
+    def close(self):
+        self.db.close()
+
+
+def _parse_lines(data):
+    """Decode NDJSON lines, skipping any that are not JSON objects"""
+    records = []
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(record, dict):
+            records.append(record)
+    return records
+
+
+def ingest_spool(store, directory):
+    """Ingest new data from every NDJSON file in a spool directory; returns rows written
+
+    Files are tracked by inode and their first bytes, so a segment keeps its
+    offset when the agent's sink renames it on rotation, but a new segment
+    that reuses a deleted one's inode starts from zero. Plain files are read
+    from the last offset up to the last complete line; compressed segments
+    are read once in full.
+    """
+    written = 0
+    paths = set()
+    for pattern in SPOOL_PATTERNS:
+        paths.update(glob.glob(os.path.join(directory, pattern)))
+    for path in sorted(paths):
+        try:
+            f = open(path, "rb")
+        except OSError:
+            continue
+        with f:
+            stat = os.fstat(f.fileno())
+            head = f.read(SPOOL_HEAD_BYTES)
+            offset = store.spool_offset(stat, head)
+            if offset >= stat.st_size:
+                continue
+            if path.endswith((".gz", ".zst")):
+                data = _read_compressed(path)
+                if data is None:
+                    continue
+                written += store.ingest(_parse_lines(data))
+                store.set_spool_offset(stat, path, stat.st_size, head)
+                continue
+            f.seek(offset)
+            data = f.read(stat.st_size - offset)
+        end = data.rfind(b"\n") + 1
+        if not end:
+            continue
+        written += store.ingest(_parse_lines(data[:end]))
+        store.set_spool_offset(stat, path, offset + end, head)
+    return written
+
+
+def _read_compressed(path):
+    """Return the decompressed bytes of a rotated segment, or None if unsupported"""
+    if path.endswith(".gz"):
+        with gzip.open(path, "rb") as f:
+            return f.read()
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    with open(path, "rb") as f:
+        return zstandard.ZstdDecompressor().stream_reader(f).read()
+
+
+class _SampleHandler(socketserver.StreamRequestHandler):
+    """Reads NDJSON sample records from one agent connection"""
+
+    def handle(self):
+        while True:
+            line = self.rfile.readline(MAX_LINE_BYTES)
+            if not line:
+                break
+            if not line.endswith(b"\n"):
+                # Oversized record: drop the rest of it
+                self.server.aggregator.rejected += 1
+                while line and not line.endswith(b"\n"):
+                    line = self.rfile.readline(MAX_LINE_BYTES)
+                continue
+            records = _parse_lines(line)
+            if records:
+                self.server.aggregator.submit(records[0])
+            else:
+                self.server.aggregator.rejected += 1
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+else:  # Windows
+    _UnixServer = None
+
+
+class Aggregator:
+    """Receives samples from agents and writes them to a FleetStore in batches
+
+    Socket handlers only parse and enqueue; one writer loop owns the SQLite
+    connection, drains the queue into batched transactions and scans the
+    spool directory.
+    """
+
+    def __init__(self, store, listen=None, spool_dir=None, batch_size=500,
+                 flush_interval=1.0, spool_interval=5.0, max_queue=100000):
+        self.store = store
+        self.listen = listen
+        self.spool_dir = spool_dir
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool_interval = spool_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._server = None
+        self.received = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.rows_written = 0
+
+    def submit(self, record):
+        """Queue a record for the writer; drops it if the writer has fallen too far behind"""
+        try:
+            self._queue.put_nowait(record)
+            self.received += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def start_server(self):
+        """Start accepting agent connections on a background thread"""
+        family, address = parse_address(self.listen)
+        if family == "unix":
+            if _UnixServer is None:
+                raise RuntimeError("UNIX sockets are not supported on this platform")
+            if os.path.exists(address):
+                os.unlink(address)
+            self._server = _UnixServer(address, _SampleHandler)
+        else:
+            self._server = _TCPServer(address, _SampleHandler)
+        self._server.aggregator = self
+        threading.Thread(target=self._server.serve_forever, name="syscore-aggregator", daemon=True).start()
+        return self._server.server_address
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self, duration=None):
+        """Run the writer loop until stop() is called or duration seconds pass"""
+        if self.listen:
+            self.start_server()
+        deadline = time.monotonic() + duration if duration else None
+        next_spool = time.monotonic()
+        batch = []
+        last_flush = time.monotonic()
+        try:
+            while not self._stop.is_set() and (deadline is None or time.monotonic() < deadline):
+                try:
+                    batch.append(self._queue.get(timeout=0.2))
+                except queue.Empty:
+                    pass
+                now = time.monotonic()
+                if len(batch) >= self.batch_size or (batch and now - last_flush >= self.flush_interval):
+                    self.rows_written += self.store.ingest(batch)
+                    batch = []
+                    last_flush = now
+                if self.spool_dir and now >= next_spool:
+                    self.rows_written += ingest_spool(self.store, self.spool_dir)
+                    next_spool = now + self.spool_interval
+        finally:
+            if self._server is not None:
+                self._server.shutdown()
+                self._server.server_close()
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch:
+                self.rows_written += self.store.ingest(batch)
+
+    def stats(self):
+        return {
+            "received": self.received,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "rows_written": self.rows_written,
+        }
+
+
+class PushClient:
+    """Sends sample records to an aggregator, reconnecting with backoff
+
+    Records produced while the aggregator is unreachable are kept in a
+    bounded queue and sent once the connection comes back; the oldest are
+    discarded first.
+    """
+
+    def __init__(self, address, max_pending=1000, timeout=5.0):
+        self.family, self.address = parse_address(address)
+        self.timeout = timeout
+        self._pending = deque(maxlen=max_pending)
+        self._sock = None
+        self._retry_at = 0.0
+        self._backoff = 1.0
+
+    def _connect(self):
+        if self.family == "unix":
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.address)
+        else:
+            sock = socket.create_connection(self.address, timeout=self.timeout)
+        self._sock = sock
+        self._backoff = 1.0
+
+    def write(self, record):
+        """Queue a record and send everything pending if the aggregator is reachable"""
+        self._pending.append(json.dumps(record, separators=(",", ":"), default=str).encode("utf-8") + b"\n")
+        if self._sock is None and time.monotonic() < self._retry_at:
+            return
+        try:
+            if self._sock is None:
+                self._connect()
+            while self._pending:
+                self._sock.sendall(self._pending[0])
+                self._pending.popleft()
+        except OSError as e:
+            print(f"[-] Push to aggregator failed: {e}; {len(self._pending)} samples pending", file=sys.stderr)
+            self._disconnect()
+            self._retry_at = time.monotonic() + self._backoff
+            self._backoff = min(self._backoff * 2, 60.0)
+
+    def _disconnect(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def close(self):
+        self._disconnect()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+SysCore Sentry - on-disk metric history
+Stores watch samples in SQLite (WAL mode) with batched inserts, rolls raw
+samples up into 1-minute and 1-hour min/max/avg/p95 buckets and enforces a
+retention period per resolution.
+"""
+
+import os
+import math
+import time
+import sqlite3
+
+from syscore_packages import default_cache_dir
+from syscore_sink import parse_duration
+
+
+RESOLUTIONS = {"1m": 60, "1h": 3600}
+DEFAULT_RETENTION = {"raw": 2 * 86400, "1m": 30 * 86400, "1h": 365 * 86400}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metrics (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS samples_raw (
+    metric_id INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (metric_id, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value REAL
+);
+"""
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_{name} (
+    metric_id INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    count INTEGER NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    avg REAL NOT NULL,
+    p95 REAL NOT NULL,
+    PRIMARY KEY (metric_id, ts)
+) WITHOUT ROWID;
+"""
+
+
+def default_history_path():
+    """Default location of the history database"""
+    return os.path.join(default_cache_dir(), "history.db")
+
+
+def parse_retention(spec):
+    """Parse retention overrides such as "raw=48h,1m=30d,1h=52w" """
+    retention = dict(DEFAULT_RETENTION)
+    if not spec:
+        return retention
+    for item in spec.split(","):
+        name, _, duration = item.partition("=")
+        name = name.strip()
+        if name not in retention:
+            raise ValueError(f"Unknown resolution '{name}' (choose from: {', '.join(retention)})")
+        retention[name] = parse_duration(duration)
+    # Hourly rollups are computed from raw samples, so keep at least two hours of them
+    retention["raw"] = max(retention["raw"], 2 * RESOLUTIONS["1h"])
+    return retention
+
+
+def _p95(sorted_values):
+    """Nearest-rank 95th percentile of a sorted list"""
+    return sorted_values[max(1, math.ceil(0.95 * len(sorted_values))) - 1]
+
+
+class HistoryStore:
+    """Time-series store for one host's metrics
+
+    Raw rows are buffered and written in one transaction per batch. Once a
+    minute (and once an hour) closes, its raw rows are summarized into the
+    rollup tables, and rows older than each resolution's retention are
+    deleted. All reads and deletes go through the (metric_id, ts) primary key.
+    """
+
+    def __init__(self, path=None, retention=None, batch_rows=1000, flush_interval=10.0):
+        self.path = path or default_history_path()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.retention = retention or dict(DEFAULT_RETENTION)
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        for name in RESOLUTIONS:
+            self.db.executescript(ROLLUP_SCHEMA.format(name=name))
+        self._metric_ids = dict(self.db.execute("SELECT name, id FROM metrics"))
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._next_rollup = 0.0
+
+    def _metric_id(self, name):
+        metric_id = self._metric_ids.get(name)
+        if metric_id is None:
+            metric_id = self.db.execute("INSERT INTO metrics (name) VALUES (?)", (name,)).lastrowid
+            self._metric_ids[name] = metric_id
+        return metric_id
+
+    def record(self, ts, metrics):
+        """Buffer one value per metric, flushing and rolling up when due"""
+        pending = self._pending
+        for name, value in metrics.items():
+            pending.append((name, ts, value))
+        if len(pending) >= self.batch_rows or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+        if ts >= self._next_rollup:
+            self.maintain(ts)
+
+    def record_sample(self, sample):
+        """Record the metrics of a watch sample"""
+        if sample.get("metrics"):
+            self.record(sample["ts"], sample["metrics"])
+
+    def flush(self):
+        """Write buffered rows in a single transaction"""
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        with self.db:
+            rows = [(self._metric_id(name), ts, value) for name, ts, value in self._pending]
+            self.db.executemany("INSERT OR REPLACE INTO samples_raw VALUES (?, ?, ?)", rows)
+        self._pending = []
+
+    def maintain(self, now=None):
+        """Roll up closed buckets and apply retention"""
+        now = now if now is not None else time.time()
+        self.flush()
+        with self.db:
+            for name, step in RESOLUTIONS.items():
+                self._rollup(name, step, now)
+            self._apply_retention(now)
+        self._next_rollup = (now // RESOLUTIONS["1m"] + 1) * RESOLUTIONS["1m"]
+
+    def _state(self, key):
+        row = self.db.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _rollup(self, name, step, now):
+        """Summarize raw rows for every bucket that closed since the last rollup"""
+        end = now // step * step
+        start = self._state(f"rolled_{name}")
+        if start is None:
+            first = self.db.execute("SELECT MIN(ts) FROM samples_raw").fetchone()[0]
+            if first is None:
+                return
+            start = first // step * step
+        if start >= end:
+            return
+
+        rows = []
+        for metric_id in self._metric_ids.values():
+            buckets = {}
+            for ts, value in self.db.execute(
+                    "SELECT ts, value FROM samples_raw WHERE metric_id = ? AND ts >= ? AND ts < ?",
+                    (metric_id, start, end)):
+                buckets.setdefault(ts // step * step, []).append(value)
+            for bucket, values in buckets.items():
+                values.sort()
+                rows.append((metric_id, bucket, len(values), values[0], values[-1],
+                             sum(values) / len(values), _p95(values)))
+        self.db.executemany(f"INSERT OR REPLACE INTO rollup_{name} VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        self.db.execute("INSERT OR REPLACE INTO state VALUES (?, ?)", (f"rolled_{name}", end))
+
+    def _apply_retention(self, now):
+        """Delete rows older than each resolution's retention, one metric at a time"""
+        tables = [("samples_raw", self.retention["raw"])]
+        tables.extend((f"rollup_{name}", self.retention[name]) for name in RESOLUTIONS)
+        for table, keep in tables:
+            cutoff = now - keep
+            self.db.executemany(f"DELETE FROM {table} WHERE metric_id = ? AND ts < ?",
+                                [(metric_id, cutoff) for metric_id in self._metric_ids.values()])
+
+    def pick_resolution(self, since, until):
+        """Finest resolution that keeps a query to a few thousand points and is still retained"""
+        span = until - since
+        now = time.time()
+        if span <= 2 * 3600 and since >= now - self.retention["raw"]:
+            return "raw"
+        if span <= 2 * 86400 and since >= now - self.retention["1m"]:
+            return "1m"
+        return "1h"
+
+    def query(self, metric, since, until=None, resolution="auto"):
+        """Return {"resolution", "series": {metric: [points]}} for a metric key or GLOB pattern
+
+        Rollup points hold count/min/max/avg/p95 per bucket; raw points hold
+        the sampled value.
+        """
+        self.flush()
+        until = until if until is not None else time.time()
+        if resolution == "auto":
+            resolution = self.pick_resolution(since, until)
+        if resolution != "raw" and resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution '{resolution}' (choose from: raw, {', '.join(RESOLUTIONS)})")
+
+        series = {}
+        matches = self.db.execute("SELECT id, name FROM metrics WHERE name GLOB ? ORDER BY name", (metric,))
+        for metric_id, name in matches.fetchall():
+            if resolution == "raw":
+                rows = self.db.execute(
+                    "SELECT ts, value FROM samples_raw WHERE metric_id = ? AND ts >= ? AND ts < ? ORDER BY ts",
+                    (metric_id, since, until))
+                points = [{"ts": ts, "value": value} for ts, value in rows]
+            else:
+                rows = self.db.execute(
+                    f"SELECT ts, count, min, max, avg, p95 FROM rollup_{resolution} "
+                    "WHERE metric_id = ? AND ts >= ? AND ts < ? ORDER BY ts",
+                    (metric_id, since, until))
+                points = [{"ts": ts, "count": count, "min": low, "max": high, "avg": avg, "p95": p95}
+                          for ts, count, low, high, avg, p95 in rows]
+            if points:
+                series[name] = points
+        return {"resolution": resolution, "since": since, "until": until, "series": series}
+
+    def close(self):
+        self.flush()
+        self.db.close()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+SysCore Sentry - installed package inventory
+Reads the installed packages for the host's package manager and keeps a
+persistent cache that is only refreshed when the package database changes.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import platform
+from collections import Counter
+
+
+DPKG_STATUS = "/var/lib/dpkg/status"
+RPM_DATABASES = [
+    "/var/lib/rpm/rpmdb.sqlite",
+    "/var/lib/rpm/Packages.db",
+    "/var/lib/rpm/Packages",
+    "/usr/lib/sysimage/rpm/rpmdb.sqlite",
+]
+MACOS_APPLICATIONS = "/Applications"
+# Bumped whenever package naming changes, so older caches are neither reused nor diffed against
+CACHE_VERSION = 2
+
+
+def default_cache_dir():
+    """Return the per-user cache directory for SysCore Sentry"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "syscore-sentry")
+
+
+def read_dpkg_status(path=DPKG_STATUS):
+    """Parse the dpkg status file into {package: version} for installed packages
+
+    Multi-arch packages can be installed once per architecture. Packages of
+    the native architecture keep their bare name and the others are named
+    "package:arch", so names don't depend on the order of the status file.
+    """
+    installed = []
+    fields = {}
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if line == "\n":
+                _add_dpkg_package(installed, fields)
+                fields = {}
+            elif line[0] not in " \t":
+                key, _, value = line.partition(":")
+                if key in ("Package", "Status", "Version", "Architecture"):
+                    fields[key] = value.strip()
+    _add_dpkg_package(installed, fields)
+
+    native = next((arch for name, arch, _ in installed if name == "dpkg"), None)
+    if native is None:
+        # No dpkg stanza (a trimmed status file): the most common architecture is the native one
+        arches = Counter(arch for _, arch, _ in installed if arch not in (None, "all"))
+        native = arches.most_common(1)[0][0] if arches else None
+    packages = {}
+    for name, arch, version in installed:
+        if arch not in (None, "all", native):
+            name = f"{name}:{arch}"
+        packages[name] = version
+    return packages
+
+
+def _add_dpkg_package(installed, fields):
+    """Record a dpkg stanza as (name, architecture, version) if the package is fully installed"""
+    if not fields.get("Status", "").endswith(" installed") or "Package" not in fields:
+        return
+    installed.append((fields["Package"], fields.get("Architecture"), fields.get("Version")))
+
+
+def read_rpm_packages():
+    """Query rpm for {package: version-release}"""
+    import subprocess
+    output = subprocess.check_output(
+        ["rpm", "-qa", "--qf", "%{NAME}\t%{VERSION}-%{RELEASE}\n"],
+        universal_newlines=True, stderr=subprocess.DEVNULL
+    )
+    packages = {}
+    for line in output.splitlines():
+        name, _, version = line.partition("\t")
+        if name:
+            packages[name] = version or None
+    return packages
+
+
+def read_macos_applications(path=MACOS_APPLICATIONS):
+    """List .app bundles and their short version strings"""
+    import plistlib
+    packages = {}
+    for entry in os.scandir(path):
+        if not entry.name.endswith(".app"):
+            continue
+        version = None
+        try:
+            with open(os.path.join(entry.path, "Contents", "Info.plist"), "rb") as f:
+                version = plistlib.load(f).get("CFBundleShortVersionString")
+        except (OSError, plistlib.InvalidFileException, ValueError):
+            pass
+        packages[entry.name[:-len(".app")]] = version
+    return packages
+
+
+def read_windows_registry():
+    """Read DisplayName/DisplayVersion pairs from the Uninstall registry key"""
+    import winreg
+    packages = {}
+    key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall")
+    for i in range(0, winreg.QueryInfoKey(key)[0]):
+        try:
+            subkey = winreg.OpenKey(key, winreg.EnumKey(key, i))
+            name = winreg.QueryValueEx(subkey, "DisplayName")[0]
+            try:
+                version = winreg.QueryValueEx(subkey, "DisplayVersion")[0]
+            except OSError:
+                version = None
+            packages[name] = version
+        except OSError:
+            continue
+    return packages
+
+
+def detect_source():
+    """Return (manager, reader, database path) for this host; the path may be None"""
+    system = platform.system()
+    if system == "Linux":
+        if os.path.exists(DPKG_STATUS):
+            return "dpkg", read_dpkg_status, DPKG_STATUS
+        for path in RPM_DATABASES:
+            if os.path.exists(path):
+                return "rpm", read_rpm_packages, path
+        return "rpm", read_rpm_packages, None
+    if system == "Darwin":
+        return "macos", read_macos_applications, MACOS_APPLICATIONS
+    if system == "Windows":
+        # The registry has no cheap modification time, so it is always re-read
+        return "windows", read_windows_registry, None
+    return None, None, None
+
+
+def inventory_hash(packages):
+    """Stable content hash of a {name: version} mapping"""
+    digest = hashlib.sha256()
+    for name in sorted(packages):
+        digest.update(f"{name}\t{packages[name] or ''}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class PackageInventory:
+    """Installed package list cached on disk and invalidated by database mtime"""
+
+    def __init__(self, cache_dir=None):
+        self.cache_path = os.path.join(cache_dir or default_cache_dir(), "packages.json")
+
+    def _load_cache(self):
+        """Return the cached inventory, or None if missing or unreadable"""
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_cache(self, cache):
+        """Write the cache atomically"""
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        temp_path = self.cache_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, separators=(",", ":"))
+        os.replace(temp_path, self.cache_path)
+
+    def collect(self, include_packages=False):
+        """Return the inventory summary with deltas against the previous scan"""
+        manager, reader, source = detect_source()
+        if manager is None:
+            return {"error": f"Unsupported platform: {platform.system()}"}
+
+        source_mtime = os.stat(source).st_mtime if source else None
+        cache = self._load_cache()
+        if cache is not None and cache.get("version") != CACHE_VERSION:
+            cache = None
+        if (cache is not None and cache.get("manager") == manager
+                and source_mtime is not None and cache.get("source_mtime") == source_mtime):
+            packages = cache["packages"]
+            result = self._summary(manager, packages, cache["hash"], cached=True)
+            result.update({"added": [], "removed": [], "upgraded": [], "baseline": False})
+        else:
+            packages = reader()
+            digest = inventory_hash(packages)
+            result = self._summary(manager, packages, digest, cached=False)
+            previous = cache["packages"] if cache and cache.get("manager") == manager else None
+            result.update(diff_inventories(previous or {}, packages))
+            result["baseline"] = previous is None
+            try:
+                self._save_cache({
+                    "version": CACHE_VERSION,
+                    "manager": manager,
+                    "source_mtime": source_mtime,
+                    "hash": digest,
+                    "packages": packages
+                })
+            except OSError as e:
+                print(f"Unable to write package cache {self.cache_path}: {e}", file=sys.stderr)
+            if previous is None:
+                # Nothing to compare against yet; the full list is the baseline
+                result["added"] = []
+
+        if include_packages:
+            result["packages"] = [{"name": name, "version": version} for name, version in sorted(packages.items())]
+        return result
+
+    @staticmethod
+    def _summary(manager, packages, digest, cached):
+        """Common inventory fields"""
+        return {
+            "manager": manager,
+            "count": len(packages),
+            "hash": digest,
+            "cached": cached
+        }
+
+
+def diff_inventories(old, new):
+    """Return added, removed and upgraded packages between two {name: version} mappings
+
+    A package whose version is unknown (None) on either side is never
+    reported as upgraded.
+    """
+    added = [{"name": name, "version": new[name]} for name in sorted(new.keys() - old.keys())]
+    removed = [{"name": name, "version": old[name]} for name in sorted(old.keys() - new.keys())]
+    upgraded = [
+        {"name": name, "old_version": old[name], "new_version": new[name]}
+        for name in sorted(old.keys() & new.keys())
+        if old[name] != new[name] and old[name] is not None and new[name] is not None
+    ]
+    return {"added": added, "removed": removed, "upgraded": upgraded}
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+SysCore Sentry - Linux /proc fast path
+Keeps /proc/stat, /proc/meminfo, /proc/diskstats and /proc/net/dev open and
+re-reads them into preallocated buffers on every sample, instead of going
+through psutil's open/parse/namedtuple path each time.
+"""
+
+import os
+import sys
+
+
+# /proc/diskstats always counts 512-byte sectors, whatever the device's sector size
+SECTOR_SIZE = 512
+
+MEMINFO_FIELDS = (b"MemTotal:", b"MemFree:", b"MemAvailable:", b"Buffers:", b"Cached:",
+                  b"SReclaimable:", b"SwapTotal:", b"SwapFree:")
+
+NET_DEV_FIELDS = ("bytes_recv", "packets_recv", "errin", "dropin",
+                  "bytes_sent", "packets_sent", "errout", "dropout")
+
+
+def available(root="/proc"):
+    """True when the /proc files this module reads are present"""
+    return sys.platform.startswith("linux") and os.path.exists(os.path.join(root, "stat"))
+
+
+class ProcFile:
+    """A /proc file held open and re-read from offset 0 into a reusable buffer"""
+
+    def __init__(self, path, size=16384):
+        self.path = path
+        self._fd = os.open(path, os.O_RDONLY)
+        self._buffer = bytearray(size)
+        self._view = memoryview(self._buffer)
+
+    def read(self):
+        """Return a memoryview over the file's current contents
+
+        The view aliases the internal buffer and is only valid until the next
+        read. The buffer doubles whenever a read fills it completely.
+        """
+        while True:
+            if hasattr(os, "preadv"):
+                length = os.preadv(self._fd, [self._buffer], 0)
+            else:  # Python < 3.7
+                data = os.pread(self._fd, len(self._buffer), 0)
+                length = len(data)
+                self._buffer[:length] = data
+            if length < len(self._buffer):
+                return self._view[:length]
+            self._view.release()
+            self._buffer = bytearray(2 * len(self._buffer))
+            self._view = memoryview(self._buffer)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class ProcfsReader:
+    """Hot-path readers for CPU, memory, disk and network counters
+
+    Results use the same field names and units as the psutil calls they
+    replace, so collectors can switch between the two freely. Line-oriented
+    files are copied out of the buffer once and split in C, which is faster
+    than walking the memoryview line by line in Python; meminfo is searched
+    in place.
+    """
+
+    def __init__(self, root="/proc", sys_block="/sys/block"):
+        self.root = root
+        self.sys_block = sys_block
+        self._stat = ProcFile(os.path.join(root, "stat"))
+        self._meminfo = ProcFile(os.path.join(root, "meminfo"))
+        self._diskstats = ProcFile(os.path.join(root, "diskstats"))
+        self._net_dev = ProcFile(os.path.join(root, "net", "dev"))
+        self._storage_devices = {}
+
+    def cpu_busy_total(self):
+        """Per-core (busy, total) jiffies from /proc/stat
+
+        Mirrors CpuSampler's accounting: guest time is already included in
+        user/nice, and idle includes iowait.
+        """
+        data = self._stat.read()
+        cores = []
+        # Per-core lines come right after the aggregate "cpu " line
+        for line in data.tobytes().split(b"\n")[1:]:
+            if not line.startswith(b"cpu"):
+                break
+            fields = line.split()
+            values = [int(value) for value in fields[1:11]]
+            total = sum(values)
+            if len(values) >= 10:
+                total -= values[8] + values[9]
+            idle = values[3] + (values[4] if len(values) > 4 else 0)
+            cores.append((total - idle, total))
+        return cores
+
+    def memory(self):
+        """Memory and swap figures computed the way psutil does on Linux"""
+        view = self._meminfo.read()
+        buffer = view.obj
+        length = len(view)
+        values = {}
+        # Search the buffer in place; only the digits of each field are copied out
+        for field in MEMINFO_FIELDS:
+            start = buffer.find(field, 0, length)
+            if start < 0:
+                continue
+            start += len(field)
+            values[field] = int(buffer[start:buffer.find(b"k", start, length)]) * 1024
+
+        total = values[b"MemTotal:"]
+        free = values[b"MemFree:"]
+        available_memory = values.get(b"MemAvailable:")
+        if available_memory is None:
+            # Kernels before 3.14 don't report MemAvailable
+            available_memory = free + values.get(b"Buffers:", 0) + values.get(b"Cached:", 0) \
+                + values.get(b"SReclaimable:", 0)
+        if available_memory > total:
+            # Containers can report host-wide values here
+            available_memory = free
+        swap_total = values.get(b"SwapTotal:", 0)
+        swap_used = swap_total - values.get(b"SwapFree:", 0)
+        return {
+            "total_memory": total,
+            "available_memory": available_memory,
+            "used_memory": total - available_memory,
+            "memory_percent": round(100.0 * (total - available_memory) / total, 1) if total else 0.0,
+            "swap_total": swap_total,
+            "swap_used": swap_used,
+            "swap_percent": round(100.0 * swap_used / swap_total, 1) if swap_total else 0.0,
+        }
+
+    def disk_counters(self):
+        """Per-device counters from /proc/diskstats, like psutil.disk_io_counters(perdisk=True)"""
+        disks = {}
+        for line in self._diskstats.read().tobytes().splitlines():
+            fields = line.split()
+            if len(fields) < 14:
+                continue
+            name = fields[2].decode()
+            disks[name] = {
+                "read_count": int(fields[3]),
+                "write_count": int(fields[7]),
+                "read_bytes": int(fields[5]) * SECTOR_SIZE,
+                "write_bytes": int(fields[9]) * SECTOR_SIZE,
+                "read_time": int(fields[6]),
+                "write_time": int(fields[10]),
+                "busy_time": int(fields[12]),
+            }
+        return disks
+
+    def is_storage_device(self, name):
+        """Whole disks have a /sys/block entry; partitions don't"""
+        result = self._storage_devices.get(name)
+        if result is None:
+            result = self._storage_devices[name] = os.path.exists(
+                os.path.join(self.sys_block, name.replace("/", "!")))
+        return result
+
+    def disk_totals(self, disks=None):
+        """Counters summed over whole disks only, like psutil.disk_io_counters()"""
+        disks = disks if disks is not None else self.disk_counters()
+        totals = {"read_count": 0, "write_count": 0, "read_bytes": 0, "write_bytes": 0}
+        for name, counters in disks.items():
+            if self.is_storage_device(name):
+                for field in totals:
+                    totals[field] += counters[field]
+        return totals
+
+    def net_counters(self):
+        """Per-interface counters from /proc/net/dev, like psutil.net_io_counters(pernic=True)"""
+        nics = {}
+        # Two header lines, then "name: rx fields... tx fields..."
+        for line in self._net_dev.read().tobytes().splitlines()[2:]:
+            name, _, rest = line.partition(b":")
+            fields = rest.split()
+            if len(fields) < 16:
+                continue
+            values = (fields[0], fields[1], fields[2], fields[3], fields[8], fields[9], fields[10], fields[11])
+            nics[name.strip().decode()] = dict(zip(NET_DEV_FIELDS, map(int, values)))
+        return nics
+
+    def net_totals(self, nics=None):
+        """Counters summed over all interfaces, like psutil.net_io_counters()"""
+        nics = nics if nics is not None else self.net_counters()
+        totals = dict.fromkeys(NET_DEV_FIELDS, 0)
+        for counters in nics.values():
+            for field in NET_DEV_FIELDS:
+                totals[field] += counters[field]
+        return totals
+
+    def close(self):
+        for proc_file in (self._stat, self._meminfo, self._diskstats, self._net_dev):
+            proc_file.close()
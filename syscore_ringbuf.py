@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+SysCore Sentry - in-memory metric history
+Fixed-capacity ring buffers backed by array('d'), one per metric, so a
+long-running watch keeps the last N samples in flat memory.
+"""
+
+import math
+from array import array
+from bisect import bisect_left
+
+
+class RingBuffer:
+    """Fixed-capacity (timestamp, value) ring backed by preallocated double arrays
+
+    Appends are O(1). Window queries walk the window in place, and percentile
+    uses a preallocated scratch array, so queries don't allocate per value.
+    """
+
+    __slots__ = ("capacity", "_times", "_values", "_scratch", "_start", "_count")
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._times = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._scratch = array("d", bytes(8 * capacity))
+        self._start = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, ts, value):
+        """Add a sample, overwriting the oldest one when full"""
+        index = (self._start + self._count) % self.capacity
+        self._times[index] = ts
+        self._values[index] = value
+        if self._count < self.capacity:
+            self._count += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def latest(self):
+        """Return the newest (ts, value), or None when empty"""
+        if not self._count:
+            return None
+        index = (self._start + self._count - 1) % self.capacity
+        return self._times[index], self._values[index]
+
+    def _window_start(self, since=None, last=None):
+        """Offset of the first sample in the window, relative to the oldest sample"""
+        offset = 0
+        if last is not None:
+            offset = max(0, self._count - last)
+        if since is not None:
+            # Timestamps are appended in order, so the ring is sorted from _start
+            offset = max(offset, bisect_left(_RingView(self), since))
+        return offset
+
+    def _indices(self, since=None, last=None):
+        """Yield array indices of the samples in the window, oldest first"""
+        capacity = self.capacity
+        start = self._start
+        for offset in range(self._window_start(since, last), self._count):
+            yield (start + offset) % capacity
+
+    def count(self, since=None, last=None):
+        """Number of samples in the window"""
+        return self._count - self._window_start(since, last)
+
+    def min(self, since=None, last=None):
+        """Smallest value in the window"""
+        values = self._values
+        result = None
+        for index in self._indices(since, last):
+            if result is None or values[index] < result:
+                result = values[index]
+        return result
+
+    def max(self, since=None, last=None):
+        """Largest value in the window"""
+        values = self._values
+        result = None
+        for index in self._indices(since, last):
+            if result is None or values[index] > result:
+                result = values[index]
+        return result
+
+    def mean(self, since=None, last=None):
+        """Arithmetic mean of the window"""
+        values = self._values
+        total = 0.0
+        count = 0
+        for index in self._indices(since, last):
+            total += values[index]
+            count += 1
+        return total / count if count else None
+
+    def percentile(self, fraction, since=None, last=None):
+        """Nearest-rank percentile of the window, computed in the scratch array"""
+        scratch = self._scratch
+        values = self._values
+        size = 0
+        for index in self._indices(since, last):
+            scratch[size] = values[index]
+            size += 1
+        if not size:
+            return None
+        rank = max(1, min(size, math.ceil(fraction * size)))
+        return _select(scratch, size, rank - 1)
+
+    def stats(self, since=None, last=None):
+        """min/max/mean/p95 and sample count for the window"""
+        return {
+            "count": self.count(since, last),
+            "min": self.min(since, last),
+            "max": self.max(since, last),
+            "mean": self.mean(since, last),
+            "p95": self.percentile(0.95, since, last),
+        }
+
+
+class _RingView:
+    """Sequence view over a ring's timestamps for bisect, oldest first"""
+
+    __slots__ = ("_ring",)
+
+    def __init__(self, ring):
+        self._ring = ring
+
+    def __len__(self):
+        return self._ring._count
+
+    def __getitem__(self, offset):
+        ring = self._ring
+        return ring._times[(ring._start + offset) % ring.capacity]
+
+
+def _select(values, size, k):
+    """In-place quickselect: return the k-th smallest of values[:size]"""
+    low, high = 0, size - 1
+    while low < high:
+        pivot = values[(low + high) // 2]
+        i, j = low, high
+        while i <= j:
+            while values[i] < pivot:
+                i += 1
+            while values[j] > pivot:
+                j -= 1
+            if i <= j:
+                values[i], values[j] = values[j], values[i]
+                i += 1
+                j -= 1
+        if k <= j:
+            high = j
+        elif k >= i:
+            low = i
+        else:
+            break
+    return values[k]
+
+
+class MetricHistory:
+    """Ring buffers keyed by metric name with a shared capacity
+
+    The number of series is capped as well, so memory stays flat even when
+    devices or mount points come and go.
+    """
+
+    def __init__(self, capacity, max_series=1024):
+        self.capacity = capacity
+        self.max_series = max_series
+        self._series = {}
+        self.dropped_series = 0
+
+    def record(self, ts, metrics):
+        """Append one value per metric from a {name: value} mapping"""
+        for name, value in metrics.items():
+            series = self._series.get(name)
+            if series is None:
+                if len(self._series) >= self.max_series:
+                    self.dropped_series += 1
+                    continue
+                series = self._series[name] = RingBuffer(self.capacity)
+            series.append(ts, value)
+
+    def names(self):
+        """Names of all recorded metrics"""
+        return list(self._series)
+
+    def series(self, name):
+        """Return the RingBuffer for a metric, or None"""
+        return self._series.get(name)
+
+    def stats(self, name, since=None, last=None):
+        """Window statistics for a metric, or None if it has never been recorded"""
+        series = self._series.get(name)
+        return series.stats(since, last) if series is not None else None
+
+    def memory_bytes(self):
+        """Approximate bytes held by the sample arrays"""
+        return sum(3 * 8 * series.capacity for series in self._series.values())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+SysCore Sentry - NDJSON sample sink
+Appends one compact JSON record per sample to a file, buffering writes and
+rotating the file by size or age. Rotated segments can be compressed.
+"""
+
+import os
+import json
+import time
+import datetime
+
+
+COMPRESSION_SUFFIXES = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+
+class NdjsonSink:
+    """Append-only newline-delimited JSON writer with buffering and rotation"""
+
+    def __init__(self, path, buffer_records=64, flush_interval=5.0,
+                 max_bytes=None, max_age=None, compress=None):
+        if compress is not None and compress not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unsupported compression '{compress}'")
+        if compress == "zstd":
+            # Fail at startup rather than at the first rotation
+            import zstandard  # noqa: F401
+        self.path = path
+        self.buffer_records = buffer_records
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compress = compress
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._file = None
+        self._size = 0
+        self._opened_at = None
+
+    def _open(self):
+        """Open the active segment for appending"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+        # An existing segment keeps its age across restarts
+        self._opened_at = os.path.getmtime(self.path) if self._size else time.time()
+
+    def write(self, record):
+        """Queue a record, flushing when the buffer is full or stale"""
+        self._buffer.append(json.dumps(record, separators=(",", ":"), default=str))
+        if (len(self._buffer) >= self.buffer_records
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write buffered records to disk and rotate if needed"""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        if self._file is None:
+            self._open()
+        data = "\n".join(self._buffer) + "\n"
+        self._buffer = []
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data.encode("utf-8"))
+        if self._should_rotate():
+            self.rotate()
+
+    def _should_rotate(self):
+        """Check the active segment against the size and age limits"""
+        if self.max_bytes and self._size >= self.max_bytes:
+            return True
+        if self.max_age and time.time() - self._opened_at >= self.max_age:
+            return True
+        return False
+
+    def rotate(self):
+        """Close the active segment, rename it with a timestamp and optionally compress it"""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        rotated = f"{self.path}.{stamp}"
+        counter = 1
+        while os.path.exists(rotated) or os.path.exists(rotated + COMPRESSION_SUFFIXES.get(self.compress, "")):
+            rotated = f"{self.path}.{stamp}.{counter}"
+            counter += 1
+        os.rename(self.path, rotated)
+        if self.compress:
+            compress_file(rotated, self.compress)
+
+    def close(self):
+        """Flush pending records and close the active segment"""
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def compress_file(path, method):
+    """Compress a file in place, replacing it with path + suffix"""
+    import shutil
+    target = path + COMPRESSION_SUFFIXES[method]
+    with open(path, "rb") as source:
+        if method == "gzip":
+            import gzip
+            with gzip.open(target, "wb") as destination:
+                shutil.copyfileobj(source, destination)
+        else:
+            import zstandard
+            with open(target, "wb") as raw, zstandard.ZstdCompressor().stream_writer(raw) as destination:
+                shutil.copyfileobj(source, destination)
+    os.remove(path)
+    return target
+
+
+def parse_size(text):
+    """Parse a size such as "50M" or "1G" into bytes"""
+    units = {"K": 1024, "M": 1024**2, "G": 1024**3}
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def parse_duration(text):
+    """Parse a duration such as "30s", "15m", "24h" or "7d" into seconds"""
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+    text = text.strip().lower()
+    if text and text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
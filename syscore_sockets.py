@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+SysCore Sentry - socket enumeration
+Reads socket tables straight from /proc/net on Linux and maps sockets back to
+their owning processes, without spawning netstat or ss.
+"""
+
+import os
+import heapq
+import socket
+from array import array
+from bisect import bisect_left
+
+
+PROC_NET_TABLES = [
+    ("tcp", "TCP", socket.AF_INET),
+    ("tcp6", "TCP", socket.AF_INET6),
+    ("udp", "UDP", socket.AF_INET),
+    ("udp6", "UDP", socket.AF_INET6),
+]
+
+TCP_STATES = {
+    "01": "ESTABLISHED",
+    "02": "SYN_SENT",
+    "03": "SYN_RECV",
+    "04": "FIN_WAIT1",
+    "05": "FIN_WAIT2",
+    "06": "TIME_WAIT",
+    "07": "CLOSE",
+    "08": "CLOSE_WAIT",
+    "09": "LAST_ACK",
+    "0A": "LISTEN",
+    "0B": "CLOSING",
+    "0C": "NEW_SYN_RECV",
+}
+
+
+def decode_address(text, family):
+    """Decode a /proc/net address such as 0100007F:0035 into (ip, port)"""
+    address, _, port = text.partition(":")
+    raw = bytes.fromhex(address)
+    if family == socket.AF_INET:
+        ip = socket.inet_ntop(family, raw[::-1])
+    else:
+        # IPv6 addresses are stored as four host-order 32-bit words
+        ip = socket.inet_ntop(family, b"".join(raw[i:i + 4][::-1] for i in range(0, 16, 4)))
+    return ip, int(port, 16)
+
+
+def iter_proc_net(root="/proc"):
+    """Yield one dict per socket in the /proc/net TCP and UDP tables"""
+    for table, proto, family in PROC_NET_TABLES:
+        try:
+            f = open(os.path.join(root, "net", table), encoding="ascii")
+        except OSError:
+            continue
+        with f:
+            next(f, None)  # header
+            for line in f:
+                fields = line.split()
+                if len(fields) < 10:
+                    continue
+                local_ip, local_port = decode_address(fields[1], family)
+                remote_ip, remote_port = decode_address(fields[2], family)
+                state = TCP_STATES.get(fields[3], fields[3]) if proto == "TCP" else None
+                yield {
+                    "proto": proto,
+                    "family": family,
+                    "local_ip": local_ip,
+                    "local_port": local_port,
+                    "remote_ip": remote_ip,
+                    "remote_port": remote_port,
+                    "state": state,
+                    "uid": int(fields[7]),
+                    "inode": int(fields[9]),
+                }
+
+
+# An IPv4-mapped IPv6 address (::ffff:a.b.c.d) as it appears in /proc/net/tcp6
+V4_MAPPED_PREFIX = "0000000000000000FFFF0000"
+
+
+def is_listening(sock):
+    """True for listening TCP sockets and unconnected bound UDP sockets"""
+    if sock["proto"] == "TCP":
+        return sock["state"] == "LISTEN"
+    return sock["remote_port"] == 0 and sock["local_port"] != 0
+
+
+def socket_owners(inodes, root="/proc"):
+    """Map socket inodes to (pid, process name) by scanning /proc/<pid>/fd
+
+    The scan stops as soon as every requested inode has been found. Processes
+    we are not allowed to inspect are skipped, so some sockets may stay unowned.
+    """
+    wanted = {f"socket:[{inode}]": inode for inode in inodes}
+    owners = {}
+    if not wanted:
+        return owners
+    try:
+        pids = [entry for entry in os.listdir(root) if entry.isdigit()]
+    except OSError:
+        return owners
+    for pid in pids:
+        fd_dir = os.path.join(root, pid, "fd")
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            continue
+        for fd in fds:
+            try:
+                target = os.readlink(os.path.join(fd_dir, fd))
+            except OSError:
+                continue
+            inode = wanted.pop(target, None)
+            if inode is not None:
+                owners[inode] = (int(pid), _process_name(root, pid))
+        if not wanted:
+            break
+    return owners
+
+
+def _process_name(root, pid):
+    """Read a process name from /proc/<pid>/comm"""
+    try:
+        with open(os.path.join(root, pid, "comm"), encoding="utf-8", errors="replace") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def listening_sockets(root="/proc"):
+    """Return listening sockets with owning pid and process name
+
+    Uses /proc/net on Linux and falls back to psutil elsewhere.
+    """
+    if not os.path.exists(os.path.join(root, "net", "tcp")):
+        return _listening_sockets_psutil()
+
+    sockets = [sock for sock in iter_proc_net(root) if is_listening(sock)]
+    owners = socket_owners({sock["inode"] for sock in sockets}, root)
+    listening = []
+    seen = set()
+    for sock in sockets:
+        key = (sock["proto"], sock["local_ip"], sock["local_port"], sock["inode"])
+        if key in seen:
+            continue
+        seen.add(key)
+        pid, name = owners.get(sock["inode"], (None, None))
+        listening.append({
+            "proto": sock["proto"],
+            "address": sock["local_ip"],
+            "port": sock["local_port"],
+            "pid": pid,
+            "process": name,
+        })
+    listening.sort(key=lambda s: (s["proto"], s["port"], s["address"]))
+    return listening
+
+
+def _listening_sockets_psutil():
+    """psutil-based fallback for platforms without /proc/net"""
+    import psutil
+    listening = []
+    names = {}
+    for conn in psutil.net_connections(kind="inet"):
+        proto = "TCP" if conn.type == socket.SOCK_STREAM else "UDP"
+        if proto == "TCP" and conn.status != psutil.CONN_LISTEN:
+            continue
+        if proto == "UDP" and conn.raddr:
+            continue
+        if conn.pid and conn.pid not in names:
+            try:
+                names[conn.pid] = psutil.Process(conn.pid).name()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                names[conn.pid] = None
+        listening.append({
+            "proto": proto,
+            "address": conn.laddr.ip,
+            "port": conn.laddr.port,
+            "pid": conn.pid,
+            "process": names.get(conn.pid),
+        })
+    listening.sort(key=lambda s: (s["proto"], s["port"], s["address"]))
+    return listening
+
+
+class ConnectionSummary:
+    """Bounded counters for a stream of sockets
+
+    Port counts live in fixed 65536-slot arrays, and remote networks are a
+    dict counter capped at max_keys, with anything past the cap counted as
+    "other". Protocols and TCP states need no cap (the kernel reports two
+    protocols and at most 256 state codes), and per-process counts are
+    bounded by the number of processes. Only the first raw_limit sockets
+    are kept.
+    """
+
+    def __init__(self, max_keys=10000, raw_limit=0):
+        self.max_keys = max_keys
+        self.raw_limit = raw_limit
+        self.total = 0
+        self.by_proto = {}
+        self.by_state = {}
+        self.networks = {}
+        self.other_networks = 0
+        # Per protocol: sockets on each local port that aren't listening, and the listening ports
+        self.port_connections = {"TCP": array("L", [0]) * 65536, "UDP": array("L", [0]) * 65536}
+        self.listening = {"TCP": set(), "UDP": set()}
+        self.pid_counts = {}
+        self.raw = []
+
+    def add(self, proto, state, local_port, network, listening):
+        """Count one socket; network is a hashable remote-prefix key or None"""
+        self.total += 1
+        self.by_proto[proto] = self.by_proto.get(proto, 0) + 1
+        if state is not None:
+            self.by_state[state] = self.by_state.get(state, 0) + 1
+        if listening:
+            self.listening[proto].add(local_port)
+        else:
+            self.port_connections[proto][local_port] += 1
+        if network is not None:
+            count = self.networks.get(network)
+            if count is not None:
+                self.networks[network] = count + 1
+            elif len(self.networks) < self.max_keys:
+                self.networks[network] = 1
+            else:
+                self.other_networks += 1
+
+    def report(self, top=20, network_name=str, pid_name=None):
+        """Compact JSON-ready summary"""
+        ports = []
+        for proto, listening_ports in self.listening.items():
+            counts = self.port_connections[proto]
+            ports.extend({"proto": proto, "port": port, "connections": counts[port]} for port in listening_ports)
+        ports.sort(key=lambda p: (-p["connections"], p["proto"], p["port"]))
+        networks = heapq.nlargest(top, self.networks.items(), key=lambda item: item[1])
+        pids = heapq.nlargest(top, self.pid_counts.items(), key=lambda item: item[1])
+        summary = {
+            "total": self.total,
+            "by_proto": self.by_proto,
+            "by_state": dict(sorted(self.by_state.items(), key=lambda item: -item[1])),
+            "by_listening_port": ports,
+            "top_remote_networks": [{"network": network_name(network), "connections": count}
+                                    for network, count in networks],
+            "remote_networks_tracked": len(self.networks),
+            "other_remote_connections": self.other_networks,
+            "top_pids": [{"pid": pid, "process": pid_name(pid) if pid_name else None, "connections": count}
+                         for pid, count in pids],
+        }
+        if self.raw_limit:
+            summary["raw"] = self.raw
+            summary["raw_truncated"] = self.total > len(self.raw)
+        return summary
+
+
+def _network_from_hex(key):
+    """Turn a (family, hex prefix) key from /proc/net into "a.b.c.0/24" or "x:x:x:x::/64" """
+    family, prefix = key
+    if family == socket.AF_INET:
+        return f"{decode_address('00' + prefix + ':0', family)[0]}/24"
+    return f"{decode_address(prefix + '0' * 16 + ':0', family)[0]}/64"
+
+
+def _remote_network_hex(address, family):
+    """/24 (IPv4) or /64 (IPv6) prefix of a raw /proc/net address, still in hex"""
+    if family == socket.AF_INET6 and address.startswith(V4_MAPPED_PREFIX):
+        address, family = address[24:], socket.AF_INET
+    if family == socket.AF_INET:
+        # Little-endian word: the last six digits are the first three octets
+        return socket.AF_INET, address[2:]
+    return family, address[:16]
+
+
+def _sorted_inodes(inodes, chunk=65536):
+    """Sort an array("Q") without holding every value as a Python int at once
+
+    Chunks are sorted into compact runs and merged, so the only temporary
+    list is one chunk long, however many sockets there are.
+    """
+    if len(inodes) <= chunk:
+        return array("Q", sorted(inodes))
+    runs = [array("Q", sorted(inodes[start:start + chunk])) for start in range(0, len(inodes), chunk)]
+    merged = array("Q")
+    merged.extend(heapq.merge(*runs))
+    return merged
+
+
+def summarize_connections(root="/proc", top=20, max_keys=10000, raw_limit=0, by_pid=True):
+    """Summarize every TCP/UDP socket without building a record per socket
+
+    On Linux the /proc/net tables are streamed line by line and counted on
+    their raw hex fields; addresses are only decoded for the keys that make
+    it into the report. Owning processes are found with one pass over
+    /proc/<pid>/fd, matching against a sorted array of socket inodes (8 bytes
+    per socket) rather than a dict. Elsewhere psutil is used.
+    """
+    if not os.path.exists(os.path.join(root, "net", "tcp")):
+        return _summarize_connections_psutil(top, max_keys, raw_limit, by_pid)
+
+    summary = ConnectionSummary(max_keys, raw_limit)
+    inodes = array("Q")
+    raw_inodes = []
+    for table, proto, family in PROC_NET_TABLES:
+        try:
+            f = open(os.path.join(root, "net", table), encoding="ascii")
+        except OSError:
+            continue
+        tcp = proto == "TCP"
+        with f:
+            next(f, None)  # header
+            for line in f:
+                fields = line.split()
+                if len(fields) < 10:
+                    continue
+                local, remote, state_code = fields[1], fields[2], fields[3]
+                remote_address, _, remote_port = remote.partition(":")
+                unconnected = remote_port == "0000"
+                listening = state_code == "0A" if tcp else unconnected
+                summary.add(
+                    proto,
+                    TCP_STATES.get(state_code, state_code) if tcp else None,
+                    int(local[-4:], 16),
+                    None if unconnected else _remote_network_hex(remote_address, family),
+                    listening,
+                )
+                inode = int(fields[9])
+                if by_pid and inode:
+                    inodes.append(inode)
+                if len(summary.raw) < raw_limit:
+                    local_ip, local_port = decode_address(local, family)
+                    remote_ip, remote_port = decode_address(remote, family)
+                    summary.raw.append({
+                        "proto": proto,
+                        "local_address": f"{local_ip}:{local_port}",
+                        "remote_address": None if unconnected else f"{remote_ip}:{remote_port}",
+                        "status": TCP_STATES.get(state_code, state_code) if tcp else "NONE",
+                        "pid": None,
+                    })
+                    raw_inodes.append(inode)
+
+    if by_pid and inodes:
+        inodes = _sorted_inodes(inodes)
+        raw_pids = {inode: None for inode in raw_inodes if inode}
+        _count_socket_owners(root, inodes, summary.pid_counts, raw_pids)
+        for record, inode in zip(summary.raw, raw_inodes):
+            record["pid"] = raw_pids.get(inode)
+    return summary.report(top, _network_from_hex, lambda pid: _process_name(root, str(pid)))
+
+
+def _count_socket_owners(root, inodes, pid_counts, raw_pids):
+    """Count, per pid, the open fds that refer to one of the sorted socket inodes"""
+    try:
+        pids = [entry for entry in os.listdir(root) if entry.isdigit()]
+    except OSError:
+        return
+    size = len(inodes)
+    for pid in pids:
+        fd_dir = os.path.join(root, pid, "fd")
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            continue
+        count = 0
+        for fd in fds:
+            try:
+                target = os.readlink(os.path.join(fd_dir, fd))
+            except OSError:
+                continue
+            if not target.startswith("socket:["):
+                continue
+            inode = int(target[8:-1])
+            index = bisect_left(inodes, inode)
+            if index < size and inodes[index] == inode:
+                count += 1
+                if inode in raw_pids and raw_pids[inode] is None:
+                    raw_pids[inode] = int(pid)
+        if count:
+            pid_counts[int(pid)] = count
+
+
+def _summarize_connections_psutil(top, max_keys, raw_limit, by_pid):
+    """psutil-based fallback for platforms without /proc/net"""
+    import psutil
+    summary = ConnectionSummary(max_keys, raw_limit)
+    for conn in psutil.net_connections(kind="inet"):
+        proto = "TCP" if conn.type == socket.SOCK_STREAM else "UDP"
+        state = conn.status if proto == "TCP" else None
+        listening = state == psutil.CONN_LISTEN if proto == "TCP" else not conn.raddr
+        network = None
+        if conn.raddr:
+            if conn.family == socket.AF_INET:
+                network = conn.raddr.ip.rsplit(".", 1)[0] + ".0/24"
+            else:
+                network = ":".join(socket.inet_pton(socket.AF_INET6, conn.raddr.ip)[:8].hex()[i:i + 4]
+                                   for i in range(0, 16, 4)) + "::/64"
+        summary.add(proto, state, conn.laddr.port if conn.laddr else 0, network, listening)
+        if by_pid and conn.pid:
+            summary.pid_counts[conn.pid] = summary.pid_counts.get(conn.pid, 0) + 1
+        if len(summary.raw) < raw_limit:
+            summary.raw.append({
+                "proto": proto,
+                "local_address": f"{conn.laddr.ip}:{conn.laddr.port}" if conn.laddr else None,
+                "remote_address": f"{conn.raddr.ip}:{conn.raddr.port}" if conn.raddr else None,
+                "status": conn.status,
+                "pid": conn.pid,
+            })
+
+    def pid_name(pid):
+        try:
+            return psutil.Process(pid).name()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+    return summary.report(top, pid_name=pid_name)
+
+
+def _nf_tables_present(root="/proc", sys_module="/sys/module"):
+    """True when the nf_tables module is loaded or built into the kernel"""
+    if os.path.isdir(os.path.join(sys_module, "nf_tables")):
+        return True
+    try:
+        with open(os.path.join(root, "modules"), encoding="ascii", errors="replace") as f:
+            return any(line.startswith("nf_tables ") for line in f)
+    except OSError:
+        return False
+
+
+def linux_firewall_status(root="/proc", sys_module="/sys/module"):
+    """Summarize the Linux firewall from /proc and config files without running iptables
+
+    Legacy iptables tables are listed in /proc/net, but iptables-nft and
+    nftables (the default on current distributions) leave those files
+    empty and keep no ruleset summary in /proc. For those only the backend
+    is reported; "unknown" means neither was detected.
+    """
+    status = {}
+    for table_file, key in (("ip_tables_names", "iptables_tables"), ("ip6_tables_names", "ip6tables_tables")):
+        try:
+            with open(os.path.join(root, "net", table_file), encoding="ascii") as f:
+                status[key] = f.read().split()
+        except OSError:
+            pass
+    if _nf_tables_present(root, sys_module):
+        status["backend"] = "nftables"
+        status["nftables"] = "loaded, ruleset not inspected"
+    elif status.get("iptables_tables") or status.get("ip6tables_tables"):
+        status["backend"] = "iptables"
+    else:
+        status["backend"] = "unknown"
+    try:
+        with open("/etc/ufw/ufw.conf", encoding="utf-8") as f:
+            for line in f:
+                if line.strip().upper().startswith("ENABLED="):
+                    status["ufw_enabled"] = line.split("=", 1)[1].strip().lower() == "yes"
+    except OSError:
+        pass
+    return status
@@ -0,0 +1,36 @@
+import time
+
+from syscore_accounting import ProcessAccounting
+
+
+def make_accounting():
+    accounting = ProcessAccounting(retention=3600, bucket_seconds=60, root="/nonexistent")
+    accounting.started = 0
+    return accounting
+
+
+def test_rss_peak_only_counts_buckets_inside_the_window():
+    accounting = make_accounting()
+    now = time.time()
+    # "big" peaked at 4 GiB an hour ago and has been small since; "steady" holds 1 GiB
+    accounting.update(now - 3000, [((1, 1.0), "big", 1.0, 0, 0, 4 << 30), ((2, 1.0), "steady", 1.0, 0, 0, 1 << 30)])
+    accounting.update(now - 10, [((1, 1.0), "big", 1.0, 0, 0, 100 << 20), ((2, 1.0), "steady", 1.0, 0, 0, 1 << 30)])
+
+    recent = accounting.top(60, by="rss_peak", group="name", now=now)
+    assert [(row["name"], row["rss_peak"]) for row in recent] == [("steady", 1 << 30), ("big", 100 << 20)]
+    hour = accounting.top(3600, by="rss_peak", group="name", now=now)
+    assert hour[0]["name"] == "big" and hour[0]["rss_peak"] == 4 << 30
+
+
+def test_report_ranks_every_window_three_ways():
+    accounting = make_accounting()
+    now = time.time()
+    accounting.update(now - 30, [((1, 1.0), "a", 1.0, 10, 0, 100), ((2, 1.0), "b", 2.0, 0, 0, 50)])
+    accounting.update(now, [((1, 1.0), "a", 1.5, 5000, 0, 100), ((2, 1.0), "b", 3.0, 0, 0, 900)])
+
+    window = accounting.report({"1m": 60}, n=2)["windows"]["1m"]
+    assert [row["name"] for row in window["cpu_seconds"]["by_name"]] == ["b", "a"]
+    assert [row["name"] for row in window["io_bytes"]["by_name"]] == ["a", "b"]
+    assert [row["name"] for row in window["rss_peak"]["by_name"]] == ["b", "a"]
+    for by in ("cpu_seconds", "io_bytes", "rss_peak"):
+        assert window[by]["by_process"] == accounting.top(60, n=2, by=by, group="process")
@@ -0,0 +1,37 @@
+import json
+
+from syscore_diff import diff_reports, has_changes
+
+
+def write_report(tmp_path, name, report):
+    path = tmp_path / name
+    path.write_text(json.dumps(report, indent=4))
+    return str(path)
+
+
+def test_legacy_package_list_matches_new_inventory(tmp_path):
+    # Saved before the package inventory: `dpkg --get-selections` names and no versions
+    legacy = write_report(tmp_path, "legacy.json", {"application_info": [
+        {"name": "adduser", "version": "N/A"},
+        {"name": "libc6:amd64", "version": "N/A"},
+        {"name": "libc6:i386", "version": "N/A"},
+        {"name": "libssl3:amd64", "version": "N/A"},
+        {"name": "tzdata", "version": ""},
+    ]})
+    current = write_report(tmp_path, "current.json", {"application_info": {
+        "manager": "dpkg",
+        "count": 5,
+        "hash": "0" * 64,
+        "packages": [
+            {"name": "adduser", "version": "3.134"},
+            {"name": "libc6", "version": "2.36-9"},
+            {"name": "libc6:i386", "version": "2.36-9"},
+            {"name": "libssl3", "version": "3.0.11-1"},
+            {"name": "tzdata", "version": "2024a-0"},
+        ],
+    }})
+
+    for old, new in ((legacy, current), (current, legacy)):
+        delta = diff_reports(old, new, sections=["packages"])
+        assert delta["packages"] == {"added": [], "removed": [], "upgraded": []}
+        assert not has_changes(delta)
@@ -0,0 +1,27 @@
+from syscore_packages import read_dpkg_status
+
+
+STANZAS = {
+    "dpkg": "Package: dpkg\nStatus: install ok installed\nArchitecture: amd64\nVersion: 1.21.22\n",
+    "libc6_amd64": "Package: libc6\nStatus: install ok installed\nArchitecture: amd64\nVersion: 2.36-9\n",
+    "libc6_i386": "Package: libc6\nStatus: install ok installed\nArchitecture: i386\nVersion: 2.36-9\n",
+    "tzdata": "Package: tzdata\nStatus: install ok installed\nArchitecture: all\nVersion: 2024a-0\n",
+    "removed": "Package: gone\nStatus: deinstall ok config-files\nArchitecture: amd64\nVersion: 1.0\n",
+}
+
+
+def write_status(tmp_path, order):
+    path = tmp_path / "status"
+    path.write_text("\n".join(STANZAS[name] for name in order))
+    return str(path)
+
+
+def test_multiarch_names_do_not_depend_on_stanza_order(tmp_path):
+    forward = read_dpkg_status(write_status(tmp_path, ["libc6_amd64", "libc6_i386", "tzdata", "dpkg", "removed"]))
+    backward = read_dpkg_status(write_status(tmp_path, ["removed", "dpkg", "tzdata", "libc6_i386", "libc6_amd64"]))
+    assert forward == backward == {
+        "dpkg": "1.21.22",
+        "libc6": "2.36-9",
+        "libc6:i386": "2.36-9",
+        "tzdata": "2024a-0",
+    }
@@ -0,0 +1,64 @@
+import psutil
+
+from syscore_entry import ProcessTable
+
+
+class FakeProcess:
+    """psutil.Process stand-in backed by a {pid: (name, create_time)} table"""
+
+    table = {}
+
+    def __init__(self, pid):
+        if pid not in self.table:
+            raise psutil.NoSuchProcess(pid)
+        self.pid = pid
+        self.name, self._create_time = self.table[pid]
+
+    def create_time(self):
+        return self._create_time
+
+    def as_dict(self, attrs):
+        if self.pid not in self.table:
+            raise psutil.NoSuchProcess(self.pid)
+        values = {
+            "pid": self.pid,
+            "name": self.name,
+            "username": "app",
+            "create_time": self._create_time,
+            "cmdline": [self.name],
+            "status": "sleeping",
+            "cpu_percent": 0.0,
+            "memory_percent": 0.1,
+        }
+        return {attr: values[attr] for attr in attrs}
+
+    def cpu_percent(self, interval=None):
+        return 0.0
+
+
+def make_table(processes):
+    FakeProcess.table = dict(processes)
+    return ProcessTable(prime_window=0, pids=lambda: list(FakeProcess.table), process_factory=FakeProcess)
+
+
+def test_reused_pid_is_reported_as_exit_and_spawn():
+    table = make_table({100: ("old", 1000.0), 200: ("other", 1000.0)})
+    table.sample()
+    assert {p["name"] for p in table.last_delta["spawned"]} == {"old", "other"}
+
+    # pid 100 exits and is immediately reused by a different process
+    FakeProcess.table[100] = ("new", 2000.0)
+    processes = table.sample()
+
+    assert table.last_delta["exited"] == [{"key": [100, 1000.0], "name": "old"}]
+    spawned = table.last_delta["spawned"]
+    assert [(p["pid"], p["name"], p["create_time"]) for p in spawned] == [(100, "new", 2000.0)]
+    assert {(p["pid"], p["name"]) for p in processes} == {(100, "new"), (200, "other")}
+
+
+def test_unchanged_process_is_not_respawned():
+    table = make_table({100: ("steady", 1000.0)})
+    table.sample()
+    table.sample()
+    assert table.last_delta["spawned"] == []
+    assert table.last_delta["exited"] == []